@@ -49,7 +49,47 @@ MODULE_CONFIG = {
                 "converted_image_path": os.path.join(BASE_DIR, "generate_infography_video", "output", "final.png"),
                 "audio_folder": os.path.join(BASE_DIR, "generate_infography_video", "output"),
                 "output_path": os.path.join(BASE_DIR, "generate_infography_video", "output", "final_video.mp4"),
-                "output_svg_path": os.path.join(BASE_DIR, "generate_infography_video", "output", "final.svg")
+                "output_svg_path": os.path.join(BASE_DIR, "generate_infography_video", "output", "final.svg"),
+                "cache_dir": os.path.join(BASE_DIR, "generate_infography_video", "cache"),
+                "transition": "crossfade",
+                "transition_duration": 0.6,
+                "transition_direction": "left",
+                "magnifier_zoom": 2.0,
+                "encoder": {
+                    "codec": "libx264",
+                    "preset": "medium",
+                    "crf": 23,
+                    "pix_fmt": "yuv420p",
+                    "gop": 48,
+                    "threads": "auto",
+                    "vfr": False
+                },
+                "render_workers": "auto",
+                "render_mode": "thread",
+                "shm_ring_mb": 128,
+                "max_jobs": 1,
+                "page_workers": "auto",
+                "audio_fps": 44100,
+                "cpu_profile_path": os.path.join(BASE_DIR, "generate_infography_video", "cache", "cpu_profile.json"),
+                "tts": {
+                    "engine": "gtts",
+                    "lang": "en",
+                    "tld": "co.in",
+                    "cache_dir": os.path.join(BASE_DIR, "generate_infography_video", "cache", "tts"),
+                    "workers": 4,
+                    "retries": 3,
+                    "backoff": 1.0,
+                    "fallback_engine": None,
+                    "chunk_sentences": True,
+                    "max_chunk_chars": 200,
+                    "crossfade": 0.03,
+                    "crossfade_curve": "equal_power",
+                    "chunk_pad": 0.08,
+                    "sample_rate": 24000,
+                    "backends": {
+                        "phrases": {"bank_dir": os.path.join(BASE_DIR, "assets", "phrases")}
+                    }
+                }
             }
         }
     },
@@ -0,0 +1,129 @@
+"""
+Frame Buffers Benchmark Module
+
+This module measures the memory allocated per frame by the typewriter
+dialogue, exported the old way (np.array of the whole canvas converted to
+RGB) and through the pooled frame buffer with dirty-box export, and counts
+how many frame-sized buffers a sequence of blocks allocates once the
+compositors and transitions draw them from the shared pool.
+
+Run it from the generate_infography_video directory:
+
+    python benchmarks/frame_buffers_benchmark.py --frames 120 --blocks 6
+"""
+
+import gc
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+from PIL import Image as PILImage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.compositor import DamageCompositor, Layer
+from utils.transitions import Transition
+from utils.frame_buffers import frame_pool
+from utils.dialogue_utils import DialogueLayout, TypewriterRenderer, load_bullet_icon
+
+
+WIDTH, HEIGHT = 1150, 1700
+FPS = 24
+TEXT = ("Build an Emergency Fund\n"
+        "• Save at least three to six months of expenses before investing.\n"
+        "• Keep the fund in a separate high-interest savings account.\n"
+        "• Refill it as soon as you have had to use it.")
+
+
+def legacy_render(renderer, chars_to_show):
+    """Export the whole canvas for every new character count, as before."""
+    if renderer.frame is not None and chars_to_show == renderer.chars_shown:
+        return renderer.frame
+    renderer.render_image(chars_to_show)
+    renderer.frame = np.array(renderer.canvas.convert("RGB"))
+    return renderer.frame
+
+
+def measure(render, layout, n_frames):
+    """
+    Render a typing sequence and measure allocations and time.
+
+    Args:
+        render (callable): Function of the revealed character count returning a frame
+        layout (DialogueLayout): Layout driving the character count
+        n_frames (int): Number of frames to render
+
+    Returns:
+        tuple: (mean KiB allocated per frame, peak KiB of one frame, ms per frame)
+    """
+    gc.collect()
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+    start = time.perf_counter()
+    for i in range(n_frames):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        render(layout.chars_at(i / FPS))
+        _, frame_peak = tracemalloc.get_traced_memory()
+        allocated += frame_peak - before
+        peak = max(peak, frame_peak - before)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return allocated / n_frames / 1024, peak / 1024, elapsed * 1000 / n_frames
+
+
+def build_blocks(n_blocks):
+    """
+    Build and render a compositor and a transition per block, like a video run.
+
+    Returns:
+        tuple: (buffers allocated, buffers reused) by the frame pool
+    """
+    allocations, reuses = frame_pool.allocations, frame_pool.reuses
+    rng = np.random.default_rng(0)
+    previous = rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    for _ in range(n_blocks):
+        raster = rng.integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+        transition = Transition("crossfade", previous, raster, duration=0.5)
+        compositor = DamageCompositor(transition.frame, [Layer(np.zeros((200, 200, 4), dtype=np.uint8))])
+        for i in range(FPS):
+            compositor.make_frame(i / FPS)
+        previous = raster
+        del transition, compositor
+        gc.collect()
+    return frame_pool.allocations - allocations, frame_pool.reuses - reuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-frame allocations of the frame functions")
+    parser.add_argument("--frames", type=int, default=120, help="Typewriter frames to render per path")
+    parser.add_argument("--blocks", type=int, default=6, help="Blocks to build for the pool reuse count")
+    args = parser.parse_args()
+
+    layout = DialogueLayout(TEXT, (WIDTH, HEIGHT), args.frames / FPS)
+    rng = np.random.default_rng(1)
+    background = rng.integers(100, 200, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    plate = PILImage.fromarray(background).convert("RGBA")
+    icon = load_bullet_icon(size=layout.bullet_icon_size)
+
+    legacy = TypewriterRenderer(plate, layout, icon)
+    pooled = TypewriterRenderer(plate, layout, icon)
+    legacy_kib, legacy_peak, legacy_ms = measure(lambda n: legacy_render(legacy, n), layout, args.frames)
+    pooled_kib, pooled_peak, pooled_ms = measure(pooled.render, layout, args.frames)
+
+    final = layout.total_chars
+    identical = np.array_equal(legacy_render(legacy, final), pooled.render(final))
+
+    print(f"Typewriter, full export   : {legacy_kib:9.1f} KiB/frame (peak {legacy_peak:8.1f} KiB), {legacy_ms:6.2f} ms/frame")
+    print(f"Typewriter, pooled buffer : {pooled_kib:9.1f} KiB/frame (peak {pooled_peak:8.1f} KiB), {pooled_ms:6.2f} ms/frame")
+    print(f"Identical final frame     : {identical}")
+
+    allocated, reused = build_blocks(args.blocks)
+    print(f"Frame buffers over {args.blocks} blocks: {allocated} allocated, {reused} reused from the pool")
+
+
+if __name__ == "__main__":
+    main()
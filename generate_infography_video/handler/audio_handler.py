@@ -3,31 +3,399 @@ Audio Handler Module
 
 This module contains functionality for handling audio in video generation,
 including text-to-speech conversion and audio file management.
+
+Synthesized speech is cached by content: the cache key is a hash of the
+text and of every setting that changes the audio (engine, language, accent,
+speed). Edited text is therefore always re-synthesized, and unchanged text
+is reused wherever it appears. Batches are synthesized concurrently with a
+bounded number of workers, retrying failed requests with backoff.
+
+The engine is a TTSBackend (see tts_backends) chosen per call or per job,
+with an optional fallback engine, e.g. a local one for when the network
+service fails.
+
+Long texts are split at sentence (or, for very long sentences, clause)
+boundaries and every chunk is cached on its own, so editing one sentence of
+a block re-synthesizes only that sentence. The chunks are joined into the
+block's audio with short crossfades (see audio_pcm), and the joined audio is
+cached too, keyed by its chunks.
 """
 
 import os
-import tempfile
+import re
+import time
+import random
 import shutil
-from gtts import gTTS
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from .tts_backends import TTSBackend, TTSError, get_backend
+from .audio_pcm import stitch_files
+from .audio_probe import probe_duration
+
+# Import configuration variables
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import MODULE_CONFIG
+
+# Get TTS settings from module configuration
+svg_config = MODULE_CONFIG['generate_infography_video']['functionalities']['video-generator']
+tts_config = svg_config.get('tts', {})
+TTS_ENGINE = tts_config.get('engine', 'gtts')
+TTS_LANG = tts_config.get('lang', 'en')
+TTS_TLD = tts_config.get('tld', 'co.in')
+TTS_CACHE_DIR = tts_config.get('cache_dir', os.path.join(svg_config['cache_dir'], 'tts'))
+TTS_WORKERS = tts_config.get('workers', 4)
+TTS_RETRIES = tts_config.get('retries', 3)
+TTS_BACKOFF = tts_config.get('backoff', 1.0)
+TTS_FALLBACK_ENGINE = tts_config.get('fallback_engine')
+# Engine name -> constructor arguments, e.g. the folder of the phrase bank
+TTS_BACKEND_OPTIONS = tts_config.get('backends', {})
+# Sentence chunking: each chunk is synthesized and cached separately
+TTS_CHUNK_SENTENCES = tts_config.get('chunk_sentences', True)
+TTS_MAX_CHUNK_CHARS = tts_config.get('max_chunk_chars', 200)
+TTS_CROSSFADE = tts_config.get('crossfade', 0.03)
+TTS_CROSSFADE_CURVE = tts_config.get('crossfade_curve', 'equal_power')
+TTS_SAMPLE_RATE = tts_config.get('sample_rate', 24000)
+TTS_CHUNK_PAD = tts_config.get('chunk_pad', 0.08)
+
+# Sentence ends (including "..." pauses) followed by whitespace, and line breaks
+SENTENCE_BREAK = re.compile(r'(?<=[.!?\u2026])\s+|\s*\n\s*')
+# Clause ends inside a sentence
+CLAUSE_BREAK = re.compile(r'(?<=[,;:\u2013\u2014])\s+')
+# Abbreviations whose period does not end a sentence, lowercased without it
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "approx",
+    "inc", "ltd", "co", "corp", "dept", "est", "fig", "no", "vol", "p", "pp",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
 
+# Backends built from engine names, shared by every call
+_backends = {}
 
-def generate_tts(text, out_path):
+
+def resolve_backend(engine=TTS_ENGINE):
     """
-    Generate text-to-speech audio file from input text.
+    Return the backend of an engine, configured from the TTS settings.
     
+    Args:
+        engine (str or TTSBackend): Engine name or backend instance
+        
+    Returns:
+        TTSBackend: The backend
+    """
+    if isinstance(engine, TTSBackend):
+        return engine
+    backend = _backends.get(engine)
+    if backend is None:
+        backend = _backends[engine] = get_backend(engine, **TTS_BACKEND_OPTIONS.get(engine, {}))
+    return backend
+
+
+def tts_key(text, lang=TTS_LANG, tld=TTS_TLD, engine=TTS_ENGINE, speed=1.0):
+    """
+    Return the cache key of a piece of speech.
+
+    Args:
+        text (str): Text to speak
+        lang (str): Language code
+        tld (str): Top-level domain selecting the accent
+        engine (str or TTSBackend): TTS engine
+        speed (float): Speaking rate; 1.0 is normal
+
+    Returns:
+        str: Hex digest identifying the synthesized audio
+    """
+    engine_id = resolve_backend(engine).cache_id
+    payload = "\x1f".join([engine_id, lang, tld, f"{float(speed):.3f}", text.strip()])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def tts_cache_path(text, lang=TTS_LANG, tld=TTS_TLD, engine=TTS_ENGINE, speed=1.0, cache_dir=TTS_CACHE_DIR):
+    """
+    Return where the audio of a piece of speech is cached, whether or not it exists yet.
+
+    Returns:
+        str: Path of the cached audio file
+    """
+    extension = resolve_backend(engine).extension
+    return os.path.join(cache_dir, tts_key(text, lang, tld, engine, speed) + extension)
+
+
+def split_sentences(text, max_chars=TTS_MAX_CHUNK_CHARS):
+    """
+    Split a text into the chunks synthesized separately.
+
+    The text is cut after every sentence and at line breaks, but not after
+    abbreviations ("Mr.", "etc."), initials ("J. Smith") or dotted
+    abbreviations ("D.C.", "e.g."). A sentence longer than max_chars is
+    further cut at commas, semicolons, colons and dashes, with clauses
+    packed back together up to max_chars.
+
+    Args:
+        text (str): Text to speak
+        max_chars (int): Length above which a sentence is split into clauses
+
+    Returns:
+        list: Non-empty chunks in reading order
+    """
+    chunks = []
+    for sentence in _sentences(text.strip()):
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in CLAUSE_BREAK.split(sentence):
+            if current and len(current) + 1 + len(clause) > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def _sentences(text):
+    """Split a text at SENTENCE_BREAK, except after abbreviations and initials."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        before = text[start:match.start()]
+        if "\n" not in match.group() and before.endswith("."):
+            word = before.rsplit(None, 1)[-1].strip("\"'()[]").rstrip(".")
+            if word.lower() in ABBREVIATIONS or "." in word or (len(word) == 1 and word.isalpha()):
+                continue
+        sentences.append(before)
+        start = match.end()
+    sentences.append(text[start:])
+    return sentences
+
+
+def stitched_path(chunk_paths, crossfade=TTS_CROSSFADE, cache_dir=TTS_CACHE_DIR):
+    """
+    Return where the joined audio of some cached chunks is cached.
+
+    Args:
+        chunk_paths (list): Cached audio of the chunks, in order
+        crossfade (float): Crossfade between chunks in seconds
+        cache_dir (str): Folder of the audio cache
+
+    Returns:
+        str: Path of the joined WAV file
+    """
+    names = [os.path.basename(path) for path in chunk_paths]
+    payload = "\x1f".join(["stitch", f"{float(crossfade):.4f}", TTS_CROSSFADE_CURVE, str(TTS_SAMPLE_RATE),
+                           str(TTS_CHUNK_PAD)] + names)
+    return os.path.join(cache_dir, hashlib.sha256(payload.encode("utf-8")).hexdigest() + ".wav")
+
+
+def tts_audio_path(text, chunked=TTS_CHUNK_SENTENCES, crossfade=TTS_CROSSFADE,
+                   fallback_engine=TTS_FALLBACK_ENGINE, **options):
+    """
+    Return where generate_tts_batch() caches the audio of a whole text.
+
+    This is the joined audio of the text's sentences (a WAV file, even for
+    a single sentence) when it is chunked, else the engine's audio of the
+    whole text; it may not exist yet. Like the batch, each piece of speech
+    the main engine has no audio for is looked up under the fallback engine.
+
+    Args:
+        text (str): Text to speak
+        chunked (bool): Whether the text is synthesized sentence by sentence
+        crossfade (float): Crossfade between chunks in seconds
+        fallback_engine (str or TTSBackend, optional): Engine the batch falls back to
+        **options: Further tts_cache_path() arguments (lang, tld, engine, speed, cache_dir)
+
+    Returns:
+        str: Path of the cached audio file
+    """
+    def cached_path(piece):
+        path = tts_cache_path(piece, **options)
+        if (not os.path.exists(path) and fallback_engine is not None
+                and fallback_engine != options.get("engine", TTS_ENGINE)):
+            fallback_path = tts_cache_path(piece, **dict(options, engine=fallback_engine))
+            if os.path.exists(fallback_path):
+                return fallback_path
+        return path
+
+    if not chunked:
+        return cached_path(text)
+    chunk_paths = [cached_path(chunk) for chunk in split_sentences(text)]
+    return stitched_path(chunk_paths, crossfade, options.get("cache_dir", TTS_CACHE_DIR))
+
+
+def synthesize_cached(text, lang=TTS_LANG, tld=TTS_TLD, engine=TTS_ENGINE, speed=1.0,
+                      cache_dir=TTS_CACHE_DIR, synthesize=None, retries=TTS_RETRIES, backoff=TTS_BACKOFF):
+    """
+    Return the cached audio of a piece of speech, synthesizing it if needed.
+
+    Audio is written to a temporary file and moved into place, so an
+    interrupted synthesis never leaves a truncated cache entry.
+
+    Args:
+        text (str): Text to speak
+        lang (str): Language code
+        tld (str): Top-level domain selecting the accent
+        engine (str or TTSBackend): Registered engine name or backend
+        speed (float): Speaking rate; 1.0 is normal
+        cache_dir (str): Folder of the audio cache
+        synthesize (callable, optional): Function used instead of the backend's
+            synthesize(text, out_path, lang, tld, speed); e.g. a stand-in in tests
+        retries (int): Attempts after the first failure; a TTSError raised by
+            the engine (e.g. unsupported text) is final and not retried
+        backoff (float): Delay before the first retry in seconds, doubled after each
+
+    Returns:
+        str: Path of the cached audio file
+
+    Raises:
+        TTSError: If every attempt failed
+    """
+    path = tts_cache_path(text, lang, tld, engine, speed, cache_dir)
+    if os.path.exists(path):
+        return path
+    if synthesize is None:
+        synthesize = resolve_backend(engine).synthesize
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{id(text)}.tmp"
+    for attempt in range(retries + 1):
+        try:
+            synthesize(text, tmp_path, lang, tld, speed)
+            os.replace(tmp_path, path)
+            return path
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            if isinstance(e, TTSError):
+                raise
+            if attempt == retries:
+                raise TTSError(f"TTS failed after {retries + 1} attempts: {e}") from e
+            # Exponential backoff with jitter, so concurrent workers do not retry in step
+            delay = backoff * (2 ** attempt) * (0.5 + random.random())
+            print(f"⚠️  TTS attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def _export(cached_path, out_path):
+    """Make out_path show the cached audio, as a hard link when possible."""
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    if os.path.exists(out_path):
+        if os.path.samefile(cached_path, out_path):
+            return
+        os.remove(out_path)
+    try:
+        os.link(cached_path, out_path)
+    except OSError:
+        shutil.copyfile(cached_path, out_path)
+
+
+def generate_tts_batch(items, workers=TTS_WORKERS, fallback_engine=TTS_FALLBACK_ENGINE,
+                       chunked=TTS_CHUNK_SENTENCES, crossfade=TTS_CROSSFADE, **options):
+    """
+    Synthesize several texts concurrently and write each to its output path.
+
+    With chunking, every sentence of every text is a separate synthesis and
+    cache entry, and each text's audio is the crossfaded join of its
+    sentences, always written as 16-bit WAV. Texts (or sentences) with the same cache key are synthesized
+    once. Those the engine failed on are synthesized with the fallback
+    engine, if any; remaining failures are reported per item instead of
+    stopping the batch.
+
+    Args:
+        items (list): (text, out_path) pairs; out_path may be None to only fill the cache
+        workers (int): Most syntheses running at once
+        fallback_engine (str or TTSBackend, optional): Engine used for texts
+            the main engine failed on
+        chunked (bool): Whether to synthesize texts sentence by sentence
+        crossfade (float): Crossfade between sentences in seconds
+        **options: Further synthesize_cached() arguments (lang, tld, engine,
+            speed, cache_dir, synthesize, retries, backoff)
+
+    Returns:
+        list: For each item, the path holding its audio (out_path, or the
+        cache file when out_path is None), or None if synthesis failed
+    """
+    key_options = {name: options[name] for name in ("lang", "tld", "engine", "speed") if name in options}
+    # Each item's chunks as (cache key, text) pairs
+    plans = [[(tts_key(chunk, **key_options), chunk) for chunk in (split_sentences(text) if chunked else [text])]
+             for text, _ in items]
+    unique = {key: chunk for plan in plans for key, chunk in plan}
+
+    cached = _synthesize_all(unique, workers, options)
+    failed = {key: text for key, text in unique.items() if cached[key] is None}
+    if failed and fallback_engine is not None and fallback_engine != options.get("engine", TTS_ENGINE):
+        name = getattr(fallback_engine, "name", fallback_engine)
+        print(f"↪️  Falling back to {name} for {len(failed)} text(s)")
+        fallback_options = dict(options, engine=fallback_engine)
+        fallback_options.pop("synthesize", None)
+        cached.update(_synthesize_all(failed, workers, fallback_options))
+
+    results = []
+    for plan, (_, out_path) in zip(plans, items):
+        chunk_paths = [cached[key] for key, _ in plan]
+        if not chunk_paths or None in chunk_paths:
+            results.append(None)
+            continue
+        path = chunk_paths[0]
+        if chunked:
+            path = _stitch(chunk_paths, crossfade, options.get("cache_dir", TTS_CACHE_DIR))
+        if path is not None and out_path is not None:
+            _export(path, out_path)
+            path = out_path
+        results.append(path)
+    return results
+
+
+def _stitch(chunk_paths, crossfade, cache_dir):
+    """Return the cached join of some chunk files, joining them if needed; None on failure."""
+    path = stitched_path(chunk_paths, crossfade, cache_dir)
+    if os.path.exists(path):
+        return path
+    try:
+        return stitch_files(chunk_paths, path, rate=TTS_SAMPLE_RATE, crossfade=crossfade, curve=TTS_CROSSFADE_CURVE,
+                            pad=TTS_CHUNK_PAD)
+    except (IOError, ValueError) as e:
+        print(f"❌ Could not join TTS chunks: {e}")
+        return None
+
+
+def _synthesize_all(texts, workers, options):
+    """Synthesize {key: text} on a thread pool; return {key: cached path or None}."""
+    cached = {}
+    with ThreadPoolExecutor(max(1, min(workers, len(texts) or 1)), thread_name_prefix="tts") as pool:
+        futures = {key: pool.submit(synthesize_cached, text, **options) for key, text in texts.items()}
+        for key, future in futures.items():
+            try:
+                cached[key] = future.result()
+            except TTSError as e:
+                print(f"❌ TTS error: {e}")
+                cached[key] = None
+    return cached
+
+
+def generate_tts(text, out_path, **options):
+    """
+    Generate text-to-speech audio file from input text.
+
+    The audio comes from the TTS cache when the same text was synthesized
+    before with the same settings.
+
     Args:
         text (str): Text to convert to speech
         out_path (str): Output file path for the audio file
+        **options: Further synthesize_cached() arguments (lang, tld, engine, speed, ...)
+
+    Returns:
+        str: out_path, or None if synthesis failed
     """
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    
-    try:
-        tts = gTTS(text, slow=False, lang="en", tld="co.in")
-        tts.save(out_path)
+    path = generate_tts_batch([(text, out_path)], workers=1, **options)[0]
+    if path is not None:
         print(f"✅ TTS saved: {out_path}")
-    except Exception as e:
-        print(f"❌ TTS error: {e}")
+    return path
 
 def get_audio_duration(audio_path):
     """
@@ -41,11 +409,8 @@ def get_audio_duration(audio_path):
     """
     try:
         if os.path.exists(audio_path):
-            from moviepy.editor import AudioFileClip
-            audio_clip = AudioFileClip(audio_path)
-            duration = audio_clip.duration
-            audio_clip.close()
-            return duration
+            # Read from the file's headers (and cached), without decoding it
+            return probe_duration(audio_path)
         return None
     except Exception as e:
         print(f"Error getting audio duration: {e}")
@@ -0,0 +1,444 @@
+"""
+Audio PCM Module
+
+This module contains helpers that work on raw audio samples in NumPy: any
+audio file is decoded to float32 PCM by ffmpeg, pieces are joined with
+sample-accurate crossfades, and the result is written back as 16-bit WAV.
+
+prepare_audio() is the single audio preparation step of a block: it decodes
+the file once, applies the volume and speed effects, and caches the
+processed samples as WAV keyed by the input's content and the effect
+settings, returning the duration together with a buffer ready to mix. Speed
+changes use time_stretch(), a WSOLA time-scale modification that keeps the
+pitch of the voice. TimelineMixer places those buffers on the video's
+timeline and renders the whole soundtrack in one pass.
+"""
+
+import os
+import wave
+import hashlib
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+
+def read_pcm(path, rate=24000, channels=1):
+    """
+    Decode an audio file to float32 samples.
+
+    Args:
+        path (str): Audio file in any format ffmpeg reads
+        rate (int): Sample rate to resample to
+        channels (int): Channel count to mix to
+
+    Returns:
+        numpy.ndarray: Samples in [-1, 1] of shape (n, channels)
+
+    Raises:
+        IOError: If ffmpeg cannot decode the file
+    """
+    cmd = [
+        get_setting("FFMPEG_BINARY"), "-v", "error", "-i", path,
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", str(channels), "-ar", str(rate), "-",
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    if result.returncode != 0:
+        raise IOError(f"ffmpeg could not decode {path}: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype="<f4").reshape(-1, channels)
+
+
+def to_pcm16(samples):
+    """
+    Quantize float samples to interleaved 16-bit PCM.
+
+    Args:
+        samples (numpy.ndarray): Samples in [-1, 1] of shape (n,) or (n, channels)
+
+    Returns:
+        numpy.ndarray: Little-endian int16 samples of the same shape
+    """
+    pcm = np.clip(samples * 32767.0, -32768, 32767)
+    return np.rint(pcm, out=pcm).astype("<i2")
+
+
+def write_wav(path, samples, rate):
+    """
+    Write float samples as a 16-bit PCM WAV file.
+
+    Args:
+        path (str): Output path
+        samples (numpy.ndarray): Samples in [-1, 1] of shape (n,) or (n, channels)
+        rate (int): Sample rate
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    pcm = to_pcm16(samples)
+    with wave.open(path, "wb") as out:
+        out.setnchannels(samples.shape[1])
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes(pcm.tobytes())
+
+
+def read_wav(path):
+    """
+    Read a 16-bit PCM WAV file without starting ffmpeg.
+
+    Args:
+        path (str): WAV file, as written by write_wav()
+
+    Returns:
+        tuple: (float32 samples of shape (n, channels), sample rate)
+
+    Raises:
+        ValueError: If the file is not 16-bit PCM
+    """
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+    samples = pcm.reshape(-1, channels).astype(np.float32)
+    samples *= 1.0 / 32768.0
+    return samples, rate
+
+
+def time_stretch(samples, factor, rate, frame=0.03, tolerance=0.01):
+    """
+    Play samples faster (factor > 1) or slower (factor < 1) at the same pitch.
+
+    WSOLA (waveform similarity overlap-add): Hann-windowed frames are read
+    from the input every frame/2 * factor seconds and overlap-added every
+    frame/2 seconds. Each frame's read position is shifted by up to
+    tolerance seconds to where the input best matches the natural
+    continuation of the previous frame, found by FFT cross-correlation, so
+    pitch periods line up instead of beating against each other.
+
+    Args:
+        samples (numpy.ndarray): Samples of shape (n, channels)
+        factor (float): Speed factor
+        rate (int): Sample rate of the samples
+        frame (float): Frame length in seconds; a few pitch periods of speech
+        tolerance (float): Largest shift of a frame's read position in seconds
+
+    Returns:
+        numpy.ndarray: float32 samples of shape (round(n / factor), channels)
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    out_len = int(round(len(samples) / factor))
+    length = max(2, int(frame * rate) // 2 * 2)
+    hop = length // 2
+    if not len(samples):
+        return np.zeros((out_len, samples.shape[1] if samples.ndim == 2 else 1), dtype=np.float32)
+    if len(samples) < length or abs(factor - 1.0) < 1e-3:
+        # Too short to stretch: plain linear resampling
+        positions = np.minimum(np.arange(out_len) * factor, max(len(samples) - 1, 0))
+        return np.stack([np.interp(positions, np.arange(len(samples)), channel)
+                         for channel in samples.T], axis=1).astype(np.float32)
+    tol = max(1, int(tolerance * rate))
+    frames = out_len // hop + 2
+    read_hop = hop * factor
+
+    # Pad so every frame and search region stays inside the signal; the
+    # half frame in front lets the first output samples get full gain
+    front = hop + tol
+    back = max(0, int(frames * read_hop) + 2 * length + 2 * tol - len(samples))
+    padded = np.pad(samples, ((front, back), (0, 0)))
+    mono = padded.mean(axis=1, dtype=np.float64)
+    # Periodic Hann: windows half a frame apart sum to exactly one
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(length) / length)).astype(np.float32)[:, None]
+
+    out = np.zeros((frames * hop + length, samples.shape[1]), dtype=np.float32)
+    region_len = 2 * tol + length
+    shift = 0
+    for k in range(frames):
+        pos = int(round(k * read_hop)) + tol + shift
+        out[k * hop:k * hop + length] += padded[pos:pos + length] * window
+
+        # Where the input would have continued, and where the next frame may start
+        natural = mono[pos + hop:pos + hop + length]
+        start = int(round((k + 1) * read_hop))
+        region = mono[start:start + region_len]
+        if not natural.any() or not region.any():
+            shift = 0
+            continue
+        corr = np.fft.irfft(np.fft.rfft(region) * np.conj(np.fft.rfft(natural, region_len)), region_len)
+        shift = int(np.argmax(corr[:2 * tol + 1])) - tol
+    return out[hop:hop + out_len]
+
+
+def prepare_audio(path, cache_dir, rate=44100, channels=2, volume=1.0, speed=1.0):
+    """
+    Decode an audio file once, apply volume and speed, and cache the result.
+
+    The processed audio is kept as a WAV file named after a hash of the
+    input's bytes and of every setting, so a later run (or another block
+    with the same audio) reads it back without decoding or processing.
+
+    Args:
+        path (str): Audio file in any format ffmpeg reads
+        cache_dir (str): Folder of the processed audio
+        rate (int): Sample rate of the processed audio
+        channels (int): Channel count of the processed audio
+        volume (float): Gain applied to the samples
+        speed (float): Speed factor, see time_stretch()
+
+    Returns:
+        dict: "path" of the processed WAV, its "samples" (float32, shape
+        (n, channels)), their "rate" and the "duration" in seconds
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(f"|fx2|{rate}|{channels}|{float(volume):.4f}|{float(speed):.4f}".encode())
+    out_path = os.path.join(cache_dir, digest.hexdigest() + ".wav")
+
+    if os.path.exists(out_path):
+        samples, rate = read_wav(out_path)
+    else:
+        samples = read_pcm(path, rate, channels)
+        if abs(speed - 1.0) > 1e-3:
+            samples = time_stretch(samples, speed, rate)
+        else:
+            samples = samples.copy()
+        if abs(volume - 1.0) > 1e-3:
+            samples *= volume
+        # Clip like the 16-bit file does, so a cache hit returns the same samples
+        np.clip(samples, -1.0, 1.0, out=samples)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{out_path}.{os.getpid()}.tmp"
+        write_wav(tmp_path, samples, rate)
+        os.replace(tmp_path, out_path)
+    return {"path": out_path, "samples": samples, "rate": rate, "duration": len(samples) / rate}
+
+
+def fade_curves(length, curve="equal_power"):
+    """
+    Return the fade-out and fade-in gains of a crossfade.
+
+    Args:
+        length (int): Overlap in samples
+        curve (str): "linear" (gains sum to 1, for correlated material) or
+            "equal_power" (powers sum to 1, for unrelated material such as speech)
+
+    Returns:
+        tuple: (fade_out, fade_in) float32 arrays of shape (length, 1)
+    """
+    ramp = (np.arange(length, dtype=np.float32) + 0.5) / length
+    if curve == "linear":
+        fade_in = ramp
+        fade_out = 1.0 - ramp
+    elif curve == "equal_power":
+        fade_in = np.sin(ramp * (np.pi / 2))
+        fade_out = np.cos(ramp * (np.pi / 2))
+    else:
+        raise ValueError(f"Unknown crossfade curve '{curve}', expected 'linear' or 'equal_power'")
+    return fade_out.astype(np.float32)[:, None], fade_in.astype(np.float32)[:, None]
+
+
+def crossfade_concat(chunks, rate, crossfade=0.03, curve="equal_power"):
+    """
+    Join audio chunks, overlapping each boundary by a short crossfade.
+
+    The output has exactly sum(len(chunk)) - (overlap per boundary) samples,
+    and every sample outside the overlaps is copied unchanged.
+
+    Args:
+        chunks (list): Arrays of shape (n, channels), all with the same channel count
+        rate (int): Sample rate of the chunks
+        crossfade (float): Overlap per boundary in seconds; 0 butts the chunks together
+        curve (str): Crossfade curve, see fade_curves()
+
+    Returns:
+        numpy.ndarray: Joined float32 samples of shape (n, channels)
+    """
+    chunks = [np.asarray(chunk, dtype=np.float32) for chunk in chunks if len(chunk)]
+    if not chunks:
+        return np.zeros((0, 1), dtype=np.float32)
+    overlap = max(0, int(round(crossfade * rate)))
+
+    # Overlap at each boundary, never longer than either neighbour
+    overlaps = [min(overlap, len(a), len(b)) for a, b in zip(chunks, chunks[1:])]
+    total = sum(len(chunk) for chunk in chunks) - sum(overlaps)
+    out = np.empty((total, chunks[0].shape[1]), dtype=np.float32)
+
+    pos = 0
+    for index, chunk in enumerate(chunks):
+        head = overlaps[index - 1] if index > 0 else 0
+        if head:
+            fade_out, fade_in = fade_curves(head, curve)
+            region = out[pos - head:pos]
+            region *= fade_out
+            region += chunk[:head] * fade_in
+        out[pos:pos + len(chunk) - head] = chunk[head:]
+        pos += len(chunk) - head
+    return out
+
+
+def trim_silence(samples, rate, pad=0.08, threshold=0.01):
+    """
+    Cut the leading and trailing silence of a chunk down to a short pad.
+
+    Args:
+        samples (numpy.ndarray): Samples of shape (n, channels)
+        rate (int): Sample rate
+        pad (float): Silence kept before the first and after the last sound, in seconds
+        threshold (float): Amplitude below which a sample counts as silent
+
+    Returns:
+        numpy.ndarray: A view of the trimmed samples; the input itself when
+        it is entirely silent
+    """
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > threshold) if len(samples) else []
+    if len(loud) == 0:
+        return samples
+    keep = int(pad * rate)
+    return samples[max(0, loud[0] - keep):loud[-1] + 1 + keep]
+
+
+def stitch_files(paths, out_path, rate=24000, channels=1, crossfade=0.03, curve="equal_power", pad=None):
+    """
+    Decode audio files, join them with crossfades and write a WAV file.
+
+    The WAV is written to a temporary file and moved into place.
+
+    Args:
+        paths (list): Audio files in playback order
+        out_path (str): Path of the joined WAV
+        rate (int): Sample rate of the output
+        channels (int): Channel count of the output
+        crossfade (float): Overlap per boundary in seconds
+        curve (str): Crossfade curve, see fade_curves()
+        pad (float, optional): Trim each file's leading and trailing silence
+            to this many seconds before joining, so the pauses between
+            chunks do not depend on how much silence the engine adds; no
+            trimming if None
+
+    Returns:
+        str: out_path
+    """
+    chunks = [read_pcm(path, rate, channels) for path in paths]
+    if pad is not None:
+        chunks = [trim_silence(chunk, rate, pad) for chunk in chunks]
+    joined = crossfade_concat(chunks, rate, crossfade, curve)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    write_wav(tmp_path, joined, rate)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class TimelineMixer:
+    """
+    Mix audio entries placed on a timeline into one soundtrack.
+
+    Entries are NumPy buffers with a start time, gain and fades. The mix is
+    rendered once, window by window, straight into a WAV file (or into one
+    array), instead of being evaluated chunk by chunk through per-clip
+    callbacks at write time.
+    """
+
+    def __init__(self, rate=44100, channels=2):
+        """
+        Initialize the TimelineMixer.
+
+        Args:
+            rate (int): Sample rate of the entries and of the mix
+            channels (int): Channel count of the mix; mono entries are
+                played on every channel
+        """
+        self.rate = rate
+        self.channels = channels
+        self.entries = []
+
+    def add(self, samples, start, gain=1.0, fade_in=0.0, fade_out=0.0):
+        """
+        Place samples on the timeline.
+
+        Args:
+            samples (numpy.ndarray): Samples at the mixer's rate, of shape
+                (n,), (n, 1) or (n, channels)
+            start (float): Start time in seconds, rounded to the nearest sample
+            gain (float): Gain applied to the entry
+            fade_in (float): Linear fade-in at the entry's start in seconds
+            fade_out (float): Linear fade-out at the entry's end in seconds
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        if not len(samples):
+            return
+        if samples.shape[1] not in (1, self.channels):
+            raise ValueError(f"Cannot mix {samples.shape[1]} channels into {self.channels}")
+        self.entries.append({
+            "samples": samples,
+            "offset": int(round(start * self.rate)),
+            "gain": float(gain),
+            "fade_in": min(len(samples), int(round(fade_in * self.rate))),
+            "fade_out": min(len(samples), int(round(fade_out * self.rate))),
+        })
+
+    @property
+    def length(self):
+        """Number of samples up to the end of the last entry."""
+        return max((entry["offset"] + len(entry["samples"]) for entry in self.entries), default=0)
+
+    def render(self, start=0, stop=None):
+        """
+        Mix the samples from start to stop.
+
+        Args:
+            start (int): First sample of the window
+            stop (int, optional): End of the window; the timeline's length if None
+
+        Returns:
+            numpy.ndarray: float32 samples of shape (stop - start, channels),
+            clipped to [-1, 1]; silence where no entry plays
+        """
+        if stop is None:
+            stop = self.length
+        out = np.zeros((max(0, stop - start), self.channels), dtype=np.float32)
+        for entry in self.entries:
+            samples = entry["samples"]
+            lo = max(start, entry["offset"])
+            hi = min(stop, entry["offset"] + len(samples))
+            if lo >= hi:
+                continue
+            piece = samples[lo - entry["offset"]:hi - entry["offset"]] * entry["gain"]
+            # Fade gains at the piece's positions within the entry
+            index = np.arange(lo - entry["offset"], hi - entry["offset"])
+            if entry["fade_in"]:
+                piece *= np.minimum(1.0, (index + 0.5) / entry["fade_in"]).astype(np.float32)[:, None]
+            if entry["fade_out"]:
+                piece *= np.minimum(1.0, (len(samples) - index - 0.5) / entry["fade_out"]).astype(np.float32)[:, None]
+            out[lo - start:hi - start] += piece
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
+
+    def write_wav(self, path, length=None, window=10.0):
+        """
+        Render the mix into a 16-bit PCM WAV file, one window at a time.
+
+        Args:
+            path (str): Output path
+            length (int, optional): Samples to write, padding or cutting the
+                timeline; the timeline's length if None
+            window (float): Seconds mixed per step, bounding the memory used
+
+        Returns:
+            str: path
+        """
+        if length is None:
+            length = self.length
+        step = max(1, int(window * self.rate))
+        with wave.open(path, "wb") as out:
+            out.setnchannels(self.channels)
+            out.setsampwidth(2)
+            out.setframerate(self.rate)
+            for start in range(0, length, step):
+                mix = self.render(start, min(length, start + step))
+                pcm = np.rint(mix * 32767.0).astype("<i2")
+                out.writeframes(pcm.tobytes())
+        return path
@@ -0,0 +1,249 @@
+"""
+Audio Probe Module
+
+This module contains a lightweight audio duration probe. WAV files are
+measured from their RIFF header and MP3 files from their frame headers (or
+their Xing/Info/VBRI tag), without decoding any audio or starting ffmpeg.
+Other formats, and files the parsers do not understand, fall back to
+ffprobe. Results are cached by path, modification time and size, so asking
+again for an unchanged file costs a stat() call.
+"""
+
+import os
+import re
+import shutil
+import struct
+import threading
+import subprocess
+
+from moviepy.config import get_setting
+
+
+# MPEG audio bitrates in kbps, by (MPEG-1?, layer)
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Sample rates in Hz, by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# Bytes read at a time while looking for the first MP3 frame
+_SCAN_WINDOW = 4096
+
+# (path, mtime_ns, size) -> duration in seconds
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def wav_duration(path):
+    """
+    Return the duration of a WAV file from its header.
+
+    Args:
+        path (str): WAV file
+
+    Returns:
+        float: Duration in seconds, or None if the file is not a readable WAV
+    """
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+        byte_rate = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(size)
+                if len(fmt) < 16:
+                    return None
+                byte_rate = struct.unpack("<I", fmt[8:12])[0]
+                if size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if not byte_rate:
+                    return None
+                # Streamed WAVs leave the size unset; the data then runs to the end of the file
+                available = os.fstat(f.fileno()).st_size - f.tell()
+                if size in (0, 0xFFFFFFFF) or size > available:
+                    size = available
+                return size / byte_rate
+            else:
+                f.seek(size + size % 2, os.SEEK_CUR)
+
+
+def _mp3_frame(header):
+    """
+    Parse a 4-byte MPEG audio frame header.
+
+    Returns:
+        tuple: (frame length in bytes, samples per frame, sample rate, MPEG-1?,
+        mono?), or None if the bytes are not a valid frame header
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = 4 - ((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    mono = (header[3] >> 6) == 3
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate, mpeg1, mono
+    samples = 1152 if layer == 2 or mpeg1 else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate, mpeg1, mono
+
+
+def _read_at(f, pos, size):
+    """Read size bytes of a file from offset pos."""
+    f.seek(pos)
+    return f.read(size)
+
+
+def mp3_duration(path):
+    """
+    Return the duration of an MP3 file from its frame headers.
+
+    Only headers are read: the ID3 tags, the start of the first frame and,
+    unless a Xing/Info or VBRI tag gives the frame count directly, the
+    4-byte header of every frame, reached by seeking from one to the next.
+    Walking the frames is exact for CBR and VBR files alike.
+
+    Args:
+        path (str): MP3 file
+
+    Returns:
+        float: Duration in seconds, or None if no MPEG audio frame was found
+    """
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        # An ID3v1 tag takes the last 128 bytes
+        if end >= 128 and _read_at(f, end - 128, 3) == b"TAG":
+            end -= 128
+
+        # Skip an ID3v2 tag; its size is stored as a 28-bit "synchsafe" integer
+        pos = 0
+        header = _read_at(f, 0, 10)
+        if header[:3] == b"ID3" and len(header) == 10:
+            size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+            pos = 10 + size + (10 if header[5] & 0x10 else 0)
+
+        # First frame: the next sync word followed by another valid frame
+        frame = None
+        while frame is None and pos < end - 4:
+            window = _read_at(f, pos, min(_SCAN_WINDOW, end - pos))
+            found = window.find(b"\xff")
+            if found < 0:
+                pos += len(window)
+                continue
+            pos += found
+            frame = _mp3_frame(_read_at(f, pos, 4))
+            if frame is not None and pos + frame[0] < end and _mp3_frame(_read_at(f, pos + frame[0], 4)) is None:
+                frame = None
+            if frame is None:
+                pos += 1
+        if frame is None:
+            return None
+        length, samples, sample_rate, mpeg1, mono = frame
+
+        # Xing/Info tag after the side information of the first frame, or VBRI at a fixed offset
+        first = _read_at(f, pos, 64)
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        tag = 4 + side_info
+        if first[tag:tag + 4] in (b"Xing", b"Info") and len(first) >= tag + 12 and first[tag + 7] & 0x01:
+            frames = struct.unpack(">I", first[tag + 8:tag + 12])[0]
+            return frames * samples / sample_rate
+        if first[36:40] == b"VBRI" and len(first) >= 54:
+            frames = struct.unpack(">I", first[50:54])[0]
+            return frames * samples / sample_rate
+
+        total = 0
+        while pos + 4 <= end:
+            frame = _mp3_frame(_read_at(f, pos, 4))
+            if frame is None:
+                break
+            total += frame[1] / frame[2]
+            pos += frame[0]
+        return total
+
+
+def ffprobe_duration(path):
+    """
+    Return the duration of any media file reported by ffprobe.
+
+    Uses ffprobe when it is installed, else the header that ffmpeg prints
+    for an input file (moviepy's bundled ffmpeg has no ffprobe).
+
+    Args:
+        path (str): Media file
+
+    Returns:
+        float: Duration in seconds, or None if it could not be read
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        cmd = [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return None
+    result = subprocess.run([get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", path],
+                            capture_output=True, text=True)
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_duration(path):
+    """
+    Return the duration of an audio file, from the cache when it is unchanged.
+
+    The format is recognized from the file's first bytes, not its name, so
+    e.g. MP3 data saved as .wav is still measured from its headers.
+
+    Args:
+        path (str): Audio file
+
+    Returns:
+        float: Duration in seconds, or None if the file is missing or unreadable
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+
+    with open(path, "rb") as f:
+        magic = f.read(12)
+    duration = None
+    try:
+        if magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+            duration = wav_duration(path)
+        elif magic[:3] == b"ID3" or (len(magic) >= 2 and magic[0] == 0xFF and magic[1] & 0xE0 == 0xE0):
+            duration = mp3_duration(path)
+    except (OSError, struct.error, IndexError):
+        duration = None
+    if duration is None:
+        duration = ffprobe_duration(path)
+
+    if duration is not None:
+        with _cache_lock:
+            _cache[key] = duration
+    return duration
@@ -0,0 +1,231 @@
+"""
+CPU Budget Module
+
+This module contains a CPU allocator shared by the video generators. It
+works out how many cores the process may really use (CPU affinity and the
+cgroup quota of a container, not the host's core count), splits them
+between frame render workers and ffmpeg encoder threads in proportion to
+the CPU time each stage took per frame on earlier runs, and limits how many
+render jobs run at once on a shared host.
+"""
+
+import os
+import json
+import time
+import errno
+import resource
+import contextlib
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no job limit
+    fcntl = None
+
+
+# Share of the CPU used by rendering when nothing has been measured yet
+DEFAULT_RENDER_SHARE = 0.5
+
+# Weight of the newest run in the stored per-frame costs
+PROFILE_SMOOTHING = 0.5
+
+# Folder holding one lock file per job slot, shared by every job on the host
+DEFAULT_LOCK_DIR = os.path.join(tempfile.gettempdir(), "infography_jobs")
+
+
+def _cgroup_cpu_limit():
+    """
+    Return the CPU quota of the current cgroup in cores.
+
+    Returns:
+        float: Allowed cores, or None without a quota (or off Linux)
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max" and int(period) > 0:
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1: quota of -1 means unlimited
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def usable_cpus():
+    """
+    Return the number of cores this process can actually use.
+
+    Takes the smallest of the host core count, the CPU affinity mask and
+    the cgroup CPU quota (rounded down, at least one core).
+
+    Returns:
+        int: Usable cores
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, int(limit))
+    return max(1, cpus)
+
+
+def cpu_seconds():
+    """
+    Return the CPU time used so far by this process and its reaped children.
+
+    Returns:
+        tuple: (own seconds, children seconds), user plus system time
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+class CpuBudget:
+    """
+    Split a job's share of the usable cores between rendering and encoding.
+
+    The split follows the measured CPU seconds per frame of both stages,
+    kept in a small JSON profile and updated after every run, so a template
+    whose frames are cheap to compose hands more cores to x264 and the other
+    way round.
+    """
+
+    def __init__(self, cpus=None, max_jobs=1, profile_path=None):
+        """
+        Initialize the CpuBudget.
+
+        Args:
+            cpus (int, optional): Cores to share out; detected with usable_cpus() if None
+            max_jobs (int): Render jobs that may run at once; each gets an equal share
+            profile_path (str, optional): JSON file storing the measured stage
+                costs; the default split is used and nothing is stored if None
+        """
+        self.cpus = cpus or usable_cpus()
+        self.max_jobs = max(1, max_jobs)
+        self.share = max(1, self.cpus // self.max_jobs)
+        self.profile_path = profile_path
+        self.profile = self._load_profile()
+
+    def _load_profile(self):
+        """Read the stored stage costs, ignoring a missing or damaged file."""
+        if not self.profile_path:
+            return {}
+        try:
+            with open(self.profile_path) as f:
+                profile = json.load(f)
+            return profile if isinstance(profile, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def render_share(self):
+        """Fraction of the CPU time per frame spent rendering, from the profile."""
+        render = self.profile.get("render_cpu_per_frame")
+        encode = self.profile.get("encode_cpu_per_frame")
+        if not render or not encode:
+            return DEFAULT_RENDER_SHARE
+        return render / (render + encode)
+
+    def split(self, max_workers=None):
+        """
+        Divide the job's cores between render workers and encoder threads.
+
+        Args:
+            max_workers (int, optional): Most render workers the job can use,
+                e.g. 1 for generators that render on the main thread
+
+        Returns:
+            tuple: (render workers, encoder threads), each at least 1
+        """
+        workers = round(self.share * self.render_share)
+        workers = min(workers, self.share - 1, max_workers or self.share)
+        workers = max(1, workers)
+        threads = max(1, self.share - workers)
+        return workers, threads
+
+    def record(self, render_seconds, encode_seconds, frames):
+        """
+        Fold one run's measured CPU time into the stored profile.
+
+        Args:
+            render_seconds (float): CPU seconds spent composing frames
+            encode_seconds (float): CPU seconds spent by ffmpeg
+            frames (int): Frames written in the run
+        """
+        if frames <= 0 or render_seconds <= 0 or encode_seconds <= 0:
+            return
+        for key, seconds in (("render_cpu_per_frame", render_seconds), ("encode_cpu_per_frame", encode_seconds)):
+            value = seconds / frames
+            previous = self.profile.get(key)
+            if previous:
+                value = PROFILE_SMOOTHING * value + (1 - PROFILE_SMOOTHING) * previous
+            self.profile[key] = value
+        if not self.profile_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.profile_path)), exist_ok=True)
+            tmp_path = f"{self.profile_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.profile, f, indent=2)
+            os.replace(tmp_path, self.profile_path)
+        except OSError as e:
+            print(f"⚠️  Could not save CPU profile to {self.profile_path}: {e}")
+
+
+@contextlib.contextmanager
+def job_slot(max_jobs=1, lock_dir=DEFAULT_LOCK_DIR, poll_interval=1.0):
+    """
+    Wait for one of max_jobs host-wide job slots and hold it.
+
+    Slots are lock files under lock_dir held with flock(), so they are freed
+    even if a job crashes. Jobs sharing a host must use the same lock_dir.
+
+    Args:
+        max_jobs (int): Render jobs allowed to run at once; no limit if 0 or None
+        lock_dir (str): Folder of the slot lock files
+        poll_interval (float): Seconds between attempts while every slot is taken
+
+    Yields:
+        int: Index of the held slot, or None when jobs are not limited
+    """
+    if not max_jobs or fcntl is None:
+        yield None
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    waiting = False
+    while True:
+        for slot in range(max_jobs):
+            handle = open(os.path.join(lock_dir, f"slot-{slot}.lock"), "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError as e:
+                handle.close()
+                if e.errno not in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+                    raise
+                continue
+            try:
+                yield slot
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+            return
+        if not waiting:
+            print(f"⏳ Waiting for a free render slot ({max_jobs} jobs already running)...")
+            waiting = True
+        time.sleep(poll_interval)
@@ -0,0 +1,340 @@
+"""
+FFmpeg Writer Module
+
+This module contains a video writer that pipes raw RGB frames straight to a
+long-lived ffmpeg process. Frames are handed over through a bounded queue to
+a dedicated encode thread, so composing the next frame overlaps with
+encoding the previous ones, and encoder settings (preset, crf, pix_fmt,
+GOP size) are passed to ffmpeg directly.
+
+Frames identical to the previous one are not composed or copied again; the
+encode thread re-sends the last frame instead. With `vfr=True` ffmpeg also
+drops those repeats before encoding and writes a variable-frame-rate file.
+"""
+
+import os
+import queue
+import functools
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+from .cpu_budget import cpu_seconds
+from .frame_changes import FrameChangeTracker
+from .frame_producer import REPEAT
+
+
+class FFmpegPipeWriter:
+    """
+    Encode raw RGB frames through an ffmpeg pipe fed by a background thread.
+
+    write_frame() copies the frame into a bounded queue and returns; the
+    encode thread drains the queue into ffmpeg's stdin. When the queue is
+    full, write_frame() blocks, which keeps memory bounded if encoding is
+    slower than rendering. repeat_last() repeats the previous frame without
+    copying it.
+    """
+
+    def __init__(self, output_file, size, fps=24, codec="libx264", preset="medium", crf=23,
+                 pix_fmt="yuv420p", gop=None, threads=0, audio_file=None, audio_codec="aac",
+                 audio_bitrate=None, queue_size=8, vfr=False, extra_args=None):
+        """
+        Initialize the FFmpegPipeWriter and start ffmpeg and the encode thread.
+
+        Args:
+            output_file (str): Path of the video file to write
+            size (tuple): Size of the video frames as (width, height)
+            fps (float): Frames per second of the output video
+            codec (str): Video codec passed to ffmpeg
+            preset (str, optional): Encoder preset, e.g. "ultrafast" or "medium"
+            crf (int, optional): Constant rate factor; lower is higher quality
+            pix_fmt (str): Output pixel format
+            gop (int, optional): Keyframe interval in frames; ffmpeg's default if None
+            threads (int): Encoder threads; 0 lets ffmpeg decide
+            audio_file (str, optional): Audio file muxed into the output
+            audio_codec (str): Audio codec used when audio_file is given
+            audio_bitrate (str, optional): Audio bitrate such as "192k"
+            queue_size (int): Number of frames that may wait for the encoder
+            vfr (bool): Drop repeated frames in ffmpeg and write variable frame rate.
+                A trailing still stretch keeps one frame per second, so the
+                video track may end up to a second before the audio
+            extra_args (list, optional): Further ffmpeg output arguments
+        """
+        self.output_file = output_file
+        self.size = (int(size[0]), int(size[1]))
+        self.fps = fps
+        self.frames_written = 0
+        self.frames_repeated = 0
+        # CPU seconds ffmpeg used, known once the writer is closed
+        self.encode_cpu_seconds = None
+
+        cmd = [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-vcodec", "rawvideo",
+            "-s", f"{self.size[0]}x{self.size[1]}", "-pix_fmt", "rgb24",
+            "-r", f"{fps:.05f}", "-i", "-",
+        ]
+        if audio_file:
+            cmd += ["-i", audio_file]
+        cmd += ["-c:v", codec]
+        if preset:
+            cmd += ["-preset", preset]
+        if crf is not None:
+            cmd += ["-crf", str(crf)]
+        if gop:
+            cmd += ["-g", str(gop)]
+        if threads is not None:
+            cmd += ["-threads", str(threads)]
+        cmd += ["-pix_fmt", pix_fmt]
+        if vfr:
+            # Drop exact repeats, but keep at least one frame per second
+            cmd += ["-vf", f"mpdecimate=hi=0:lo=0:frac=0:max={max(1, round(fps))}", "-fps_mode", "vfr"]
+        if audio_file:
+            cmd += ["-c:a", audio_codec]
+            if audio_bitrate:
+                cmd += ["-b:a", audio_bitrate]
+            if not vfr:
+                cmd += ["-shortest"]
+        cmd += list(extra_args or [])
+        cmd.append(output_file)
+
+        out_dir = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(out_dir, exist_ok=True)
+        self._log = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log)
+
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._last = None
+        self._last_release = None
+        # Frame copies already sent to ffmpeg, reused by write_frame()
+        self._spare = []
+        self._repeats = 0
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._encode_loop, name="ffmpeg-writer", daemon=True)
+        self._thread.start()
+
+    def _encode_loop(self):
+        """Drain the frame queue into ffmpeg until the end-of-stream marker."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame, count, release = item
+            if self._error is not None:
+                if release is not None:
+                    release()
+                continue
+            try:
+                data = memoryview(frame)
+                for _ in range(count):
+                    self._proc.stdin.write(data)
+            except (BrokenPipeError, OSError) as e:
+                self._error = e
+            finally:
+                if release is not None:
+                    release()
+
+    def write_frame(self, frame, copy=True, release=None):
+        """
+        Queue one RGB frame for encoding.
+
+        Args:
+            frame (numpy.ndarray): RGB frame of shape (height, width, 3)
+            copy (bool): Copy the frame so the caller may reuse its buffer right
+                away. Copies go into buffers recycled from earlier frames.
+                Pass False only for frames nobody will modify.
+            release (callable, optional): Called from the encode thread once
+                the frame (and any repeat of it) has been sent to ffmpeg
+        """
+        self._raise_if_failed()
+        frame = np.asarray(frame)
+        shape = (self.size[1], self.size[0], 3)
+        if frame.shape != shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match writer size {self.size}")
+        if copy:
+            # Copy into a recycled buffer; it comes back once ffmpeg has it
+            owned = self._spare.pop() if self._spare else np.empty(shape, dtype=np.uint8)
+            np.copyto(owned, frame, casting="unsafe")
+            if release is not None:
+                release()
+            frame, release = owned, functools.partial(self._spare.append, owned)
+        else:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        self._flush_repeats(final=True)
+        self._queue.put((frame, 1, None))
+        self._last = frame
+        self._last_release = release
+        self.frames_written += 1
+
+    def repeat_last(self, count=1):
+        """
+        Write the previous frame again.
+
+        Repeats are batched and handed to the encode thread together with
+        the next frame, so a static stretch costs one queue entry.
+
+        Args:
+            count (int): Number of times to repeat the frame
+        """
+        if self._last is None:
+            raise ValueError("No frame to repeat yet")
+        self._repeats += count
+        self.frames_written += count
+        self.frames_repeated += count
+
+    def _flush_repeats(self, final=False):
+        """Hand pending repeats to the encode thread; release the frame if final."""
+        release = self._last_release if final else None
+        if self._repeats or release is not None:
+            self._queue.put((self._last, self._repeats, release))
+            self._repeats = 0
+        if final:
+            self._last_release = None
+
+    def write_clip(self, clip, producer=None):
+        """
+        Render every frame of a clip into the writer.
+
+        Frames that a FrameChangeTracker reports as identical to the
+        previous one are repeated instead of being rendered or copied.
+
+        Args:
+            clip (VideoClip): Clip to render at the writer's frame rate
+            producer (FrameProducer, optional): Renders the frames in parallel
+                when the clip supports it
+
+        Returns:
+            int: Number of frames written for this clip
+        """
+        n_frames = int(clip.duration * self.fps)
+        if producer is not None and producer.can_render(clip):
+            for frame, release in producer.frames(clip, self.fps):
+                if frame is REPEAT and self._last is not None:
+                    self.repeat_last()
+                else:
+                    self.write_frame(frame, copy=False, release=release)
+            return n_frames
+
+        tracker = FrameChangeTracker(clip)
+        for i in range(n_frames):
+            t = i / self.fps
+            if tracker.is_repeat(t) and self._last is not None:
+                self.repeat_last()
+                continue
+            frame = clip.get_frame(t)
+            if self._last is not None and tracker.rendered_unchanged():
+                self.repeat_last()
+            else:
+                self.write_frame(frame)
+        return n_frames
+
+    def close(self):
+        """Flush queued frames, wait for ffmpeg to finish and check its exit status."""
+        if self._closed:
+            return
+        self._flush_repeats(final=True)
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._last = None
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        children_before = cpu_seconds()[1]
+        returncode = self._proc.wait()
+        self.encode_cpu_seconds = cpu_seconds()[1] - children_before
+        log = self._read_log()
+        if returncode != 0 or self._error is not None:
+            raise IOError(f"ffmpeg failed writing {self.output_file} (exit code {returncode}): {log or self._error}")
+
+    def abort(self):
+        """
+        Stop ffmpeg without waiting for queued frames, e.g. after an error.
+
+        Returns:
+            str: Whatever ffmpeg reported on its error output
+        """
+        if self._closed:
+            return ""
+        self._closed = True
+        self._proc.kill()
+        self._error = self._error or IOError("writer aborted")
+        self._queue.put(None)
+        self._thread.join()
+        self._last = None
+        self._proc.wait()
+        return self._read_log()
+
+    def _read_log(self):
+        """Return ffmpeg's error output and release the log file."""
+        self._log.seek(0)
+        log = self._log.read().decode(errors="replace").strip()
+        self._log.close()
+        return log
+
+    def _raise_if_failed(self):
+        if self._closed:
+            raise IOError(f"Writer for {self.output_file} is closed")
+        if self._error is not None:
+            error = self._error
+            log = self.abort()
+            raise IOError(f"ffmpeg stopped accepting frames for {self.output_file}: {log or error}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_clip(clip, output_file, fps=24, audio=True, audio_fps=44100, audio_codec="aac",
+               audio_bitrate=None, audio_file=None, **settings):
+    """
+    Write a MoviePy clip through an FFmpegPipeWriter.
+
+    This is a drop-in replacement for clip.write_videofile(): the audio track,
+    if any, is rendered to a temporary WAV first and muxed by the same ffmpeg
+    process that encodes the frames.
+
+    Args:
+        clip (VideoClip): Clip to write
+        output_file (str): Path of the video file
+        fps (float): Frames per second of the output video
+        audio (bool): Whether to write the clip's audio track
+        audio_fps (int): Sample rate of the audio track
+        audio_codec (str): Audio codec for the output file
+        audio_bitrate (str, optional): Audio bitrate such as "192k"
+        audio_file (str, optional): Soundtrack already mixed into one file
+            (e.g. by a TimelineMixer), muxed as is instead of the clip's audio
+        **settings: Encoder settings passed to FFmpegPipeWriter
+            (codec, preset, crf, pix_fmt, gop, threads, queue_size)
+
+    Returns:
+        int: Number of frames written
+    """
+    tmp_dir = None
+    if not audio:
+        audio_file = None
+    try:
+        if audio and audio_file is None and clip.audio is not None:
+            tmp_dir = tempfile.mkdtemp(prefix=".audio_", dir=os.path.dirname(os.path.abspath(output_file)))
+            audio_file = os.path.join(tmp_dir, "audio.wav")
+            clip.audio.write_audiofile(audio_file, fps=audio_fps, nbytes=2, codec="pcm_s16le", logger=None)
+
+        with FFmpegPipeWriter(output_file, clip.size, fps=fps, audio_file=audio_file,
+                              audio_codec=audio_codec, audio_bitrate=audio_bitrate, **settings) as writer:
+            return writer.write_clip(clip)
+    finally:
+        if tmp_dir is not None:
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
@@ -0,0 +1,113 @@
+"""
+Frame Changes Module
+
+This module contains a change tracker used by the video writers to find
+frames identical to the previous one, so they are repeated instead of being
+composed and copied again.
+
+Two sources of information are used:
+
+- clips built on a DamageCompositor expose it as `clip.compositor`, and its
+  `changed` flag tells after each frame whether anything was redrawn;
+- plain MoviePy trees made only of still parts (ImageClips, TextClips and
+  CompositeVideoClips of them, e.g. hold and pause captions over an image
+  background) get a signature of what is on screen at time t. When the
+  signature matches the previous frame's, the frame is not rendered at all.
+"""
+
+import numpy as np
+from moviepy.video.VideoClip import ImageClip
+from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
+
+
+# Code object of CompositeVideoClip's own frame function. Filters such as
+# fadein or resize replace it, and such clips are treated as animated.
+_COMPOSITE_FRAME_CODE = CompositeVideoClip(
+    [ImageClip(np.zeros((1, 1, 3), dtype=np.uint8)).set_duration(1)]
+).make_frame.__code__
+
+
+class FrameChangeTracker:
+    """
+    Tell whether a clip's next frame can be taken from the previous one.
+    """
+
+    def __init__(self, clip):
+        """
+        Initialize the FrameChangeTracker.
+
+        Args:
+            clip (VideoClip): Clip whose frames are about to be written in order
+        """
+        self.clip = clip
+        self.compositor = getattr(clip, "compositor", None)
+        self._last_signature = None
+        self._rendered = False
+
+    def is_repeat(self, t):
+        """
+        Return whether the frame at t is known to equal the previous frame
+        without rendering it.
+
+        Args:
+            t (float): Time of the frame in seconds
+
+        Returns:
+            bool: True if the previous frame can be repeated
+        """
+        if self.compositor is not None:
+            return False
+        signature = still_signature(self.clip, t)
+        repeat = signature is not None and signature == self._last_signature
+        self._last_signature = signature
+        return repeat
+
+    def rendered_unchanged(self):
+        """
+        Return whether the frame just rendered is reported identical to the
+        previous frame rendered through this tracker.
+
+        The first frame never is: the compositor may have been called before
+        (MoviePy renders frame 0 to learn a clip's size), and the frame before
+        it in the video belongs to another clip.
+        """
+        first = not self._rendered
+        self._rendered = True
+        return not first and self.compositor is not None and not self.compositor.changed
+
+
+def still_signature(clip, t):
+    """
+    Describe what a still clip tree shows at time t.
+
+    Args:
+        clip (VideoClip): Clip to inspect
+        t (float): Time in the clip's own timeline
+
+    Returns:
+        tuple: Hashable description of the frame, or None if any part of the
+        tree may be animated
+    """
+    if isinstance(clip, ImageClip):
+        signature = ("image", id(clip.img))
+    elif isinstance(clip, CompositeVideoClip) and clip.make_frame.__code__ is _COMPOSITE_FRAME_CODE:
+        bg = still_signature(clip.bg, t)
+        if bg is None:
+            return None
+        children = []
+        for child in clip.playing_clips(t):
+            child_t = t - child.start
+            child_signature = still_signature(child, child_t)
+            if child_signature is None:
+                return None
+            children.append((id(child), child.pos(child_t), child_signature))
+        signature = ("composite", bg, tuple(children))
+    else:
+        return None
+
+    if clip.mask is not None:
+        mask = still_signature(clip.mask, t)
+        if mask is None:
+            return None
+        signature += (mask,)
+    return signature
@@ -0,0 +1,247 @@
+"""
+Frame Producer Module
+
+This module contains a parallel frame producer. Frame indices of a clip are
+split into short consecutive chunks and rendered by a thread or process
+pool; finished chunks wait in a bounded reorder buffer and are handed to the
+writer strictly in order.
+
+Clips are not safe to render from several workers at once (compositors reuse
+their buffers), so a clip takes part only if it carries a `factory`
+attribute: a function returning an independent copy of the clip. Each
+worker calls it once per clip and renders its chunks from its own copy.
+
+Process workers return frames through a SharedFrameRing: only slot indices
+are pickled, and a frame falls back to pickling only when every slot is busy.
+The ring is sized from a byte budget and the free space of /dev/shm, so a
+large canvas or many producers cannot exhaust shared memory.
+"""
+
+import os
+import shutil
+import functools
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .cpu_budget import usable_cpus
+from .frame_changes import FrameChangeTracker
+from .frame_ring import SharedFrameRing
+
+
+# Marker for a frame identical to the one before it
+REPEAT = None
+
+# Shared-memory mount backing multiprocessing.shared_memory on Linux
+SHM_DIR = "/dev/shm"
+
+# Per-process state of forked workers
+_process_factory = None
+_process_ring = None
+_process_copies = {}
+_clip_keys = itertools.count()
+
+
+class FrameProducer:
+    """
+    Render the frames of parallelizable clips on a pool of workers.
+    """
+
+    def __init__(self, workers=None, mode="thread", chunk_size=8, max_pending=None, ring_slots=None,
+                 ring_budget_mb=128):
+        """
+        Initialize the FrameProducer.
+
+        Args:
+            workers (int, optional): Number of workers; the usable cores if None
+            mode (str): "thread" or "process". Processes are forked, so
+                factories need not be picklable (Linux/macOS only)
+            chunk_size (int): Consecutive frames rendered per task; repeats
+                are only detected inside a chunk
+            max_pending (int, optional): Chunks rendered ahead of the writer
+                (the reorder buffer size); twice the worker count if None
+            ring_slots (int, optional): Shared-memory frame slots in process
+                mode; one per frame of the reorder buffer if None. Always
+                capped by ring_budget_mb and half the free space of /dev/shm
+            ring_budget_mb (float): Most shared memory the frame ring may use
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown producer mode '{mode}', expected 'thread' or 'process'")
+        self.workers = max(1, workers or usable_cpus())
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or 2 * self.workers
+        self.ring_slots = ring_slots or self.max_pending * self.chunk_size
+        self.ring_budget = int(ring_budget_mb * 1024 * 1024)
+        self._thread_pool = None
+        self._ring = None
+        # Frame shape the ring was last sized for, so a zero-slot ring is not re-sized per clip
+        self._ring_shape = None
+        # Worker copies of the clip being rendered, keyed by (clip key, thread id)
+        self._copies = {}
+
+    def can_render(self, clip):
+        """Return whether a clip can be split across workers."""
+        return self.workers > 1 and callable(getattr(clip, "factory", None))
+
+    def frames(self, clip, fps):
+        """
+        Yield the frames of a clip in order.
+
+        Args:
+            clip (VideoClip): Clip with a `factory` attribute
+            fps (float): Frame rate to render at
+
+        Yields:
+            tuple: (frame, release) for each frame. frame is REPEAT when it
+            equals the previous one. Otherwise it must not be modified, and
+            release, when not None, must be called once the frame is consumed.
+        """
+        n_frames = int(clip.duration * fps)
+        chunks = [(start, min(n_frames, start + self.chunk_size))
+                  for start in range(0, n_frames, self.chunk_size)]
+        key = next(_clip_keys)
+
+        if self.mode == "process":
+            # A fresh fork per clip inherits the factory without pickling it
+            ring = self._get_ring((clip.h, clip.w, 3))
+            context = multiprocessing.get_context("fork")
+            pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                       initializer=_init_process, initargs=(clip.factory, ring))
+            submit = lambda start, stop: pool.submit(_render_chunk, None, None, key, start, stop, fps)
+        else:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.workers, thread_name_prefix="frame-producer")
+            pool = None
+            submit = lambda start, stop: self._thread_pool.submit(
+                _render_chunk, clip.factory, self._copies, key, start, stop, fps)
+
+        # Futures are consumed in submission order: the deque is the reorder buffer
+        pending = deque()
+        try:
+            next_chunk = 0
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < self.max_pending:
+                    pending.append(submit(*chunks[next_chunk]))
+                    next_chunk += 1
+                for frame in pending.popleft().result():
+                    if isinstance(frame, int):
+                        yield self._ring.frame(frame), functools.partial(self._ring.release, frame)
+                    else:
+                        yield frame, None
+        finally:
+            for future in pending:
+                future.cancel()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            else:
+                wait(pending)
+                for copy_key in [k for k in self._copies if k[0] == key]:
+                    del self._copies[copy_key]
+
+    def _get_ring(self, frame_shape):
+        """
+        Return the shared frame ring, reallocating it for a new frame shape.
+
+        Returns:
+            SharedFrameRing: The ring, or None when not even one frame fits the
+            budget; workers then return every frame pickled
+        """
+        if self._ring is not None and self._ring.frame_shape != frame_shape:
+            self._ring.close()
+            self._ring = None
+        if self._ring is None and self._ring_shape != frame_shape:
+            self._ring_shape = frame_shape
+            slots = self.ring_size(frame_shape)
+            if slots:
+                self._ring = SharedFrameRing(frame_shape, slots)
+        return self._ring
+
+    def ring_size(self, frame_shape):
+        """
+        Return how many frame slots the shared ring may hold.
+
+        Args:
+            frame_shape (tuple): Shape of one frame as (height, width, 3)
+
+        Returns:
+            int: Slots within the byte budget and half the free shared memory
+        """
+        frame_bytes = int(np.prod(frame_shape))
+        budget = self.ring_budget
+        if os.path.isdir(SHM_DIR):
+            budget = min(budget, shutil.disk_usage(SHM_DIR).free // 2)
+        slots = min(self.ring_slots, budget // frame_bytes)
+        if slots < self.ring_slots:
+            print(f"⚠️ Shared frame ring limited to {slots} of {self.ring_slots} frames "
+                  f"({budget / 2**20:.0f} MB); other frames are pickled")
+        return max(0, slots)
+
+    def close(self):
+        """Stop the thread pool and free the shared frame ring."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        self._ring_shape = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _init_process(factory, ring):
+    global _process_factory, _process_ring
+    _process_factory = factory
+    _process_ring = ring
+
+
+def _worker_clip(factory, copies, key):
+    """Return this worker's copy of the clip, building it on first use."""
+    if copies is None:
+        # Forked worker: one clip per process
+        copies, factory = _process_copies, _process_factory
+    copy_key = (key, threading.get_ident())
+    clip = copies.get(copy_key)
+    if clip is None:
+        clip = factory()
+        copies[copy_key] = clip
+    return clip
+
+
+def _render_chunk(factory, copies, key, start, stop, fps):
+    """
+    Render frames start..stop-1 of a clip on a worker.
+
+    Returns:
+        list: Owned frame arrays, or in forked workers shared-ring slot
+        indices, with REPEAT for frames equal to the previous one. The first
+        frame of a chunk is always rendered.
+    """
+    clip = _worker_clip(factory, copies, key)
+    tracker = FrameChangeTracker(clip)
+    frames = []
+    for index in range(start, stop):
+        t = index / fps
+        if tracker.is_repeat(t) and frames:
+            frames.append(REPEAT)
+            continue
+        frame = clip.get_frame(t)
+        if tracker.rendered_unchanged():
+            frames.append(REPEAT)
+            continue
+        slot = _process_ring.put(frame) if copies is None and _process_ring is not None else None
+        if slot is not None:
+            frames.append(slot)
+        else:
+            frames.append(np.array(frame, dtype=np.uint8, order="C", copy=True))
+    return frames
@@ -0,0 +1,81 @@
+"""
+Frame Ring Module
+
+This module contains a ring of preallocated frame slots in shared memory.
+Forked render workers copy finished frames into a free slot and hand only
+the slot index back; the writer pipes the slot straight to ffmpeg and then
+returns it to the free list. Frames therefore cross the process boundary
+without being pickled.
+"""
+
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Fixed-size frame slots in one shared memory block, with a free-slot queue.
+
+    The ring must be created before the worker processes are forked so they
+    inherit both the mapping and the queue.
+    """
+
+    def __init__(self, frame_shape, slots):
+        """
+        Initialize the SharedFrameRing and allocate its shared memory.
+
+        Args:
+            frame_shape (tuple): Shape of one frame as (height, width, 3)
+            slots (int): Number of frame slots
+        """
+        self.frame_shape = tuple(frame_shape)
+        self.slots = max(1, slots)
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * self.slots)
+        self._frames = np.ndarray((self.slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+
+        self._free = multiprocessing.get_context("fork").Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+
+    def put(self, frame):
+        """
+        Copy a frame into a free slot, without waiting for one.
+
+        Args:
+            frame (numpy.ndarray): RGB frame of the ring's frame shape
+
+        Returns:
+            int: Slot index holding the frame, or None if every slot is in use
+        """
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            return None
+        np.copyto(self._frames[slot], frame)
+        return slot
+
+    def frame(self, slot):
+        """Return the frame stored in a slot, as a view into shared memory."""
+        return self._frames[slot]
+
+    def release(self, slot):
+        """Return a slot to the free list once its frame has been consumed."""
+        self._free.put(slot)
+
+    def close(self):
+        """Free the shared memory. Call once every worker has exited."""
+        self._frames = None
+        self._free.close()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
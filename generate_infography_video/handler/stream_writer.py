@@ -0,0 +1,237 @@
+"""
+Stream Writer Module
+
+This module contains a scene-by-scene video writer. A single ffmpeg encoder
+process stays open for the whole video while each scene is rendered, written
+and released in turn, so peak memory does not grow with the number of blocks.
+Frames are encoded by an FFmpegPipeWriter thread while the next ones render.
+"""
+
+import os
+import gc
+import wave
+import tempfile
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+from .ffmpeg_writer import FFmpegPipeWriter
+from .audio_pcm import to_pcm16
+
+
+class StreamingVideoWriter:
+    """
+    Encode a video one scene at a time through one persistent encoder.
+
+    Video frames are piped to a long-lived ffmpeg process as soon as they are
+    rendered. Scene audio is appended to a temporary WAV file and muxed with
+    the video when the writer is closed. Decoded narration is written to the
+    WAV as is; only clips with moviepy audio effects are sampled in chunks.
+    """
+
+    def __init__(self, output_file, size, fps=24, codec="libx264", audio_codec="aac",
+                 with_audio=True, audio_fps=44100, threads=4, preset="medium", **settings):
+        """
+        Initialize the StreamingVideoWriter and start the encoder process.
+
+        Args:
+            output_file (str): Path of the final video file
+            size (tuple): Size of the video frames as (width, height)
+            fps (int): Frames per second of the output video
+            codec (str): Video codec passed to ffmpeg
+            audio_codec (str): Audio codec used when muxing the final file
+            with_audio (bool): Whether an audio track should be written
+            audio_fps (int): Sample rate of the audio track
+            threads (int): Number of encoder threads
+            preset (str): Encoder preset passed to ffmpeg
+            **settings: Further FFmpegPipeWriter settings (crf, pix_fmt, gop, queue_size, vfr)
+        """
+        self.output_file = output_file
+        self.size = tuple(size)
+        self.fps = fps
+        self.audio_codec = audio_codec
+        self.with_audio = with_audio
+        self.audio_fps = audio_fps
+        self.frames_written = 0
+        self.samples_written = 0
+        self._vfr = settings.get("vfr", False)
+
+        out_dir = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(output_file))[0]
+        self._tmp_dir = tempfile.mkdtemp(prefix=f".{stem}_", dir=out_dir)
+        self._video_path = os.path.join(self._tmp_dir, "video" + os.path.splitext(output_file)[1])
+        self._audio_path = os.path.join(self._tmp_dir, "audio.wav")
+
+        self._video = FFmpegPipeWriter(
+            self._video_path, self.size, fps,
+            codec=codec, preset=preset, threads=threads, **settings
+        )
+        self._audio = None
+        if with_audio:
+            self._audio = wave.open(self._audio_path, "wb")
+            self._audio.setnchannels(2)
+            self._audio.setsampwidth(2)
+            self._audio.setframerate(audio_fps)
+
+    def write_scene(self, clip, producer=None, audio=None):
+        """
+        Render a scene clip and append its frames and audio to the output.
+
+        The number of audio samples written always matches the number of
+        video frames, so scenes stay in sync across the whole video.
+
+        Args:
+            clip (VideoClip): Scene to render; it is not kept after writing
+            producer (FrameProducer, optional): Renders the frames in parallel
+                when the clip supports it
+            audio (numpy.ndarray, optional): Decoded scene audio at audio_fps,
+                float samples of shape (n, channels); the clip's own audio is
+                used when None
+
+        Returns:
+            int: Number of frames written for this scene
+        """
+        n_frames = self._video.write_clip(clip, producer)
+        self.frames_written += n_frames
+
+        if self._audio is not None:
+            target = round(self.frames_written * self.audio_fps / self.fps)
+            if audio is not None:
+                self._write_samples(audio, target - self.samples_written)
+            else:
+                self._write_audio(clip.audio, target - self.samples_written)
+
+        return n_frames
+
+    @property
+    def frames_repeated(self):
+        """Number of frames repeated from the previous one instead of rendered."""
+        return self._video.frames_repeated
+
+    @property
+    def encode_cpu_seconds(self):
+        """CPU seconds the video encoder used; None until the writer is closed."""
+        return self._video.encode_cpu_seconds
+
+    def _write_samples(self, samples, n_samples):
+        """Write exactly n_samples of decoded audio, padding with silence."""
+        written = 0
+        if n_samples > 0:
+            if samples.ndim == 1:
+                samples = samples[:, None]
+            samples = samples[:n_samples]
+            if samples.shape[1] == 1:
+                samples = np.repeat(samples, 2, axis=1)
+            self._audio.writeframes(to_pcm16(samples[:, :2]).tobytes())
+            written = len(samples)
+        if n_samples > written:
+            self._audio.writeframes(bytes(4 * (n_samples - written)))
+        self.samples_written += max(n_samples, 0)
+
+    def _write_audio(self, audio_clip, n_samples, chunk_size=50000):
+        """Write exactly n_samples of a moviepy clip's audio (e.g. with effects), padding with silence."""
+        written = 0
+        if audio_clip is not None and n_samples > 0:
+            total = min(n_samples, int(audio_clip.duration * self.audio_fps))
+            for start in range(0, total, chunk_size):
+                stop = min(total, start + chunk_size)
+                tt = np.arange(start, stop) / self.audio_fps
+                chunk = audio_clip.to_soundarray(tt, fps=self.audio_fps, quantize=True, nbytes=2)
+                if chunk.ndim == 1:
+                    chunk = np.column_stack([chunk, chunk])
+                self._audio.writeframes(np.ascontiguousarray(chunk, dtype="<i2").tobytes())
+                written += stop - start
+        if n_samples > written:
+            self._audio.writeframes(bytes(4 * (n_samples - written)))
+        self.samples_written += max(n_samples, 0)
+
+    def close(self):
+        """Finish encoding, mux audio into the final file and remove temp files."""
+        self._video.close()
+        if self._audio is not None:
+            self._audio.close()
+            cmd = [
+                get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                "-i", self._video_path, "-i", self._audio_path,
+                "-c:v", "copy", "-c:a", self.audio_codec
+            ]
+            if not self._vfr:
+                # A VFR track may end before its last repeated frames; the
+                # audio is already exactly as long as the video frames
+                cmd.append("-shortest")
+            cmd.append(self.output_file)
+            subprocess.run(cmd, check=True)
+        else:
+            os.replace(self._video_path, self.output_file)
+        self._cleanup()
+
+    def _cleanup(self):
+        """Remove the temporary working directory."""
+        for name in os.listdir(self._tmp_dir):
+            os.remove(os.path.join(self._tmp_dir, name))
+        os.rmdir(self._tmp_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._video.abort()
+            if self._audio is not None:
+                self._audio.close()
+            self._cleanup()
+        return False
+
+
+def concat_videos(video_files, output_file):
+    """
+    Join videos encoded with the same settings into one file without re-encoding.
+    
+    Args:
+        video_files (list): Paths of the parts, in playback order
+        output_file (str): Path of the joined video
+    """
+    out_dir = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", dir=out_dir, delete=False) as listing:
+        for path in video_files:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run([
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", listing.name,
+            "-c", "copy", output_file
+        ], check=True)
+    finally:
+        os.remove(listing.name)
+
+
+def release_clip(clip):
+    """
+    Close a clip and everything it owns so its memory can be reclaimed.
+
+    Args:
+        clip (Clip): MoviePy clip to release; composite children are closed too
+    """
+    _close_tree(clip)
+    gc.collect()
+
+
+def _close_tree(clip):
+    """Recursively close a clip, its composite children and its audio."""
+    for child in getattr(clip, "clips", []) or []:
+        _close_tree(child)
+    if getattr(clip, "audio", None) is not None:
+        try:
+            clip.audio.close()
+        except Exception:
+            pass
+    try:
+        clip.close()
+    except Exception:
+        pass
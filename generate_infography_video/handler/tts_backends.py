@@ -0,0 +1,290 @@
+"""
+TTS Backends Module
+
+This module contains the text-to-speech engines the audio handler can use,
+behind one small interface:
+
+- gtts: Google Translate's TTS service (needs network access);
+- espeak-ng: the local espeak-ng synthesizer, fast and fully offline;
+- phrases: a bank of pre-recorded WAV clips, joined word by word. It stands
+  in for a real engine in tests and on render hosts without any synthesizer.
+
+Backends are looked up by name with get_backend(), so the engine can be
+chosen per job.
+"""
+
+import os
+import re
+import abc
+import wave
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+import numpy as np
+
+
+class TTSError(RuntimeError):
+    """Raised when speech could not be synthesized."""
+
+
+class TTSBackend(abc.ABC):
+    """
+    Interface of a TTS engine.
+
+    Subclasses must implement synthesize() and may override available().
+    """
+
+    #: Registry name of the engine
+    name = None
+    #: Extension of the audio files the engine writes
+    extension = ".wav"
+    #: Whether the engine calls a remote service
+    remote = False
+
+    @property
+    def cache_id(self):
+        """Identify the engine, and anything that changes its output, in cache keys."""
+        return self.name
+
+    def available(self):
+        """Return whether the engine can be used on this host."""
+        return True
+
+    @abc.abstractmethod
+    def synthesize(self, text, out_path, lang="en", tld="com", speed=1.0):
+        """
+        Write the speech of a text to an audio file.
+
+        Args:
+            text (str): Text to speak
+            out_path (str): Path of the audio file to write
+            lang (str): Language code
+            tld (str): Top-level domain selecting the accent, as in gTTS
+            speed (float): Speaking rate; 1.0 is normal
+
+        Raises:
+            TTSError: If the text could not be synthesized
+        """
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service through gTTS; only normal and slow speeds exist."""
+
+    name = "gtts"
+    extension = ".mp3"
+    remote = True
+
+    def available(self):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def synthesize(self, text, out_path, lang="en", tld="com", speed=1.0):
+        try:
+            from gtts import gTTS
+        except ImportError as e:
+            raise TTSError("gTTS is not installed") from e
+        gTTS(text, slow=speed < 1.0, lang=lang, tld=tld).save(out_path)
+
+
+class EspeakBackend(TTSBackend):
+    """The local espeak-ng (or espeak) command-line synthesizer."""
+
+    name = "espeak-ng"
+    # gTTS accents mapped to the closest espeak-ng voice for English
+    VOICES = {"com": "en-us", "us": "en-us", "co.uk": "en-gb", "com.au": "en-gb", "co.in": "en-gb", "ie": "en-gb"}
+    # espeak-ng's default rate in words per minute
+    WORDS_PER_MINUTE = 175
+
+    def __init__(self, binary=None, voice=None):
+        """
+        Initialize the EspeakBackend.
+
+        Args:
+            binary (str, optional): Synthesizer executable; espeak-ng or espeak from PATH if None
+            voice (str, optional): Voice used for every text; derived from lang and tld if None
+        """
+        self.binary = binary or shutil.which("espeak-ng") or shutil.which("espeak")
+        self.voice = voice
+
+    @property
+    def cache_id(self):
+        return f"{self.name}:{self.voice or ''}"
+
+    def available(self):
+        return self.binary is not None
+
+    def synthesize(self, text, out_path, lang="en", tld="com", speed=1.0):
+        if self.binary is None:
+            raise TTSError("espeak-ng is not installed")
+        voice = self.voice or (self.VOICES.get(tld, "en-us") if lang == "en" else lang)
+        cmd = [self.binary, "-v", voice, "-s", str(round(self.WORDS_PER_MINUTE * speed)), "-w", out_path, "--stdin"]
+        try:
+            subprocess.run(cmd, input=text.encode("utf-8"), check=True, capture_output=True, timeout=120)
+        except subprocess.CalledProcessError as e:
+            raise TTSError(f"espeak-ng failed: {e.stderr.decode(errors='replace').strip()}") from e
+
+
+class PhraseBankBackend(TTSBackend):
+    """
+    Join pre-recorded WAV clips of words and phrases.
+
+    The bank is a folder of WAV files named after the phrase they hold,
+    lowercased with words joined by underscores (hello.wav,
+    emergency_fund.wav). Each text is covered greedily by the longest
+    recorded phrases, with a short pause between them; a word missing from
+    the bank is an error. All clips must share sample rate, channels and
+    sample width.
+    """
+
+    name = "phrases"
+
+    def __init__(self, bank_dir, gap=0.06):
+        """
+        Initialize the PhraseBankBackend.
+
+        Args:
+            bank_dir (str): Folder of recorded phrases
+            gap (float): Pause between joined phrases in seconds
+        """
+        self.bank_dir = bank_dir
+        self.gap = gap
+
+    @property
+    def cache_id(self):
+        # Adding, removing or re-recording a phrase changes the output. The
+        # folder's mtime misses recordings overwritten in place, so every
+        # recording's name, mtime and size goes into the key
+        digest = hashlib.sha1()
+        if self.available():
+            for name in sorted(os.listdir(self.bank_dir)):
+                if os.path.splitext(name)[1].lower() != ".wav":
+                    continue
+                stat = os.stat(os.path.join(self.bank_dir, name))
+                digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+        return f"{self.name}:{os.path.abspath(self.bank_dir)}:{digest.hexdigest()[:16]}:{self.gap}"
+
+    def available(self):
+        return os.path.isdir(self.bank_dir)
+
+    @staticmethod
+    def words(text):
+        """Split a text into the lowercase words used to look up phrases."""
+        return re.findall(r"[a-z0-9']+", text.lower())
+
+    def _phrases(self):
+        """Return the recorded phrases as {phrase words: path}."""
+        phrases = {}
+        for name in os.listdir(self.bank_dir):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() == ".wav":
+                phrases[tuple(stem.lower().split("_"))] = os.path.join(self.bank_dir, name)
+        return phrases
+
+    def synthesize(self, text, out_path, lang="en", tld="com", speed=1.0):
+        if not self.available():
+            raise TTSError(f"Phrase bank {self.bank_dir} does not exist")
+        phrases = self._phrases()
+        longest = max((len(words) for words in phrases), default=0)
+        words = self.words(text)
+
+        # Greedy longest match of recorded phrases over the words
+        paths = []
+        i = 0
+        while i < len(words):
+            for j in range(min(len(words), i + longest), i, -1):
+                path = phrases.get(tuple(words[i:j]))
+                if path is not None:
+                    paths.append(path)
+                    i = j
+                    break
+            else:
+                raise TTSError(f"No recording of '{words[i]}' in phrase bank {self.bank_dir}")
+        if not paths:
+            raise TTSError("Nothing to say")
+
+        params = None
+        chunks = []
+        for path in paths:
+            with wave.open(path, "rb") as clip:
+                clip_params = (clip.getnchannels(), clip.getsampwidth(), clip.getframerate())
+                if params is None:
+                    params = clip_params
+                elif clip_params != params:
+                    raise TTSError(f"{path} does not match the format of the other recordings")
+                chunks.append(clip.readframes(clip.getnframes()))
+        channels, width, rate = params
+        pause = bytes(int(self.gap * rate) * channels * width)
+
+        with wave.open(out_path, "wb") as out:
+            out.setnchannels(channels)
+            out.setsampwidth(width)
+            out.setframerate(rate)
+            out.writeframes(pause.join(chunks))
+
+
+def write_phrase(bank_dir, phrase, samples, rate=22050):
+    """
+    Record a phrase into a phrase bank from float samples.
+
+    The recording is written to a temporary file and moved into place, so a
+    synthesis running meanwhile never reads a half-written clip.
+
+    Args:
+        bank_dir (str): Folder of the phrase bank
+        phrase (str): Words the recording holds
+        samples (numpy.ndarray): Mono samples in [-1, 1]
+        rate (int): Sample rate
+
+    Returns:
+        str: Path of the written WAV file
+    """
+    os.makedirs(bank_dir, exist_ok=True)
+    path = os.path.join(bank_dir, "_".join(PhraseBankBackend.words(phrase)) + ".wav")
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    # Not .wav, so the bank never lists the temporary file as a phrase
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=bank_dir)
+    try:
+        with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(rate)
+            out.writeframes(pcm.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+# Engine name -> backend class
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+    PhraseBankBackend.name: PhraseBankBackend,
+}
+
+
+def get_backend(engine, **options):
+    """
+    Return a TTS backend.
+
+    Args:
+        engine (str or TTSBackend): Registered engine name, or a backend instance
+        **options: Constructor arguments of the backend, e.g. bank_dir for "phrases"
+
+    Returns:
+        TTSBackend: The backend
+
+    Raises:
+        TTSError: If the engine name is unknown
+    """
+    if isinstance(engine, TTSBackend):
+        return engine
+    if engine not in TTS_BACKENDS:
+        raise TTSError(f"Unknown TTS engine '{engine}', expected one of {sorted(TTS_BACKENDS)}")
+    return TTS_BACKENDS[engine](**options)
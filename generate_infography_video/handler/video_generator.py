@@ -8,15 +8,31 @@ effects, and final video rendering.
 
 import os
 import json
+import shutil
+import tempfile
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import cairosvg
+import numpy as np
 from moviepy.editor import *
+from moviepy.audio.AudioClip import AudioArrayClip
 from pathlib import Path
 from PIL import Image as PILImage
 
 from config import *
-from .audio_handler import generate_tts
-from utils.effects_utils import create_click_effect_clip, blur_image
-from utils.dialogue_utils import create_typewriter_dialogue_clip
+from .audio_handler import generate_tts, generate_tts_batch, tts_audio_path, get_audio_duration, TTS_ENGINE
+from .tts_backends import TTSError
+from .audio_pcm import read_pcm
+from .stream_writer import StreamingVideoWriter, release_clip, concat_videos
+from .ffmpeg_writer import write_clip
+from .frame_producer import FrameProducer
+from .cpu_budget import CpuBudget, cpu_seconds, job_slot
+from utils.compositor import DamageCompositor, Layer
+from utils.transitions import Transition, EASINGS
+from utils.effects_utils import ClickRipple, ZoomPyramid, load_raster, get_blurred_raster
+from utils.dialogue_utils import create_typewriter_dialogue_layers, DialogueLayout, render_dialogue_snapshot
+from utils.svg_utils import page_file
 
 # Import configuration variables
 import sys
@@ -34,6 +50,21 @@ converted_image_path = svg_config['converted_image_path']
 audio_folder = svg_config['audio_folder']
 output_path = svg_config['output_path']
 output_svg_path = svg_config['output_svg_path']
+transition_kind = svg_config.get('transition', 'crossfade')
+transition_duration = svg_config.get('transition_duration', 0.6)
+transition_direction = svg_config.get('transition_direction', 'left')
+magnifier_zoom = svg_config.get('magnifier_zoom', 2.0)
+encoder_settings = svg_config.get('encoder', {})
+render_workers = svg_config.get('render_workers', 'auto')
+render_mode = svg_config.get('render_mode', 'thread')
+shm_ring_mb = svg_config.get('shm_ring_mb', 128)
+max_jobs = svg_config.get('max_jobs', 1)
+cpu_profile_path = svg_config.get('cpu_profile_path')
+page_workers = svg_config.get('page_workers', 'auto')
+audio_fps = svg_config.get('audio_fps', 44100)
+
+# Generator inherited by forked page workers
+_page_generator = None
 
 class VideoGenerator:
     """
@@ -43,159 +74,541 @@ class VideoGenerator:
     SVG templates to composing final video clips with effects and audio.
     """
     
-    def __init__(self, with_audio=True):
+    def __init__(self, with_audio=True, tts_engine=None):
         """
         Initialize the VideoGenerator.
         
         Args:
             with_audio (bool): Whether to generate video with audio narration
+            tts_engine (str, optional): TTS engine for this job, e.g. "gtts" or
+                "espeak-ng"; the configured engine if None
         """
         self.with_audio = with_audio
+        self.tts_engine = tts_engine or TTS_ENGINE
         self.canvas_size = None
         self.content_blocks = []
+        self.page_count = 1
+        # Cores this generator may use; its share of the host if None
+        self.cpus = None
+        # Shared memory (MB) its frame ring may use; the configured limit if None
+        self.shm_mb = None
+        self._layouts = {}
+        
+    def process_template(self, rasterize=True):
+        """
+        Process SVG template and convert to PNG.
+        
+        Content with more blocks than the template has slots is paged over
+        several template instances, each with its own SVG and PNG.
         
-    def process_template(self):
-        """Process SVG template and convert to PNG."""
+        Args:
+            rasterize (bool): Convert every page to PNG now. The paged
+                renderer passes False and lets each page job convert its own.
+        """
         from utils.svg_utils import process_svg
         
         # Process SVG to update with content headers
-        process_svg(svg_path, json_path, output_svg_path)
+        self.page_count = len(process_svg(svg_path, json_path, output_svg_path))
         
         # Convert SVG to PNG
-        cairosvg.svg2png(url=output_svg_path, write_to=converted_image_path)
-        
-        # Get canvas size
-        self.canvas_size = PILImage.open(converted_image_path).size
+        if rasterize:
+            for page in range(self.page_count):
+                self.rasterize_page(page)
         
         # Load content blocks
         with open(json_path, "r", encoding="utf-8") as f:
             self.content_blocks = json.load(f)
             
-        print(f"Processed template with {len(self.content_blocks)} content blocks")
+        print(f"Processed template with {len(self.content_blocks)} content blocks on {self.page_count} page(s)")
     
-    def generate_clips(self):
+    def rasterize_page(self, page):
         """
-        Generate video clips for each content block.
+        Convert one processed template page to PNG and record the canvas size.
         
+        Args:
+            page (int): Zero-based page index
+            
         Returns:
-            list: List of MoviePy VideoClip objects
+            str: Path of the page's PNG
         """
-        clips = []
+        image_path = page_file(converted_image_path, page)
+        cairosvg.svg2png(url=page_file(output_svg_path, page), write_to=image_path)
+        self.canvas_size = PILImage.open(image_path).size
+        return image_path
+    
+    @staticmethod
+    def raster_path(block):
+        """Return the PNG of the template page a block is shown on."""
+        return page_file(converted_image_path, block.get("page", 0))
+    
+    def get_dialogue_layout(self, block_index, dialogue_text, dialogue_dur):
+        """
+        Return the dialogue layout for a block, building it only once.
         
-        for block_index, block in enumerate(self.content_blocks):
-            title = block.get("title", "")
-            position = block.get("position", {})
-            points = block.get("points", [])
+        The same layout drives the video render and the snapshot export.
+        
+        Args:
+            block_index (int): Index of the content block
+            dialogue_text (str): Heading and bullet points of the block
+            dialogue_dur (float): Duration of the dialogue in seconds
             
-            if not points:
+        Returns:
+            DialogueLayout: Precomputed layout and timing plan
+        """
+        key = (block_index, dialogue_text, dialogue_dur, self.canvas_size)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = DialogueLayout(dialogue_text, self.canvas_size, dialogue_dur)
+            self._layouts[key] = layout
+        return layout
+    
+    def iter_block_clips(self, blocks=None):
+        """
+        Lazily build the video clips for each content block.
+        
+        Clips are created only when the consumer asks for the next block, so a
+        streaming writer can render and release one block before the next one
+        is built.
+        
+        Args:
+            blocks (list, optional): (block index, block) pairs to build;
+                every content block if None
+        
+        Yields:
+            list: The intro clip and the scene clip for one content block; the
+            scene's `narration` attribute holds its decoded audio, or None
+        """
+        if blocks is None:
+            blocks = list(enumerate(self.content_blocks))
+        for block_index, block in blocks:
+            if not block.get("points", []):
                 continue
 
-            # Combine title + bullet points
-            dialogue_text = f"{title}\n" + "\n".join([f"• {point}" for point in points])
-            base_name = f"block{block_index+1}"
-            audio_path = os.path.join(audio_folder, base_name + ".wav")
+            dialogue_text = self.dialogue_text(block)
+            audio_path = self.audio_path(block_index)
 
-            # Handle audio generation if needed
-            audio_clip = None
+            # Handle audio generation if needed; cached unless the text changed.
+            # The narration is decoded once into an in-memory buffer
+            narration = None
             if self.with_audio:
-                if not os.path.exists(audio_path):
-                    generate_tts(dialogue_text, audio_path)
-                audio_clip = AudioFileClip(audio_path)
-                dialogue_dur = audio_clip.duration
+                generate_tts(dialogue_text, audio_path, engine=self.tts_engine)
+                narration = read_pcm(audio_path, audio_fps, channels=2)
+                dialogue_dur = len(narration) / audio_fps
             else:
                 dialogue_dur = 4  # Fixed duration without audio
                 
-            magnifier_dur = min(3.0, dialogue_dur * 0.4)
-            total_dur = dialogue_dur + magnifier_dur
-
-            # Create base infographic clip
-            infographic_clip = ImageClip(converted_image_path).set_duration(total_dur).crossfadein(0.6)
-            clips.append(CompositeVideoClip([infographic_clip], size=self.canvas_size).set_duration(3))
-            
-            # Create blurred background for dialogue
-            blurred = blur_image(infographic_clip).subclip(0, dialogue_dur)
-
-            # Create dialogue overlay
-            dialogue = create_typewriter_dialogue_clip(
-                dialogue_text,
-                cartoon_path,
-                background_clip=blurred,
-                dialogue_duration=dialogue_dur,
-                canvas_size=self.canvas_size
-            ).crossfadein(0.6)
-
-            overlay = CompositeVideoClip([blurred, dialogue])
-
-            # Create scene with all elements
-            scene = CompositeVideoClip([
-                infographic_clip,
-                create_click_effect_clip(
-                    round(position.get("x", 0)), 
-                    round(position.get("y", 0)) - 25, 
-                    round(position.get("width", 0)),
-                    round(position.get("height", 0)) + 25,
-                    duration=2, 
-                    canvas_size=self.canvas_size),
-                overlay.set_start(magnifier_dur)
-            ], size=self.canvas_size).set_duration(total_dur)
-            
-            # Add audio if needed
-            if self.with_audio and audio_clip:
-                scene = scene.set_audio(audio_clip)
-
-            clips.append(scene)
+            layout = self.get_dialogue_layout(block_index, dialogue_text, dialogue_dur)
+            intro, scene = self.build_block_scenes(block, dialogue_text, dialogue_dur, layout)
             
+            # The decoded narration rides along with the scene; the streaming
+            # writer copies it to its WAV without a moviepy audio clip
+            scene.narration = narration
+
+            yield [intro, scene]
+            
+            # Drop this block's references before the next block is built
+            del intro, scene, narration, layout
+    
+    def build_block_scenes(self, block, dialogue_text, dialogue_dur, layout):
+        """
+        Build the intro and main scene of a block on the NumPy compositor.
+        
+        Both clips carry a `factory` attribute rebuilding an independent copy,
+        so a FrameProducer can render them on several workers.
+        
+        Args:
+            block (dict): Content block with its position
+            dialogue_text (str): Heading and bullet points of the block
+            dialogue_dur (float): Duration of the dialogue in seconds
+            layout (DialogueLayout): Precomputed layout for the block
+            
+        Returns:
+            tuple: (intro, scene) MoviePy VideoClips without audio
+        """
+        raster_path = self.raster_path(block)
+        intro = self.build_intro(raster_path)
+        intro.factory = functools.partial(self.build_intro, raster_path)
+        scene = self.build_scene(block, dialogue_text, dialogue_dur, layout)
+        scene.factory = functools.partial(self.build_scene, block, dialogue_text, dialogue_dur, layout)
+        return intro, scene
+    
+    def build_intro(self, raster_path=converted_image_path):
+        """
+        Build the block intro: the infographic fading in from black.
+        
+        Args:
+            raster_path (str): PNG of the block's template page
+        
+        Returns:
+            VideoClip: Three-second intro clip
+        """
+        raster = load_raster(raster_path, self.canvas_size)
+        intro_fade = Transition("crossfade", np.zeros_like(raster), raster, duration=0.6)
+        intro_compositor = DamageCompositor(intro_fade.frame)
+        intro = VideoClip(intro_compositor.make_frame, duration=3).set_fps(24)
+        # Lets the writers repeat frames the compositor did not redraw
+        intro.compositor = intro_compositor
+        return intro
+    
+    def build_scene(self, block, dialogue_text, dialogue_dur, layout):
+        """
+        Build the main scene of a block.
+        
+        The scene fades in from black, as the intro does, and shows the click
+        ripple over the infographic. It then zooms into the block and runs
+        the configured transition to the blurred raster while the typewriter
+        dialogue box and character fade in over it; only the box is drawn, so
+        the transition stays visible around it. All layers are
+        blended in place by a DamageCompositor instead of moviepy's per-frame
+        mask compositing.
+        
+        Args:
+            block (dict): Content block with its position
+            dialogue_text (str): Heading and bullet points of the block
+            dialogue_dur (float): Duration of the dialogue in seconds
+            layout (DialogueLayout): Precomputed layout for the block
+            
+        Returns:
+            VideoClip: Scene clip without audio
+        """
+        position = block.get("position", {})
+        magnifier_dur = min(3.0, dialogue_dur * 0.4)
+        total_dur = dialogue_dur + magnifier_dur
+        
+        raster_path = self.raster_path(block)
+        raster = load_raster(raster_path, self.canvas_size)
+        
+        # Click ripple over the infographic, crossfaded in from black, for
+        # the first half of the magnifier window; once the fade is over,
+        # only the ripple's region is redrawn
+        ripple_dur = magnifier_dur / 2
+        fade_from_black = Transition("crossfade", np.zeros_like(raster), raster, duration=min(0.6, ripple_dur))
+        ripple = ClickRipple(
+            raster,
+            round(position.get("x", 0)), 
+            round(position.get("y", 0)) - 25, 
+            round(position.get("width", 0)),
+            round(position.get("height", 0)) + 25)
+        layers = [Layer(fade_from_black.frame, duration=ripple_dur), ripple.layer(duration=ripple_dur)]
+        
+        # Zoom into the block for the second half
+        zoom = ZoomPyramid(
+            raster,
+            (position.get("x", 0), position.get("y", 0), position.get("width", 0), position.get("height", 0)),
+            max_zoom=magnifier_zoom
+        )
+        layers.append(zoom.layer(start=ripple_dur, duration=magnifier_dur - ripple_dur, easing=EASINGS["ease_in_out"]))
+        
+        # Transition from the zoomed block to the blurred background, with
+        # the dialogue box and character fading in over it
+        block_center = (
+            position.get("x", 0) + position.get("width", 0) / 2,
+            position.get("y", 0) + position.get("height", 0) / 2
+        )
+        background = Transition(
+            transition_kind,
+            zoom.frame(1),
+            get_blurred_raster(raster_path),
+            duration=transition_duration,
+            start=magnifier_dur,
+            direction=transition_direction,
+            center=block_center
+        )
+        layers.extend(create_typewriter_dialogue_layers(
+            dialogue_text,
+            cartoon_path,
+            dialogue_duration=dialogue_dur,
+            canvas_size=self.canvas_size,
+            background_image_path=raster_path,
+            layout=layout,
+            start=magnifier_dur,
+            fade_duration=transition_duration
+        ))
+        
+        scene_compositor = DamageCompositor(background.frame, layers)
+        scene = VideoClip(scene_compositor.make_frame, duration=total_dur).set_fps(24)
+        scene.compositor = scene_compositor
+        return scene
+    
+    def generate_clips(self):
+        """
+        Generate video clips for each content block.
+        
+        Returns:
+            list: List of MoviePy VideoClip objects
+        """
+        clips = []
+        for intro, scene in self.iter_block_clips():
+            # moviepy's own writer needs the narration as an audio clip
+            if scene.narration is not None:
+                scene = scene.set_audio(AudioArrayClip(scene.narration, fps=audio_fps))
+            clips.extend([intro, scene])
         return clips
     
-    def generate_video(self, output_file=None):
+    @staticmethod
+    def dialogue_text(block):
+        """Return a block's narration: its title followed by its bullet points."""
+        return f"{block.get('title', '')}\n" + "\n".join([f"• {point}" for point in block.get("points", [])])
+    
+    @staticmethod
+    def audio_path(block_index):
+        """Return the narration file written for a block."""
+        return os.path.join(audio_folder, f"block{block_index+1}.wav")
+    
+    def prepare_audio(self):
+        """
+        Synthesize the narration of every block before rendering.
+        
+        Blocks are synthesized concurrently; text synthesized before with
+        the same settings comes from the TTS cache.
+        
+        Raises:
+            TTSError: If any block could not be synthesized, rather than
+                rendering a video with missing narration
+        """
+        items = [(self.dialogue_text(block), self.audio_path(block_index))
+                 for block_index, block in enumerate(self.content_blocks) if block.get("points")]
+        if items:
+            print(f'Synthesizing narration for {len(items)} blocks with {self.tts_engine}...')
+            results = generate_tts_batch(items, engine=self.tts_engine)
+            missing = [path for (_, path), result in zip(items, results) if result is None]
+            if missing:
+                raise TTSError(f"No narration for {len(missing)} block(s): {', '.join(missing)}")
+    
+    def generate_video(self, output_file=None, streaming=True):
         """
         Generate the final video from all clips.
         
         Args:
             output_file (str, optional): Output file path. Uses config if not provided.
+            streaming (bool): Render scene by scene through one persistent encoder,
+                releasing each scene once written. When False, all clips are
+                concatenated and written in a single moviepy pass.
         """
         if output_file is None:
             output_file = output_path
             
-        print('Processing template...')
-        self.process_template()
+        # Wait for a free slot when other render jobs share the host
+        with job_slot(max_jobs):
+            print('Processing template...')
+            self.process_template(rasterize=not streaming)
+            if self.with_audio:
+                self.prepare_audio()
+            
+            if streaming:
+                if self.page_count > 1:
+                    self.render_pages(output_file)
+                else:
+                    self.rasterize_page(0)
+                    self.render_streaming(output_file)
+                print('Video generation complete!')
+                return
+            
+            print('Generating clips...')
+            clips = self.generate_clips()
+            
+            print('Concatenating clips...')
+            final_video = concatenate_videoclips(clips)
+            
+            _, settings = self.allocate_cpus(max_workers=1)
+            print(f'Writing video to {output_file}...')
+            write_clip(final_video, output_file, fps=24, audio=True, audio_fps=audio_fps, **settings)
+            
+            print('Video generation complete!')
+    
+    def export_snapshots(self, output_dir=None, thumbnail_width=None):
+        """
+        Save a still of each block's fully typed dialogue overlay.
+        
+        Args:
+            output_dir (str, optional): Folder for the images. Defaults to the audio/output folder.
+            thumbnail_width (int, optional): Scale images down to this width for previews
+            
+        Returns:
+            list: Paths of the saved images
+        """
+        if output_dir is None:
+            output_dir = audio_folder
+        os.makedirs(output_dir, exist_ok=True)
+        if self.canvas_size is None:
+            self.process_template()
+        
+        saved = []
+        for block_index, block in enumerate(self.content_blocks):
+            if not block.get("points", []):
+                continue
+            dialogue_text = self.dialogue_text(block)
+            dialogue_dur = 4
+            if self.with_audio:
+                # The cached audio of the current text, never a stale block file
+                dialogue_dur = get_audio_duration(tts_audio_path(dialogue_text, engine=self.tts_engine)) or 4
+            layout = self.get_dialogue_layout(block_index, dialogue_text, dialogue_dur)
+            image = render_dialogue_snapshot(layout, self.raster_path(block), thumbnail_width=thumbnail_width)
+            out_path = os.path.join(output_dir, f"block{block_index+1}_dialogue.png")
+            image.save(out_path)
+            saved.append(out_path)
+            print(f"🖼️  Snapshot saved: {out_path}")
+        return saved
+    
+    def cpu_budget(self):
+        """Return the CpuBudget of this generator's cores."""
+        if self.cpus:
+            return CpuBudget(cpus=self.cpus, profile_path=cpu_profile_path)
+        return CpuBudget(max_jobs=max_jobs, profile_path=cpu_profile_path)
+    
+    def allocate_cpus(self, max_workers=None):
+        """
+        Split this job's cores between render workers and encoder threads.
+        
+        "auto" values of render_workers and the encoder threads in the
+        config are filled in by a CpuBudget; explicit numbers are kept and
+        the other stage gets the remaining cores.
+        
+        Args:
+            max_workers (int, optional): Most render workers the caller can use
+            
+        Returns:
+            tuple: (render workers, encoder settings with threads filled in)
+        """
+        budget = self.cpu_budget()
+        workers, threads = budget.split(max_workers)
+        if render_workers != 'auto':
+            workers = render_workers
+            threads = max(1, budget.share - workers)
+        settings = dict(encoder_settings)
+        if settings.get('threads', 'auto') == 'auto':
+            settings['threads'] = threads
+        print(f"🧮 {budget.share} of {budget.cpus} cores: {workers} render worker(s), "
+              f"{settings['threads']} encoder thread(s)")
+        return workers, settings
+    
+    def render_pages(self, output_file):
+        """
+        Render a paged explainer, one page per job, and join the pages.
+        
+        Each page's raster and scenes are rendered independently into a
+        temporary video. Pages run on forked workers, each with an equal
+        part of this job's cores (at least two, so rendering and encoding
+        both have one); the finished pages are joined without re-encoding.
         
-        print('Generating clips...')
-        clips = self.generate_clips()
+        Args:
+            output_file (str): Output file path
+        """
+        global _page_generator
         
-        print('Concatenating clips...')
-        final_video = concatenate_videoclips(clips)
+        share = self.cpu_budget().share
+        workers = page_workers if page_workers != 'auto' else share // 2
+        workers = max(1, min(self.page_count, workers))
         
-        print(f'Writing video to {output_file}...')
-        final_video.write_videofile(
-            output_file, 
-            fps=24, 
-            codec="libx264", 
-            audio_codec="aac", 
-            audio=True, 
-            threads=4
-        )
+        out_dir = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(out_dir, exist_ok=True)
+        stem, ext = os.path.splitext(os.path.basename(output_file))
+        tmp_dir = tempfile.mkdtemp(prefix=f".{stem}_pages_", dir=out_dir)
+        page_videos = [os.path.join(tmp_dir, f"page{page + 1}{ext}") for page in range(self.page_count)]
         
-        print('Video generation complete!')
+        print(f'📄 Rendering {self.page_count} pages, {workers} at a time...')
+        try:
+            if workers == 1:
+                for page, page_video in enumerate(page_videos):
+                    self.render_page(page, page_video)
+            else:
+                _page_generator = self
+                context = multiprocessing.get_context("fork")
+                with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                    # Each page worker has its own frame ring: split the shared-memory budget too
+                    futures = [pool.submit(_render_page, page, page_video, max(1, share // workers),
+                                           shm_ring_mb / workers)
+                               for page, page_video in enumerate(page_videos)]
+                    for future in futures:
+                        future.result()
+            
+            print(f'Joining pages into {output_file}...')
+            concat_videos(page_videos, output_file)
+        finally:
+            _page_generator = None
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def render_page(self, page, output_file):
+        """
+        Rasterize one template page and stream its blocks into a video.
+        
+        Args:
+            page (int): Zero-based page index
+            output_file (str): Path of the page's video
+        """
+        self.rasterize_page(page)
+        blocks = [(index, block) for index, block in enumerate(self.content_blocks)
+                  if block.get("page", 0) == page]
+        self.render_streaming(output_file, blocks)
+        print(f"📄 Page {page + 1}/{self.page_count} rendered")
+    
+    def render_streaming(self, output_file, blocks=None):
+        """
+        Render the video block by block with bounded memory.
+        
+        Each block's clips are built, encoded and released before the next
+        block is built, so peak memory stays flat regardless of block count.
+        With more than one render worker, frames are rendered on a pool of
+        workers and reordered before encoding. The CPU time of both stages is
+        measured and stored, so the next run splits the cores accordingly.
+        
+        Args:
+            output_file (str): Output file path
+            blocks (list, optional): (block index, block) pairs to render;
+                every content block if None
+        """
+        if blocks is None:
+            blocks = list(enumerate(self.content_blocks))
+        # Blocks are numbered across the whole video, not per page
+        block_numbers = [block_index + 1 for block_index, block in blocks if block.get("points", [])]
+        workers, settings = self.allocate_cpus()
+        print(f'Streaming video to {output_file}...')
+        own_start, children_start = cpu_seconds()
+        # The producer is closed last: the writer may still hold its shared frames
+        with FrameProducer(workers, mode=render_mode, ring_budget_mb=self.shm_mb or shm_ring_mb) as producer, \
+                StreamingVideoWriter(output_file, self.canvas_size, fps=24, with_audio=self.with_audio,
+                                     audio_fps=audio_fps, **settings) as writer:
+            for block_number, block_clips in zip(block_numbers, self.iter_block_clips(blocks)):
+                for clip in block_clips:
+                    writer.write_scene(clip, producer, audio=getattr(clip, "narration", None))
+                    release_clip(clip)
+                del block_clips
+                print(f"✅ Block {block_number} written ({writer.frames_written} frames total, "
+                      f"{writer.frames_repeated} repeated)")
+
+        own_end, children_end = cpu_seconds()
+        encode_seconds = writer.encode_cpu_seconds or 0
+        render_seconds = (own_end - own_start) + (children_end - children_start) - encode_seconds
+        self.cpu_budget().record(render_seconds, encode_seconds, writer.frames_written)
+
+
+def _render_page(page, output_file, cpus, shm_mb):
+    """Render one page on a forked worker, with its own share of the cores and shared memory."""
+    _page_generator.cpus = cpus
+    _page_generator.shm_mb = shm_mb
+    _page_generator.render_page(page, output_file)
 
 
-def generate_video_with_audio(output_file=None):
+def generate_video_with_audio(output_file=None, streaming=True, tts_engine=None):
     """
     Generate a video with audio narration.
     
     Args:
         output_file (str, optional): Output file path. Uses config if not provided.
+        streaming (bool): Render scene by scene with bounded memory.
+        tts_engine (str, optional): TTS engine for the narration; the configured one if None
     """
-    generator = VideoGenerator(with_audio=True)
-    generator.generate_video(output_file)
+    generator = VideoGenerator(with_audio=True, tts_engine=tts_engine)
+    generator.generate_video(output_file, streaming=streaming)
 
 
-def generate_video_without_audio(output_file=None):
+def generate_video_without_audio(output_file=None, streaming=True):
     """
     Generate a video without audio narration.
     
     Args:
         output_file (str, optional): Output file path. Uses config if not provided.
+        streaming (bool): Render scene by scene with bounded memory.
     """
     generator = VideoGenerator(with_audio=False)
-    generator.generate_video(output_file)
+    generator.generate_video(output_file, streaming=streaming)
@@ -15,7 +15,8 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-from handler.video_generator import generate_video_with_audio, generate_video_without_audio
+from handler.video_generator import VideoGenerator, generate_video_with_audio, generate_video_without_audio
+from handler.tts_backends import TTS_BACKENDS
 
 
 def main():
@@ -30,17 +31,40 @@ def main():
         "--output", 
         "-o", 
         type=str, 
-        help="Output file path (default: uses path from config)"
+        help="Output file path, or output folder with --snapshots (default: uses path from config)"
+    )
+    parser.add_argument(
+        "--no-streaming",
+        action="store_true",
+        help="Build all clips up front and write them in one pass (uses more memory)"
+    )
+    parser.add_argument(
+        "--snapshots",
+        action="store_true",
+        help="Save a still of each block's dialogue instead of rendering the video"
+    )
+    parser.add_argument(
+        "--tts-engine",
+        choices=sorted(TTS_BACKENDS),
+        help="Text-to-speech engine for this job (default: from config)"
+    )
+    parser.add_argument(
+        "--thumbnail-width",
+        type=int,
+        help="Scale snapshots down to this width for previews"
     )
     
     args = parser.parse_args()
     
-    if args.no_audio:
+    if args.snapshots:
+        print("Exporting dialogue snapshots...")
+        VideoGenerator(with_audio=not args.no_audio, tts_engine=args.tts_engine).export_snapshots(args.output, thumbnail_width=args.thumbnail_width)
+    elif args.no_audio:
         print("Generating video without audio...")
-        generate_video_without_audio(args.output)
+        generate_video_without_audio(args.output, streaming=not args.no_streaming)
     else:
         print("Generating video with audio...")
-        generate_video_with_audio(args.output)
+        generate_video_with_audio(args.output, streaming=not args.no_streaming, tts_engine=args.tts_engine)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+"""
+Audio Handler Test Module
+
+This module contains tests of the audio handler's batch TTS synthesis:
+duplicate texts, the content-keyed cache, retries and per-item failures. A
+stand-in synthesize() writes short tones, so no TTS engine or network is
+needed.
+
+Run them from the generate_infography_video directory:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import wave
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from handler.audio_handler import generate_tts_batch
+from handler.tts_backends import PhraseBankBackend, TTSError
+
+
+class StandIn:
+    """Stand-in for a backend's synthesize(): writes a tone and counts calls per text."""
+
+    def __init__(self, failures=0, error=ConnectionError):
+        """
+        Args:
+            failures (int): Calls that raise before the first one succeeds; -1 always raises
+            error (type): Exception raised by failing calls
+        """
+        self.failures = failures
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text, out_path, lang="en", tld="com", speed=1.0):
+        with self._lock:
+            self.calls.append(text)
+            if self.failures:
+                if self.failures > 0:
+                    self.failures -= 1
+                raise self.error(f"could not synthesize '{text}'")
+        samples = (0.2 * np.sin(np.arange(2400) * 2 * np.pi * 440 / 24000) * 32767).astype("<i2")
+        with wave.open(out_path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(24000)
+            out.writeframes(samples.tobytes())
+
+
+@pytest.fixture
+def options(tmp_path):
+    """synthesize_cached() options using a throwaway cache and phrase bank as the engine."""
+    return {
+        "engine": PhraseBankBackend(str(tmp_path / "bank")),
+        "cache_dir": str(tmp_path / "cache"),
+        "fallback_engine": None,
+        "chunked": False,
+        "retries": 2,
+        "backoff": 0,
+        "workers": 4,
+    }
+
+
+def test_duplicate_texts_are_synthesized_once(tmp_path, options):
+    stand_in = StandIn()
+    items = [("Save money.", str(tmp_path / f"block{i}.wav")) for i in range(3)]
+    results = generate_tts_batch(items, synthesize=stand_in, **options)
+    assert stand_in.calls == ["Save money."]
+    assert results == [path for _, path in items]
+    assert all(os.path.exists(path) for path in results)
+
+
+def test_unchanged_text_comes_from_the_cache(tmp_path, options):
+    stand_in = StandIn()
+    items = [("Save money.", str(tmp_path / "block1.wav")), ("Spend less.", str(tmp_path / "block2.wav"))]
+    generate_tts_batch(items, synthesize=stand_in, **options)
+    generate_tts_batch(items, synthesize=stand_in, **options)
+    assert sorted(stand_in.calls) == ["Save money.", "Spend less."]
+
+
+def test_edited_text_is_synthesized_again(tmp_path, options):
+    stand_in = StandIn()
+    out_path = str(tmp_path / "block1.wav")
+    generate_tts_batch([("Save money.", out_path)], synthesize=stand_in, **options)
+    generate_tts_batch([("Save more money.", out_path)], synthesize=stand_in, **options)
+    assert stand_in.calls == ["Save money.", "Save more money."]
+
+
+def test_transient_errors_are_retried(tmp_path, options):
+    stand_in = StandIn(failures=2)
+    results = generate_tts_batch([("Save money.", str(tmp_path / "block1.wav"))], synthesize=stand_in, **options)
+    assert len(stand_in.calls) == 3
+    assert results[0] is not None and os.path.exists(results[0])
+    assert not [name for name in os.listdir(options["cache_dir"]) if name.endswith(".tmp")]
+
+
+def test_final_failure_is_reported_per_item(tmp_path, options):
+    failing = StandIn(failures=-1)
+    working = StandIn()
+
+    def synthesize(text, *args):
+        return (failing if text == "Broken." else working)(text, *args)
+
+    items = [("Save money.", str(tmp_path / "block1.wav")), ("Broken.", str(tmp_path / "block2.wav"))]
+    results = generate_tts_batch(items, synthesize=synthesize, **options)
+    assert results[0] == items[0][1]
+    assert results[1] is None
+    assert len(failing.calls) == options["retries"] + 1
+    assert not os.path.exists(items[1][1])
+
+
+def test_engine_errors_are_not_retried(tmp_path, options):
+    stand_in = StandIn(failures=-1, error=TTSError)
+    results = generate_tts_batch([("Save money.", None)], synthesize=stand_in, **options)
+    assert results == [None]
+    assert stand_in.calls == ["Save money."]
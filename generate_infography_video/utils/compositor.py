@@ -0,0 +1,301 @@
+"""
+Compositor Utilities Module
+
+This module contains a NumPy layer compositor used instead of moviepy's
+CompositeVideoClip. Layers are blended as premultiplied uint8 data with
+uint16 integer math, in place, into one reused frame buffer:
+
+- fully transparent layers (opacity 0) are skipped;
+- the top-most fully opaque full-canvas layer becomes the frame's base, so
+  nothing underneath it is blended at all;
+- when the base is unchanged, only the rectangles that layers dirtied on the
+  previous frame are restored from it (damage rectangles), so small animated
+  overlays such as the click ripple or the GIF character cost in proportion
+  to the area they cover.
+
+The output frame and the uint16 work buffers come from the shared frame
+buffer pool, so the compositor of the next block reuses them.
+"""
+
+import numpy as np
+
+from .frame_buffers import frame_pool
+
+
+class Layer:
+    """
+    An overlay placed on the canvas.
+
+    The layer's source is an RGB or RGBA uint8 array, or a function of the
+    layer time returning one. Returning the same array object for repeated
+    frames lets the compositor skip work.
+    """
+
+    def __init__(self, source, position=(0, 0), start=0, duration=None, opacity=1.0, premultiplied=False):
+        """
+        Initialize the Layer.
+
+        Args:
+            source (numpy.ndarray or callable): RGB/RGBA uint8 patch, or a function
+                mapping layer time t to one
+            position (tuple or callable): Top-left corner as (x, y), or a function of t
+            start (float): Time in seconds at which the layer appears
+            duration (float, optional): How long the layer stays visible; forever if None
+            opacity (float or callable): Layer opacity in [0, 1], or a function of t
+            premultiplied (bool): Whether RGBA patches store RGB premultiplied by alpha
+        """
+        self.source = source
+        self.position = position
+        self.start = start
+        self.duration = duration
+        self.opacity = opacity
+        self.premultiplied = premultiplied
+
+    def is_active(self, t):
+        """Return whether the layer is visible at compositor time t."""
+        if t < self.start:
+            return False
+        return self.duration is None or t < self.start + self.duration
+
+    def get(self, t):
+        """
+        Return the layer's patch, position and opacity at compositor time t.
+
+        Args:
+            t (float): Time in seconds
+
+        Returns:
+            tuple: (patch, (x, y), opacity as 0-255) or None when the layer
+            is not visible
+        """
+        if not self.is_active(t):
+            return None
+        local_t = t - self.start
+        opacity = self.opacity(local_t) if callable(self.opacity) else self.opacity
+        opacity = int(round(255 * min(1.0, max(0.0, opacity))))
+        if opacity == 0:
+            return None
+        position = self.position(local_t) if callable(self.position) else self.position
+        patch = self.source(local_t) if callable(self.source) else self.source
+        return patch, (int(position[0]), int(position[1])), opacity
+
+    @classmethod
+    def from_clip(cls, clip, position=(0, 0), start=0):
+        """
+        Wrap a MoviePy clip (and its mask, if any) as a layer.
+
+        Args:
+            clip (VideoClip): Clip to read frames from
+            position (tuple or callable): Top-left corner as (x, y), or a function of t
+            start (float): Time in seconds at which the layer appears
+
+        Returns:
+            Layer: Layer producing RGBA patches from the clip
+        """
+        def source(t):
+            frame = clip.get_frame(t)
+            if clip.mask is None:
+                return frame
+            alpha = clip.mask.get_frame(t)
+            rgba = np.empty(frame.shape[:2] + (4,), dtype=np.uint8)
+            rgba[..., :3] = frame
+            rgba[..., 3] = np.clip(alpha * 255 + 0.5, 0, 255)
+            return rgba
+
+        return cls(source, position=position, start=start, duration=clip.duration)
+
+
+def fade_in(duration):
+    """
+    Return an opacity function ramping linearly from 0 to 1.
+
+    Args:
+        duration (float): Length of the ramp in seconds
+
+    Returns:
+        callable: Function of layer time t returning the opacity
+    """
+    if duration <= 0:
+        return 1.0
+    return lambda t: min(1.0, t / duration)
+
+
+class DamageCompositor:
+    """
+    Composite layers into a reused frame buffer, touching only what changed.
+
+    Each frame starts from the top-most active layer that is opaque and
+    covers the whole canvas (or from the compositor's base). If that base is
+    the same array object as on the previous frame, only the rectangles
+    dirtied by the layers above it are restored before blending again.
+    """
+
+    def __init__(self, base, layers=None):
+        """
+        Initialize the DamageCompositor.
+
+        Args:
+            base (numpy.ndarray or callable): RGB base frame, or a function of t
+                returning one. Returning the same array object while the base
+                is unchanged avoids a full-frame copy.
+            layers (list, optional): Layers drawn over the base, bottom to top
+        """
+        self.base = base
+        self.layers = list(layers or [])
+        self.output = None
+        self.changed = True
+        self._last_base = None
+        self._last_layers = None
+        self._dirty = []
+        self._scratch = None
+
+    def add_layer(self, layer):
+        """Add a layer on top of the existing ones."""
+        self.layers.append(layer)
+
+    def make_frame(self, t):
+        """
+        Return the composited frame at time t.
+
+        Args:
+            t (float): Time in seconds
+
+        Returns:
+            numpy.ndarray: RGB uint8 frame. The buffer is reused by the next
+            call, so copy it if it must outlive the current frame.
+        """
+        base = self.base(t) if callable(self.base) else self.base
+        current = []
+        for layer in self.layers:
+            entry = layer.get(t)
+            if entry is None:
+                continue
+            patch, position, opacity = entry
+            if (opacity == 255 and patch.shape[2] == 3 and position == (0, 0)
+                    and patch.shape[:2] == base.shape[:2]):
+                # Opaque full-canvas layer: everything below it is hidden
+                base = patch
+                current = []
+            else:
+                current.append((patch, position, opacity, layer.premultiplied))
+
+        # Nothing moved: the previous output is still valid
+        if base is self._last_base and self._same_layers(current):
+            self.changed = False
+            return self.output
+
+        self.changed = True
+        if self.output is None or self.output.shape != base.shape:
+            self.output = frame_pool.acquire(base.shape, owner=self)
+            np.copyto(self.output, base)
+        elif base is not self._last_base:
+            np.copyto(self.output, base)
+        else:
+            for x0, y0, x1, y1 in self._dirty:
+                self.output[y0:y1, x0:x1] = base[y0:y1, x0:x1]
+
+        self._dirty = []
+        for patch, position, opacity, premultiplied in current:
+            rect = blend_patch(self.output, patch, position, opacity, premultiplied, scratch=self._get_scratch)
+            if rect is not None:
+                self._dirty.append(rect)
+
+        self._last_base = base
+        self._last_layers = [(patch, position, opacity) for patch, position, opacity, _ in current]
+        return self.output
+
+    def _get_scratch(self, shape):
+        """Return uint16 work buffers of at least the given (h, w) shape."""
+        h, w = shape
+        if self._scratch is not None:
+            held_h, held_w = self._scratch[0].shape[:2]
+            if held_h < h or held_w < w:
+                h, w = max(h, held_h), max(w, held_w)
+                self._scratch = None
+        if self._scratch is None:
+            self._scratch = (frame_pool.acquire((h, w, 3), np.uint16, owner=self),
+                             frame_pool.acquire((h, w, 3), np.uint16, owner=self),
+                             frame_pool.acquire((h, w, 1), np.uint16, owner=self))
+        return tuple(buffer[:shape[0], :shape[1]] for buffer in self._scratch)
+
+    def _same_layers(self, current):
+        """Return whether every layer shows the same patch at the same spot."""
+        if self._last_layers is None or len(current) != len(self._last_layers):
+            return False
+        for (patch, position, opacity, _), last in zip(current, self._last_layers):
+            if patch is not last[0] or position != last[1] or opacity != last[2]:
+                return False
+        return True
+
+
+def _div255(values):
+    """Divide a uint16 array by 255 in place with exact rounding."""
+    values += 128
+    values += values >> 8
+    values >>= 8
+    return values
+
+
+def blend_patch(frame, patch, position, opacity=255, premultiplied=False, scratch=None):
+    """
+    Blend an RGB or RGBA patch into a frame in place.
+
+    Colour is premultiplied (if it is not stored that way already) and
+    composited with the "over" operator using uint16 integer math.
+
+    Args:
+        frame (numpy.ndarray): Destination RGB uint8 frame, modified in place
+        patch (numpy.ndarray): RGB or RGBA uint8 patch
+        position (tuple): Top-left corner of the patch as (x, y)
+        opacity (int): Layer opacity from 0 to 255
+        premultiplied (bool): Whether the patch RGB is premultiplied by alpha
+        scratch (callable, optional): Returns reusable uint16 work buffers
+            for a given (h, w); temporary arrays are allocated when omitted
+
+    Returns:
+        tuple: The touched rectangle as (x0, y0, x1, y1), or None if off-canvas
+    """
+    x, y = position
+    ph, pw = patch.shape[:2]
+    fh, fw = frame.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(fw, x + pw), min(fh, y + ph)
+    if x0 >= x1 or y0 >= y1 or opacity <= 0:
+        return None
+
+    src = patch[y0 - y:y1 - y, x0 - x:x1 - x]
+    dst = frame[y0:y1, x0:x1]
+    if src.shape[2] == 3 and opacity >= 255:
+        dst[...] = src
+        return x0, y0, x1, y1
+
+    shape = (y1 - y0, x1 - x0)
+    if scratch is not None:
+        color, acc, alpha = scratch(shape)
+    else:
+        color = np.empty(shape + (3,), dtype=np.uint16)
+        acc = np.empty(shape + (3,), dtype=np.uint16)
+        alpha = np.empty(shape + (1,), dtype=np.uint16)
+
+    # Premultiplied colour and alpha of the source
+    np.copyto(color, src[..., :3])
+    if src.shape[2] == 3:
+        alpha[...] = 255
+    else:
+        np.copyto(alpha, src[..., 3:4])
+        if not premultiplied:
+            color *= alpha
+            _div255(color)
+    if opacity < 255:
+        color *= opacity
+        _div255(color)
+        alpha *= opacity
+        _div255(alpha)
+
+    # dst = color + dst * (255 - alpha) / 255
+    np.subtract(255, alpha, out=alpha)
+    np.multiply(dst, alpha, out=acc)
+    _div255(acc)
+    acc += color
+    np.copyto(dst, acc, casting="unsafe")
+    return x0, y0, x1, y1
@@ -7,9 +7,12 @@ with typewriter effects for video generation.
 
 from PIL import Image as PILImage, ImageDraw, ImageFont, ImageFilter
 import numpy as np
-from moviepy.editor import VideoClip, CompositeVideoClip
+from functools import lru_cache
+from moviepy.editor import VideoClip
 from pathlib import Path
-from .gif_utils import gif_to_transparent_clip
+from .compositor import DamageCompositor, Layer, fade_in
+from .frame_buffers import frame_pool, image_to_array, union_box
+from .gif_utils import load_gif_sprite
 from .gif_utils import pixel_wrap
 
 # Import configuration variables
@@ -22,129 +25,533 @@ from config import MODULE_CONFIG
 svg_config = MODULE_CONFIG['generate_infography_video']['functionalities']['video-generator']
 font_path = svg_config['font_path']
 bullet_icon_path = svg_config['bullet_icon_path']
+cache_dir = svg_config['cache_dir']
 
-def create_typewriter_dialogue_clip(full_text, cartoon_path=None, background_clip=None,
-                                    dialogue_duration=2, bullet_icon_path=bullet_icon_path, canvas_size=any):
+# Blurred dialogue plates keyed by (raster path, mtime, canvas size, box, sigma)
+_PLATE_CACHE = {}
+_PLATE_CACHE_SIZE = 8
+
+
+def build_dialogue_plate(background, box, sigma=50, radius=40, outline=(30, 30, 30, 255), outline_width=5):
     """
-    Create a dialogue clip with a typewriter animation effect.
+    Render the static part of the dialogue overlay.
     
-    This function generates a video clip that displays text with a typewriter
-    animation, where characters appear one by one. It also supports displaying
-    bullet points with icons and an optional cartoon character.
+    The dialogue box area of the background is blurred a second time and the
+    rounded box outline is drawn on top. Everything that does not change while
+    the text is typed is baked into this plate.
     
     Args:
-        full_text (str): The complete text to display, with the first line as heading
-                        and subsequent lines as bullet points
-        cartoon_path (str, optional): Path to a GIF file for cartoon character
-        background_clip (VideoClip, optional): Background clip to use
-        dialogue_duration (float): Duration of the dialogue clip in seconds
-        bullet_icon_path (str): Path to the bullet point icon image
-        canvas_size (tuple): Size of the video canvas as (width, height)
+        background (numpy.ndarray): Blurred background frame (RGB)
+        box (tuple): Dialogue box as (x0, y0, x1, y1)
+        sigma (int): Blur radius applied inside the box
+        radius (int): Corner radius of the box outline
+        outline (tuple): RGBA colour of the box outline
+        outline_width (int): Width of the box outline in pixels
         
     Returns:
-        CompositeVideoClip: A MoviePy CompositeVideoClip with the dialogue animation
+        PIL.Image.Image: RGBA plate the size of the background
+    """
+    box_x0, box_y0, box_x1, box_y1 = box
+    plate = PILImage.fromarray(np.asarray(background)).convert("RGBA")
+    blur_region = plate.crop((box_x0, box_y0, box_x1, box_y1)).filter(ImageFilter.GaussianBlur(sigma))
+    plate.paste(blur_region, (box_x0, box_y0))
+    draw = ImageDraw.Draw(plate)
+    draw.rounded_rectangle([box_x0, box_y0, box_x1, box_y1], radius=radius, outline=outline, width=outline_width)
+    return plate
+
+
+def dialogue_box_mask(box, radius=40):
+    """
+    Return the alpha mask of the rounded dialogue box drawn by build_dialogue_plate().
+
+    Args:
+        box (tuple): Dialogue box as (x0, y0, x1, y1)
+        radius (int): Corner radius of the box
+
+    Returns:
+        numpy.ndarray: uint8 mask of shape (y1 - y0 + 1, x1 - x0 + 1); 255 inside the box
     """
+    box_x0, box_y0, box_x1, box_y1 = box
+    mask = PILImage.new("L", (box_x1 - box_x0 + 1, box_y1 - box_y0 + 1), 0)
+    ImageDraw.Draw(mask).rounded_rectangle([0, 0, box_x1 - box_x0, box_y1 - box_y0], radius=radius, fill=255)
+    return np.asarray(mask)
+
+
+def get_dialogue_plate(background_image_path, canvas_size, box, sigma=50):
+    """
+    Return the cached dialogue plate for a template raster.
     
-    # Parse text into heading and bullet points
-    heading, *points = full_text.strip().split("\n")
-    total_chars = len(full_text.replace("\n", " "))  # for timing calc
-    effective_duration = max(0.5, dialogue_duration - 4.0)
-    typing_speed = total_chars / effective_duration
-    duration = total_chars / typing_speed
-    fps = 24
+    The plate is built from the blurred raster once per raster file and
+    layout, then shared by every block that uses the same template.
+    
+    Args:
+        background_image_path (str): Path to the rendered template raster
+        canvas_size (tuple): Size of the video canvas as (width, height)
+        box (tuple): Dialogue box as (x0, y0, x1, y1)
+        sigma (int): Blur radius for both blur passes
+        
+    Returns:
+        PIL.Image.Image: RGBA plate; callers must copy before drawing on it
+    """
+    from .effects_utils import get_blurred_raster
+
+    key = (os.path.abspath(background_image_path), os.stat(background_image_path).st_mtime_ns,
+           tuple(canvas_size), tuple(box), sigma)
+    plate = _PLATE_CACHE.get(key)
+    if plate is None:
+        background = get_blurred_raster(background_image_path, sigma)
+        if background.shape[1::-1] != tuple(canvas_size):
+            background = np.array(PILImage.fromarray(background).resize(tuple(canvas_size), PILImage.LANCZOS))
+        plate = build_dialogue_plate(background, box, sigma=sigma)
+        if len(_PLATE_CACHE) >= _PLATE_CACHE_SIZE:
+            _PLATE_CACHE.pop(next(iter(_PLATE_CACHE)))
+        _PLATE_CACHE[key] = plate
+    return plate
+
+
+class DialogueLine:
+    """A wrapped line of dialogue text with its precomputed placement."""
 
-    # Load and prepare bullet icon
-    bullet_icon = PILImage.open(bullet_icon_path).convert("RGBA")
-    bullet_icon_size = (32, 32)
-    bullet_icon = bullet_icon.resize(bullet_icon_size, PILImage.LANCZOS)
+    __slots__ = ("text", "font", "x", "y", "start", "icon", "offsets")
 
-    # Calculate layout dimensions
-    left_width = int(canvas_size[0] * 0.2)
-    padding = int(canvas_size[0] * 0.06)
+    def __init__(self, text, font, x, y, start, icon=None):
+        """
+        Initialize the DialogueLine.
+        
+        Args:
+            text (str): Text of the wrapped line
+            font (ImageFont): Font used to draw the line
+            x (float or None): Left edge of the text, or None for centered lines
+            y (int): Top of the line
+            start (int): Character offset of the line in the typing order
+            icon (tuple, optional): Bullet icon anchor as (x, y)
+        """
+        self.text = text
+        self.font = font
+        self.x = x
+        self.y = y
+        self.start = start
+        self.icon = icon
+        # offsets[k] is the x advance of the first k glyphs
+        self.offsets = np.array([font.getlength(text[:k]) for k in range(len(text) + 1)])
+
+
+class DialogueLayout:
+    """
+    Precomputed layout and timing plan for one dialogue block.
     
-    desired_box_height = int(canvas_size[1] * 0.8)
-    box_width = canvas_size[0] - left_width - 2 * padding
-    box_x0 = left_width + padding
-    box_x1 = box_x0 + box_width
+    The layout wraps the heading and bullet points once, records each line's
+    position, glyph x-offsets and bullet icon anchor, and tabulates how many
+    characters are revealed at every frame. The same plan drives the video
+    render, snapshot export and previews.
+    """
 
-    # Vertically center the box
-    box_y0 = (canvas_size[1] - desired_box_height) // 2
-    box_y1 = box_y0 + desired_box_height
+    def __init__(self, full_text, canvas_size, dialogue_duration=2, fps=24,
+                 font_path=font_path, bullet_icon_size=(32, 32)):
+        """
+        Initialize the DialogueLayout.
+        
+        Args:
+            full_text (str): The complete text, first line heading, others bullet points
+            canvas_size (tuple): Size of the video canvas as (width, height)
+            dialogue_duration (float): Duration of the dialogue clip in seconds
+            fps (int): Frames per second of the timing table
+            font_path (str): Path to the font used for heading and body text
+            bullet_icon_size (tuple): Size of the bullet icon as (width, height)
+        """
+        self.full_text = full_text
+        self.canvas_size = tuple(canvas_size)
+        self.dialogue_duration = dialogue_duration
+        self.fps = fps
+        self.bullet_icon_size = tuple(bullet_icon_size)
 
-    # Set font sizes
-    heading_font_size = int(desired_box_height * 0.05)
-    body_font_size = int(desired_box_height * 0.035)
-    line_spacing = int(body_font_size * 1.6)
+        # Parse text into heading and bullet points
+        heading, *points = full_text.strip().split("\n")
+        self.total_chars = len(full_text.replace("\n", " "))  # for timing calc
+        effective_duration = max(0.5, dialogue_duration - 4.0)
+        typing_speed = self.total_chars / effective_duration
+        self.typing_duration = self.total_chars / typing_speed
 
-    heading_font = ImageFont.truetype(str(font_path), heading_font_size)
-    body_font = ImageFont.truetype(str(font_path), body_font_size)
+        # Calculate layout dimensions
+        left_width = int(canvas_size[0] * 0.2)
+        padding = int(canvas_size[0] * 0.06)
 
-    def make_frame(t):
-        """Generate a single frame of the typewriter animation."""
-        chars_to_show = int((t / duration) * total_chars)
-        shown_chars = 0
+        desired_box_height = int(canvas_size[1] * 0.8)
+        box_width = canvas_size[0] - left_width - 2 * padding
+        box_x0 = left_width + padding
+        box_x1 = box_x0 + box_width
 
-        # Get background frame and apply blur to dialogue area
-        bg_frame = background_clip.get_frame(t)
-        pil_bg = PILImage.fromarray(bg_frame).convert("RGBA")
-        blur_region = pil_bg.crop((box_x0, box_y0, box_x1, box_y1)).filter(ImageFilter.GaussianBlur(50))
-        pil_bg.paste(blur_region, (box_x0, box_y0))
+        # Vertically center the box
+        box_y0 = (canvas_size[1] - desired_box_height) // 2
+        box_y1 = box_y0 + desired_box_height
 
-        # Draw dialogue box
-        draw = ImageDraw.Draw(pil_bg)
-        draw.rounded_rectangle([box_x0, box_y0, box_x1, box_y1], radius=40, outline=(30, 30, 30, 255), width=5)
+        self.padding = padding
+        self.box_width = box_width
+        self.box = (box_x0, box_y0, box_x1, box_y1)
 
-        y = box_y0 + padding
+        # Set font sizes
+        heading_font_size = int(desired_box_height * 0.05)
+        body_font_size = int(desired_box_height * 0.035)
+        line_spacing = int(body_font_size * 1.6)
+
+        heading_font = _load_font(str(font_path), heading_font_size)
+        body_font = _load_font(str(font_path), body_font_size)
 
-        # === Render Heading ===
-        heading_wrapped = pixel_wrap(heading, heading_font, box_width - 2 * padding)
-        for _, hline in heading_wrapped:
-            if shown_chars >= chars_to_show:
-                break
-            chars_in_line = len(hline)
-            text_to_draw = hline[:max(0, chars_to_show - shown_chars)]
-            w = heading_font.getlength(text_to_draw)
-            x = box_x0 + (box_width - w) / 2
-            draw.text((x, y), text_to_draw, font=heading_font, fill="black")
+        # === Heading lines ===
+        self.lines = []
+        shown_chars = 0
+        y = box_y0 + padding
+        for _, hline in pixel_wrap(heading, heading_font, box_width - 2 * padding):
+            self.lines.append(DialogueLine(hline, heading_font, None, y, shown_chars))
             y += heading_font_size + 8
-            shown_chars += chars_in_line + 1  # line break
+            shown_chars += len(hline) + 1  # line break
 
         y += line_spacing // 2  # spacer
 
-        # === Render Bullet Points ===
+        # === Bullet point lines ===
+        text_x = box_x0 + padding + bullet_icon_size[0] + 10
         for point in points:
             clean_point = point.lstrip("•- ").strip()
             wrapped = pixel_wrap(clean_point, body_font, box_width - 2 * padding - bullet_icon_size[0] - 10)
             for i, (_, line) in enumerate(wrapped):
-                if shown_chars >= chars_to_show:
-                    break
-                chars_in_line = len(line)
-                text_to_draw = line[:max(0, chars_to_show - shown_chars)]
-
+                icon = None
                 if i == 0:
                     # Add bullet icon only on first line
-                    icon_x = box_x0 + padding
-                    icon_y = y + (body_font_size - bullet_icon_size[1]) // 2
-                    pil_bg.paste(bullet_icon, (icon_x, icon_y), bullet_icon)
-                    text_x = icon_x + bullet_icon_size[0] + 10
-                else:
-                    text_x = box_x0 + padding + bullet_icon_size[0] + 10
-
-                draw.text((text_x, y), text_to_draw, font=body_font, fill="black")
+                    icon = (box_x0 + padding, y + (body_font_size - bullet_icon_size[1]) // 2)
+                self.lines.append(DialogueLine(line, body_font, text_x, y, shown_chars, icon))
                 y += line_spacing
-                shown_chars += chars_in_line + 1
+                shown_chars += len(line) + 1
+
+        self.icon_anchors = [line.icon for line in self.lines if line.icon is not None]
+        self.reveal_table = self._build_reveal_table()
+
+    def _build_reveal_table(self):
+        """Map every frame index of the clip to its revealed character count."""
+        n_frames = int(np.ceil(self.dialogue_duration * self.fps)) + 1
+        times = np.arange(n_frames) / self.fps
+        return np.floor((times / self.typing_duration) * self.total_chars).astype(np.int64)
+
+    def chars_at(self, t):
+        """
+        Return the number of characters revealed at time t.
+        
+        Args:
+            t (float): Time in seconds from the start of the dialogue
+            
+        Returns:
+            int: Revealed character count
+        """
+        position = t * self.fps
+        index = int(round(position))
+        if abs(position - index) < 1e-6 and 0 <= index < len(self.reveal_table):
+            return int(self.reveal_table[index])
+        return int((t / self.typing_duration) * self.total_chars)
+
+    @property
+    def fully_typed_time(self):
+        """float: First time at which every line is completely revealed."""
+        return min(self.dialogue_duration, self.typing_duration)
+
+
+class TypewriterRenderer:
+    """
+    Incremental renderer for the typewriter text.
+    
+    The renderer keeps a persistent canvas on top of the dialogue plate and
+    only draws the glyphs revealed since the previous frame. Frames that show
+    the same number of characters as the previous one reuse the cached array.
+    Centered heading lines are redrawn as a whole because their position
+    depends on the revealed width.
+
+    The RGB frame lives in a pooled buffer; only the box touched since the
+    previous frame is exported from the canvas into it.
+    """
+
+    def __init__(self, plate, layout, bullet_icon):
+        """
+        Initialize the TypewriterRenderer.
+        
+        Args:
+            plate (PIL.Image.Image): RGBA dialogue plate; it is never modified
+            layout (DialogueLayout): Precomputed line plan for the block
+            bullet_icon (PIL.Image.Image): RGBA bullet icon
+        """
+        self.plate = plate
+        self.layout = layout
+        self.lines = layout.lines
+        self.bullet_icon = bullet_icon
+        self.box_x0 = layout.box[0]
+        self.box_width = layout.box_width
+
+        # Band of the plate covering all centered lines, restored before redrawing them
+        centered = [line for line in self.lines if line.x is None]
+        self._band = None
+        if centered:
+            probe = ImageDraw.Draw(PILImage.new("L", (1, 1)))
+            top = min(probe.textbbox((0, line.y), line.text, font=line.font)[1] for line in centered)
+            bottom = max(probe.textbbox((0, line.y), line.text, font=line.font)[3] for line in centered)
+            self._band = (self.box_x0 + 10, max(0, top - 2), self.box_x0 + self.box_width - 10, bottom + 2)
+
+        self.buffer = frame_pool.acquire((plate.height, plate.width, 3), owner=self)
+        self._reset()
+
+    def _reset(self):
+        """Start again from a clean copy of the plate."""
+        self.canvas = self.plate.copy()
+        self.draw = ImageDraw.Draw(self.canvas)
+        self.drawn = [0] * len(self.lines)
+        self.chars_shown = 0
+        self.frame = None
+        # Canvas box not yet exported to the frame buffer
+        self._dirty = (0, 0, self.canvas.width, self.canvas.height)
+
+    def render_image(self, chars_to_show):
+        """
+        Bring the canvas up to chars_to_show revealed characters.
+        
+        Args:
+            chars_to_show (int): Number of revealed characters
+            
+        Returns:
+            PIL.Image.Image: The persistent RGBA canvas; copy before modifying
+        """
+        if chars_to_show < self.chars_shown:
+            self._reset()
+
+        redraw_centered = False
+        for index, line in enumerate(self.lines):
+            reveal = min(len(line.text), max(0, chars_to_show - line.start))
+            done = self.drawn[index]
+            if reveal <= done:
+                continue
+            if line.x is None:
+                redraw_centered = True
+                self.drawn[index] = reveal
+                continue
+            if done == 0 and line.icon is not None:
+                self.canvas.paste(self.bullet_icon, line.icon, self.bullet_icon)
+                icon_x, icon_y = line.icon[:2]
+                self._touch((icon_x, icon_y, icon_x + self.bullet_icon.width, icon_y + self.bullet_icon.height))
+            x = line.x + line.offsets[done]
+            text = line.text[done:reveal]
+            self.draw.text((x, line.y), text, font=line.font, fill="black")
+            self._touch(self.draw.textbbox((x, line.y), text, font=line.font))
+            self.drawn[index] = reveal
 
-        return np.array(pil_bg.convert("RGB"))[:, :, :3]
+        if redraw_centered:
+            self.canvas.paste(self.plate.crop(self._band), self._band[:2])
+            self._touch(self._band)
+            for index, line in enumerate(self.lines):
+                if line.x is None and self.drawn[index]:
+                    reveal = self.drawn[index]
+                    x = self.box_x0 + (self.box_width - line.offsets[reveal]) / 2
+                    self.draw.text((x, line.y), line.text[:reveal], font=line.font, fill="black")
 
-    # Create the dialogue clip
-    dialogue_clip = VideoClip(make_frame=make_frame, duration=dialogue_duration).set_fps(fps)
+        if chars_to_show != self.chars_shown:
+            self.frame = None
+        self.chars_shown = chars_to_show
+        return self.canvas
 
-    # Add cartoon character if provided
-    overlays = [dialogue_clip]
+    def _touch(self, box):
+        """Add a canvas box, padded for antialiasing, to the region to export."""
+        x0, y0, x1, y1 = box
+        box = (max(0, int(x0) - 1), max(0, int(y0) - 1),
+               min(self.canvas.width, int(x1) + 2), min(self.canvas.height, int(y1) + 2))
+        self._dirty = union_box(self._dirty, box)
+
+    def render(self, chars_to_show):
+        """
+        Return the frame showing the first chars_to_show characters.
+        
+        Args:
+            chars_to_show (int): Number of revealed characters
+            
+        Returns:
+            numpy.ndarray: Read-only RGB frame; shared between identical frames.
+            It is a view of the renderer's buffer, valid until the next
+            frame with a different character count.
+        """
+        if self.frame is not None and chars_to_show == self.chars_shown:
+            return self.frame
+        self.render_image(chars_to_show)
+        if self._dirty is not None:
+            x0, y0, x1, y1 = self._dirty
+            if x0 < x1 and y0 < y1:
+                image_to_array(self.canvas, out=self.buffer[y0:y1, x0:x1], box=self._dirty, channels=3)
+            self._dirty = None
+        # A new view object per change, so compositors see a new base
+        self.frame = self.buffer.view()
+        self.frame.flags.writeable = False
+        return self.frame
+
+
+@lru_cache(maxsize=16)
+def _load_font(path, size):
+    """Load a TrueType font once per (path, size)."""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=8)
+def load_bullet_icon(icon_path=bullet_icon_path, size=(32, 32)):
+    """
+    Load and resize the bullet icon once per (path, size).
+    
+    Args:
+        icon_path (str): Path to the bullet point icon image
+        size (tuple): Icon size as (width, height)
+        
+    Returns:
+        PIL.Image.Image: RGBA icon; shared, do not modify
+    """
+    with PILImage.open(icon_path) as icon:
+        return icon.convert("RGBA").resize(tuple(size), PILImage.LANCZOS)
+
+
+def render_dialogue_snapshot(layout, background_image_path, chars_to_show=None,
+                             bullet_icon_path=bullet_icon_path, thumbnail_width=None):
+    """
+    Render a still frame of the dialogue overlay from a precomputed layout.
+    
+    Used for snapshot and thumbnail export as well as quick previews; it
+    shares the cached plate and the line plan with the video render.
+    
+    Args:
+        layout (DialogueLayout): Precomputed layout for the block
+        background_image_path (str): Template raster the plate is built from
+        chars_to_show (int, optional): Revealed character count. Defaults to the full text.
+        bullet_icon_path (str): Path to the bullet point icon image
+        thumbnail_width (int, optional): Scale the image down to this width, keeping its aspect ratio
+        
+    Returns:
+        PIL.Image.Image: RGB image of the dialogue overlay
+    """
+    if chars_to_show is None:
+        chars_to_show = layout.total_chars
+    plate = get_dialogue_plate(background_image_path, layout.canvas_size, layout.box)
+    renderer = TypewriterRenderer(plate, layout, load_bullet_icon(bullet_icon_path, layout.bullet_icon_size))
+    image = renderer.render_image(chars_to_show).convert("RGB")
+    if thumbnail_width and thumbnail_width < image.width:
+        height = round(image.height * thumbnail_width / image.width)
+        image = image.resize((thumbnail_width, height), PILImage.LANCZOS)
+    return image
+
+
+def create_typewriter_dialogue_layers(full_text, cartoon_path=None, background_clip=None,
+                                      dialogue_duration=2, bullet_icon_path=bullet_icon_path, canvas_size=any,
+                                      background_image_path=None, layout=None, start=0, fade_duration=0,
+                                      box_only=True):
+    """
+    Create the compositor layers of a typewriter dialogue.
+    
+    The first layer is the typewriter frame: by default only the rounded
+    dialogue box, as an RGBA patch, so a transition running underneath stays
+    visible around it; with box_only=False the full canvas. The cartoon
+    character, if any, follows as a small premultiplied sprite layer. Both
+    fade in together over fade_duration seconds.
+    
+    Args:
+        full_text (str): The complete text to display, with the first line as heading
+                        and subsequent lines as bullet points
+        cartoon_path (str, optional): Path to a GIF file for cartoon character
+        background_clip (VideoClip, optional): Static background clip to use. Its
+                        first frame is turned into the dialogue plate once.
+        dialogue_duration (float): Duration of the dialogue in seconds
+        bullet_icon_path (str): Path to the bullet point icon image
+        canvas_size (tuple): Size of the video canvas as (width, height)
+        background_image_path (str, optional): Template raster to build the
+                        background from. The blurred plate is then cached and
+                        shared across blocks; takes precedence over background_clip.
+        layout (DialogueLayout, optional): Precomputed layout for this block.
+                        Built from full_text when not given.
+        start (float): Time in seconds at which the dialogue appears
+        fade_duration (float): Length of the fade-in in seconds
+        box_only (bool): Draw only the dialogue box instead of the full canvas
+        
+    Returns:
+        list: Layers for a DamageCompositor, bottom to top
+    """
+    if layout is None:
+        layout = DialogueLayout(full_text, canvas_size, dialogue_duration)
+
+    bullet_icon = load_bullet_icon(bullet_icon_path, layout.bullet_icon_size)
+
+    # Static plate: blurred background, second blur inside the box and outline
+    if background_image_path is not None:
+        plate = get_dialogue_plate(background_image_path, layout.canvas_size, layout.box)
+    else:
+        plate = build_dialogue_plate(background_clip.get_frame(0), layout.box)
+
+    renderer = TypewriterRenderer(plate, layout, bullet_icon)
+
+    def make_frame(t):
+        """Generate a single frame of the typewriter animation."""
+        return renderer.render(layout.chars_at(t))
+
+    opacity = fade_in(fade_duration)
+    if box_only:
+        box_x0, box_y0, box_x1, box_y1 = layout.box
+        patch = frame_pool.acquire((box_y1 - box_y0 + 1, box_x1 - box_x0 + 1, 4), owner=renderer)
+        patch[..., 3] = dialogue_box_mask(layout.box)
+        last = {"frame": None, "patch": None}
+
+        def make_box_frame(t):
+            """Return the dialogue box of the current frame; a new view only when it changed."""
+            frame = make_frame(t)
+            if frame is not last["frame"]:
+                patch[..., :3] = frame[box_y0:box_y1 + 1, box_x0:box_x1 + 1]
+                last["frame"] = frame
+                last["patch"] = patch.view()
+            return last["patch"]
+
+        layers = [Layer(make_box_frame, position=(box_x0, box_y0), start=start,
+                        duration=dialogue_duration, opacity=opacity)]
+    else:
+        layers = [Layer(make_frame, start=start, duration=dialogue_duration, opacity=opacity)]
+
+    # Add cartoon character if provided; only its rectangle is redrawn per frame
     if cartoon_path:
-        character = gif_to_transparent_clip(cartoon_path, duration=dialogue_duration, resize_height=300)
-        character = character.set_position((int(canvas_size[0] * 0.03), "center"))
-        overlays.append(character)
+        character = load_gif_sprite(cartoon_path, resize_height=300, premultiply=True, cache_dir=cache_dir)
+        position = (int(layout.canvas_size[0] * 0.03), int((layout.canvas_size[1] - character.h) / 2))
+        layers.append(character.layer(position=position, start=start, duration=dialogue_duration, opacity=opacity))
+
+    return layers
 
-    return CompositeVideoClip(overlays).set_duration(dialogue_duration)
 
+def create_typewriter_dialogue_clip(full_text, cartoon_path=None, background_clip=None,
+                                    dialogue_duration=2, bullet_icon_path=bullet_icon_path, canvas_size=any,
+                                    background_image_path=None, layout=None):
+    """
+    Create a dialogue clip with a typewriter animation effect.
+    
+    This function generates a video clip that displays text with a typewriter
+    animation, where characters appear one by one. It also supports displaying
+    bullet points with icons and an optional cartoon character.
+    
+    Args:
+        full_text (str): The complete text to display, with the first line as heading
+                        and subsequent lines as bullet points
+        cartoon_path (str, optional): Path to a GIF file for cartoon character
+        background_clip (VideoClip, optional): Static background clip to use. Its
+                        first frame is turned into the dialogue plate once.
+        dialogue_duration (float): Duration of the dialogue clip in seconds
+        bullet_icon_path (str): Path to the bullet point icon image
+        canvas_size (tuple): Size of the video canvas as (width, height)
+        background_image_path (str, optional): Template raster to build the
+                        background from. The blurred plate is then cached and
+                        shared across blocks; takes precedence over background_clip.
+        layout (DialogueLayout, optional): Precomputed layout for this block.
+                        Built from full_text when not given.
+        
+    Returns:
+        VideoClip: A MoviePy VideoClip with the dialogue animation
+    """
+    fps = 24
+    if layout is None:
+        layout = DialogueLayout(full_text, canvas_size, dialogue_duration, fps=fps)
+
+    layers = create_typewriter_dialogue_layers(
+        full_text, cartoon_path, background_clip, dialogue_duration, bullet_icon_path,
+        layout.canvas_size, background_image_path, layout, box_only=False
+    )
+    compositor = DamageCompositor(layers[0].source, layers[1:])
+    return VideoClip(make_frame=compositor.make_frame, duration=dialogue_duration).set_fps(fps)
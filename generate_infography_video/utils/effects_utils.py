@@ -7,7 +7,10 @@ including click effects, highlights, and other animations.
 
 from PIL import Image as PILImage, ImageDraw
 import numpy as np
+from functools import lru_cache
 from moviepy.editor import VideoClip
+from .compositor import DamageCompositor, Layer
+from .frame_buffers import frame_pool, image_to_array
 
 # Import configuration variables
 import sys
@@ -26,6 +29,9 @@ def create_click_effect_clip(x, y, w, h, duration, canvas_size, fps=24):
     
     This function generates a pulsing blue rectangle animation that highlights
     a specific area of the video, typically used to draw attention to content blocks.
+    The pulse is periodic, so only the few distinct ripple states are rendered,
+    and only for the region around the rectangle; every frame is then served
+    from that cache by phase.
     
     Args:
         x (int): X-coordinate of the rectangle's top-left corner
@@ -39,47 +45,376 @@ def create_click_effect_clip(x, y, w, h, duration, canvas_size, fps=24):
     Returns:
         VideoClip: A MoviePy VideoClip object with the animated effect
     """
-    base_img = PILImage.open(converted_image_path).convert("RGBA")
+    ripple = ClickRipple(load_raster(converted_image_path, canvas_size), x, y, w, h, fps=fps)
 
-    def make_frame(t):
-        """Generate a single frame of the click effect animation."""
-        frame = base_img.copy()
-        draw = ImageDraw.Draw(frame, 'RGBA')
+    # Only the ripple region is restored and redrawn on each frame
+    compositor = DamageCompositor(ripple.base, [ripple.layer()])
+
+    click_effect_clip = VideoClip(compositor.make_frame, duration=duration)
+    click_effect_clip = click_effect_clip.set_fps(fps)
+    return click_effect_clip
+
+
+class ClickRipple:
+    """
+    Memoized rectangular ripple drawn over a static base raster.
+    
+    The ripple only depends on its border width and alpha, which repeat with
+    the pulse period (2 Hz), so each distinct state is rendered once as a
+    small RGB patch around the rectangle.
+    """
+
+    max_border_width = 10
+    pulse_hz = 2
+    color = (0, 120, 255)  # Blue rectangle with varying opacity
+
+    def __init__(self, base, x, y, w, h, fps=24):
+        """
+        Initialize the ClickRipple and render one pulse period.
         
-        # Animation: rectangle border flashes expanding and fading
-        max_border_width = 10
+        Args:
+            base (numpy.ndarray): RGB base raster the ripple is drawn over
+            x (int): X-coordinate of the rectangle's top-left corner
+            y (int): Y-coordinate of the rectangle's top-left corner
+            w (int): Width of the rectangle
+            h (int): Height of the rectangle
+            fps (int): Frame rate used to precompute one pulse period
+        """
+        self.base = base
+        self.rect = (x, y, w, h)
+
+        # Region that any ripple state can touch, clipped to the canvas
+        margin = self.max_border_width // 2 + 2
+        height, width = base.shape[:2]
+        self.region = (
+            max(0, x - margin), max(0, y - margin),
+            min(width, x + w + margin + 1), min(height, y + h + margin + 1)
+        )
+        self._patches = {}
+
+        # Precompute one period of frames so rendering is done up front
+        period_frames = max(1, round(fps / self.pulse_hz))
+        for index in range(period_frames):
+            self.patch(index / fps)
+
+    def state(self, t):
+        """Return the (border_width, alpha) of the ripple at time t."""
         # Oscillate width and alpha to create pulse effect
-        pulse = (np.sin(2 * np.pi * t * 2) + 1) / 2  # oscillates 0 to 1 twice per second
-        border_width = int(max_border_width * pulse)
+        pulse = (np.sin(2 * np.pi * t * self.pulse_hz) + 1) / 2  # oscillates 0 to 1 twice per second
+        border_width = int(self.max_border_width * pulse)
         alpha = int(150 + 105 * pulse)  # oscillates between 150 and 255
+        return border_width, alpha
 
-        color = (0, 120, 255, alpha)  # Blue rectangle with varying opacity
+    def patch(self, t):
+        """
+        Return the RGB patch covering the ripple region at time t.
+        
+        Args:
+            t (float): Time in seconds
+            
+        Returns:
+            numpy.ndarray: Read-only uint8 patch of shape (h, w, 3)
+        """
+        key = self.state(t)
+        patch = self._patches.get(key)
+        if patch is None:
+            patch = self._render(*key)
+            self._patches[key] = patch
+        return patch
+
+    def _render(self, border_width, alpha):
+        """Draw one ripple state on a crop of the base raster."""
+        rx0, ry0, rx1, ry1 = self.region
+        x, y, w, h = self.rect
+        crop = PILImage.fromarray(self.base[ry0:ry1, rx0:rx1]).convert("RGBA")
+        draw = ImageDraw.Draw(crop, 'RGBA')
 
         # Draw expanding rectangle border from (x,y,w,h) outward by border_width/2 each side
         rect_coords = [
-            x - border_width // 2,
-            y - border_width // 2,
-            x + w + border_width // 2,
-            y + h + border_width // 2
+            x - border_width // 2 - rx0,
+            y - border_width // 2 - ry0,
+            x + w + border_width // 2 - rx0,
+            y + h + border_width // 2 - ry0
         ]
 
         # Draw the border (rectangle outline)
-        draw.rounded_rectangle(rect_coords, outline=color, width=max(border_width, 1), radius=50)
+        draw.rounded_rectangle(rect_coords, outline=self.color + (alpha,), width=max(border_width, 1), radius=50)
 
-        return np.array(frame.convert("RGB"))  # Convert RGBA to RGB for MoviePy compositing
+        # Alpha is opaque after drawing on an RGB crop; the RGB view is the patch
+        return image_to_array(crop, channels=3)
 
-    click_effect_clip = VideoClip(make_frame, duration=duration)
-    click_effect_clip = click_effect_clip.set_fps(fps).resize(newsize=canvas_size)
-    return click_effect_clip
+    def layer(self, start=0, duration=None):
+        """
+        Return the ripple as a compositor layer covering only its region.
+        
+        Args:
+            start (float): Time in seconds at which the ripple appears
+            duration (float, optional): How long the ripple stays visible
+            
+        Returns:
+            Layer: Layer serving the memoized patches by phase
+        """
+        return Layer(self.patch, position=self.region[:2], start=start, duration=duration)
+
+
+_PYRAMID_CACHE = {}
+
+# Output rows sampled at a time, bounding the scratch buffers of a ZoomPyramid
+_ZOOM_BAND = 64
 
 
-def blur_image(image_clip, sigma=50):
+def _bilinear_taps(coords, size):
+    """
+    Return the two source indices and 8-bit weight of each sample position.
+    
+    Args:
+        coords (numpy.ndarray): Sample positions in source pixels, where
+            integer values are pixel centres
+        size (int): Number of source pixels along the axis
+        
+    Returns:
+        tuple: (first, second, weight) arrays; weight, between 0 and 256, is
+        the share of the second index
+    """
+    coords = np.clip(coords, 0, size - 1)
+    first = np.minimum(coords.astype(np.intp), max(0, size - 2))
+    second = np.minimum(first + 1, size - 1)
+    weight = np.rint((coords - first) * 256).astype(np.uint16)
+    return first, second, weight
+
+
+class ZoomPyramid:
+    """
+    Smooth zoom from the full canvas into a rectangle of a static raster.
+    
+    The zoom is served from a small pyramid of pre-scaled crops. Level k is
+    the raster enlarged by step**k with LANCZOS, cropped to the largest view
+    it has to serve. A frame is then sampled from the nearest level at or
+    above its magnification, which is at most `step` times larger than the
+    output. Sampling is bilinear with 8-bit fixed-point weights, so the view
+    glides by sub-pixel amounts instead of stepping a whole level pixel at a
+    time, and it runs in bands of rows to keep the scratch buffers small.
+    """
+
+    def __init__(self, base, rect, max_zoom=2.0, step=1.25, margin=40):
+        """
+        Initialize the ZoomPyramid and render its levels.
+        
+        Args:
+            base (numpy.ndarray): RGB raster to zoom into
+            rect (tuple): Region to zoom to as (x, y, w, h)
+            max_zoom (float): Largest magnification allowed
+            step (float): Scale ratio between consecutive pyramid levels
+            margin (int): Padding kept around the region, in pixels
+        """
+        self.base = base
+        height, width = base.shape[:2]
+        self.size = (width, height)
+
+        # Target view: the padded region at the canvas aspect ratio, centred on it
+        x, y, w, h = rect
+        zoom = min(width / (w + 2 * margin), height / (h + 2 * margin))
+        self.final_zoom = min(max_zoom, max(1.0, zoom))
+        view_w, view_h = width / self.final_zoom, height / self.final_zoom
+        self.target = (
+            min(width - view_w, max(0.0, x + w / 2 - view_w / 2)),
+            min(height - view_h, max(0.0, y + h / 2 - view_h / 2))
+        )
+
+        # Levels are read-only, so copies of a scene built for parallel
+        # workers share them
+        key = (id(base), tuple(rect), max_zoom, step, margin)
+        cached = _PYRAMID_CACHE.get(key)
+        if cached is None or cached[0] is not base:
+            cached = (base, self._build_levels(step))
+            if len(_PYRAMID_CACHE) >= 8:
+                _PYRAMID_CACHE.pop(next(iter(_PYRAMID_CACHE)))
+            _PYRAMID_CACHE[key] = cached
+        self._levels = cached[1]
+
+        # Scratch for one band of rows: gathered level rows, their blend and
+        # the two column taps
+        widest = max([width] + [level.shape[1] for _, _, _, level in self._levels])
+        self._gather = frame_pool.acquire((_ZOOM_BAND * widest * 4,), np.uint8, owner=self)
+        self._scratch = [frame_pool.acquire((_ZOOM_BAND * widest * 4,), np.uint16, owner=self) for _ in range(3)]
+        # Two alternating output buffers, so consecutive frames are distinct objects
+        self._buffers = [frame_pool.acquire((height, width), np.uint32, owner=self) for _ in range(2)]
+        self._flip = 0
+        self._final_frame = None
+
+    def _build_levels(self, step):
+        """Render the pyramid levels, from step up to the final zoom."""
+        height, width = self.base.shape[:2]
+        scales = []
+        scale = 1.0
+        while scale < self.final_zoom:
+            scale = min(self.final_zoom, scale * step)
+            scales.append(scale)
+
+        levels = []
+        previous = 1.0
+        for scale in scales:
+            # The largest view a level serves is the one at the previous scale
+            vx, vy, vw, vh = self.view(previous)
+            x0, y0 = int(vx), int(vy)
+            x1, y1 = min(width, int(np.ceil(vx + vw))), min(height, int(np.ceil(vy + vh)))
+            crop = PILImage.fromarray(np.ascontiguousarray(self.base[y0:y1, x0:x1]))
+            level_size = (round((x1 - x0) * scale), round((y1 - y0) * scale))
+            level = image_to_array(crop.resize(level_size, PILImage.LANCZOS).convert("RGBA"))
+            # RGBA pixels packed as uint32 so sampling gathers one word per pixel
+            level = level.view(np.uint32)[..., 0]
+            level.flags.writeable = False
+            levels.append((scale, x0, y0, level))
+            previous = scale
+        return levels
+
+    def view(self, zoom):
+        """
+        Return the canvas region shown at a given magnification.
+        
+        Args:
+            zoom (float): Magnification between 1 and final_zoom
+            
+        Returns:
+            tuple: Region as (x, y, w, h) in canvas coordinates
+        """
+        width, height = self.size
+        view_w, view_h = width / zoom, height / zoom
+        if self.final_zoom <= 1.0:
+            return 0.0, 0.0, view_w, view_h
+        u = (width - view_w) / (width - width / self.final_zoom)
+        return u * self.target[0], u * self.target[1], view_w, view_h
+
+    def frame(self, progress):
+        """
+        Return the zoomed frame for a progress from 0 (full canvas) to 1.
+        
+        Args:
+            progress (float): Zoom progress; magnification grows geometrically
+            
+        Returns:
+            numpy.ndarray: RGB uint8 frame of the canvas size. It is reused two
+            frames later, except for the endpoints.
+        """
+        if progress <= 0 or not self._levels:
+            return self.base
+        if progress >= 1 and self._final_frame is not None:
+            return self._final_frame
+
+        zoom = self.final_zoom ** min(1.0, progress)
+        for scale, x0, y0, level in self._levels:
+            if scale >= zoom - 1e-9:
+                break
+        width, height = self.size
+        vx, vy, vw, vh = self.view(zoom)
+
+        # Output pixel centres mapped into the level, as bilinear taps
+        row0, row1, row_weight = _bilinear_taps(
+            (vy - y0 + (np.arange(height) + 0.5) * vh / height) * scale - 0.5, level.shape[0])
+        col0, col1, col_weight = _bilinear_taps(
+            (vx - x0 + (np.arange(width) + 0.5) * vw / width) * scale - 0.5, level.shape[1])
+        # Per-channel weights, so the products broadcast over rows only
+        col_keep = np.repeat(256 - col_weight, 4).reshape(1, width, 4)
+        col_weight = np.repeat(col_weight, 4).reshape(1, width, 4)
+
+        out = self._buffers[self._flip]
+        self._flip ^= 1
+        out_pixels = out.view(np.uint8).reshape(height, width, 4)
+        level_width = level.shape[1]
+        for top in range(0, height, _ZOOM_BAND):
+            bottom = min(height, top + _ZOOM_BAND)
+            n = bottom - top
+            # Pixels are gathered as one packed word each (uint32 for RGBA,
+            # uint64 for the 16-bit blends) and blended per channel
+            gathered = self._gather[:n * level_width * 4].view(np.uint32).reshape(n, level_width)
+            channels = gathered.view(np.uint8).reshape(n, level_width, 4)
+            mixed, left, right = (buffer[:n * level_width * 4] for buffer in self._scratch)
+            mixed = mixed.reshape(n, level_width, 4)
+            tap = left.reshape(n, level_width, 4)
+
+            # Blend the two source rows of every output row...
+            weight = row_weight[top:bottom, None, None]
+            np.take(level, row0[top:bottom], axis=0, out=gathered)
+            np.multiply(channels, 256 - weight, out=mixed)
+            np.take(level, row1[top:bottom], axis=0, out=gathered)
+            np.multiply(channels, weight, out=tap)
+            mixed += tap
+            mixed >>= 8
+
+            # ...then the two source columns of every output pixel
+            left = left[:n * width * 4].reshape(n, width, 4)
+            right = right[:n * width * 4].reshape(n, width, 4)
+            packed = mixed.view(np.uint64)[..., 0]
+            np.take(packed, col0, axis=1, out=left.view(np.uint64)[..., 0])
+            left *= col_keep
+            np.take(packed, col1, axis=1, out=right.view(np.uint64)[..., 0])
+            right *= col_weight
+            left += right
+            left >>= 8
+            np.copyto(out_pixels[top:bottom], left, casting="unsafe")
+        frame = out_pixels[..., :3]
+
+        if progress >= 1:
+            frame = np.array(frame)
+            frame.flags.writeable = False
+            self._final_frame = frame
+        return frame
+
+    def layer(self, start=0, duration=1.0, easing=None):
+        """
+        Return the zoom as an opaque full-canvas compositor layer.
+        
+        Args:
+            start (float): Time in seconds at which the zoom begins
+            duration (float): Length of the zoom in seconds
+            easing (callable, optional): Maps linear progress to eased progress
+            
+        Returns:
+            Layer: Layer zooming in over its duration
+        """
+        def source(t):
+            progress = min(1.0, t / duration) if duration > 0 else 1.0
+            return self.frame(easing(progress) if easing else progress)
+
+        return Layer(source, start=start, duration=duration)
+
+
+def load_raster(image_path, size=None):
+    """
+    Load an image file as an RGB array, once per file version and size.
+    
+    Args:
+        image_path (str): Path to the raster image
+        size (tuple, optional): Resize to (width, height) if the raster differs
+        
+    Returns:
+        numpy.ndarray: Read-only RGB image as a uint8 array
+    """
+    stat = os.stat(image_path)
+    return _load_raster(os.path.abspath(image_path), stat.st_mtime_ns, tuple(size) if size else None)
+
+
+@lru_cache(maxsize=8)
+def _load_raster(image_path, mtime_ns, size):
+    """Decode a raster once per (path, mtime, size); see load_raster."""
+    with PILImage.open(image_path) as img:
+        rgb = img.convert("RGB")
+    if size is not None and rgb.size != size:
+        rgb = rgb.resize(size, PILImage.LANCZOS)
+    array = np.array(rgb)
+    array.flags.writeable = False
+    return array
+
+
+def blur_image(image_clip, sigma=50, image_path=None):
     """
     Apply Gaussian blur to an image clip.
     
     Args:
         image_clip (ImageClip): MoviePy ImageClip to blur
         sigma (int, optional): Blur intensity. Higher values = more blur. Defaults to 50.
+        image_path (str, optional): Raster the clip was loaded from. When given,
+            the blurred raster is taken from a cache shared by all blocks.
         
     Returns:
         ImageClip: Blurred version of the input clip
@@ -88,7 +423,40 @@ def blur_image(image_clip, sigma=50):
     import numpy as np
     from moviepy.editor import ImageClip
     
-    frame = image_clip.get_frame(0)
-    pil_image = PILImage.fromarray(frame)
-    blurred = pil_image.filter(ImageFilter.GaussianBlur(radius=sigma))
-    return ImageClip(np.array(blurred)).set_duration(image_clip.duration).set_position("center")
+    if image_path is not None:
+        blurred = get_blurred_raster(image_path, sigma)
+    else:
+        frame = image_clip.get_frame(0)
+        pil_image = PILImage.fromarray(frame)
+        blurred = np.array(pil_image.filter(ImageFilter.GaussianBlur(radius=sigma)))
+    return ImageClip(blurred).set_duration(image_clip.duration).set_position("center")
+
+
+def get_blurred_raster(image_path, sigma=50):
+    """
+    Return the Gaussian-blurred RGB raster of an image file.
+    
+    The result is cached per file path, modification time and blur radius,
+    so every block rendered from the same template raster shares one blur.
+    
+    Args:
+        image_path (str): Path to the raster image
+        sigma (int, optional): Blur radius. Defaults to 50.
+        
+    Returns:
+        numpy.ndarray: Read-only blurred RGB image as a uint8 array
+    """
+    stat = os.stat(image_path)
+    return _blurred_raster(os.path.abspath(image_path), stat.st_mtime_ns, sigma)
+
+
+@lru_cache(maxsize=8)
+def _blurred_raster(image_path, mtime_ns, sigma):
+    """Blur a raster once per (path, mtime, sigma); see get_blurred_raster."""
+    from PIL import ImageFilter
+
+    with PILImage.open(image_path) as img:
+        blurred = img.convert("RGB").filter(ImageFilter.GaussianBlur(radius=sigma))
+    array = np.array(blurred)
+    array.flags.writeable = False
+    return array
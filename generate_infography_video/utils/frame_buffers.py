@@ -0,0 +1,149 @@
+"""
+Frame Buffers Module
+
+This module contains a pool of reusable frame-sized arrays and helpers that
+move pixels between Pillow and NumPy with as few full-frame copies as
+possible. Frame functions keep their output and scratch arrays in the pool
+instead of allocating new ones for every frame or every block, and export
+only the part of a Pillow canvas that actually changed.
+"""
+
+import weakref
+import threading
+
+import numpy as np
+from PIL import Image as PILImage
+
+
+# Pillow modes whose raw layout matches a NumPy array and can wrap it without a copy
+_SHARED_MODES = {1: "L", 4: "RGBA"}
+
+
+class FrameBufferPool:
+    """
+    Free lists of preallocated arrays, keyed by shape and dtype.
+
+    Buffers acquired with an owner go back to the pool automatically when the
+    owner is garbage collected, so the compositors, transitions and renderers
+    of one block hand their frame buffers on to those of the next block.
+    The pool is thread-safe: render workers acquire buffers concurrently and
+    finalizers release them on whichever thread collects the owner.
+    """
+
+    def __init__(self, max_per_key=8):
+        """
+        Initialize the FrameBufferPool.
+
+        Args:
+            max_per_key (int): Free buffers kept per shape and dtype
+        """
+        self.max_per_key = max_per_key
+        self.allocations = 0
+        self.reuses = 0
+        self._free = {}
+        # Reentrant: a collection triggered inside a locked section may run a
+        # finalizer that releases a buffer on the same thread
+        self._lock = threading.RLock()
+
+    def acquire(self, shape, dtype=np.uint8, owner=None):
+        """
+        Return an uninitialized array, reusing a released one when possible.
+
+        Args:
+            shape (tuple): Shape of the array
+            dtype (numpy.dtype): Data type of the array
+            owner (object, optional): Object whose garbage collection returns
+                the buffer to the pool
+
+        Returns:
+            numpy.ndarray: Writable array of the requested shape and dtype
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            buffer = free.pop() if free else None
+            if buffer is not None:
+                self.reuses += 1
+            else:
+                self.allocations += 1
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+        if owner is not None:
+            weakref.finalize(owner, self.release, buffer)
+        return buffer
+
+    def release(self, buffer):
+        """Return a buffer to the pool; it must no longer be used by its previous holder."""
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_per_key and not any(b is buffer for b in free):
+                free.append(buffer)
+
+    def clear(self):
+        """Drop every pooled buffer."""
+        with self._lock:
+            self._free.clear()
+
+
+# Pool shared by the frame functions of this package
+frame_pool = FrameBufferPool()
+
+
+def image_to_array(image, out=None, box=None, channels=None):
+    """
+    Copy a Pillow image, or a box of it, into a NumPy array.
+
+    Exactly one copy of the pixels is made: np.asarray() wraps the bytes
+    Pillow exports instead of copying them again as np.array() does.
+
+    Args:
+        image (PIL.Image.Image): Source image
+        out (numpy.ndarray, optional): Destination, e.g. a pooled frame or a
+            slice of one; a read-only array is returned if omitted
+        box (tuple, optional): Region (x0, y0, x1, y1) to export
+        channels (int, optional): Keep only the first channels, e.g. 3 for RGB
+            out of RGBA, without converting the image
+
+    Returns:
+        numpy.ndarray: out, or a read-only array over the exported bytes
+    """
+    region = image if box is None else image.crop(box)
+    array = np.asarray(region)
+    if channels is not None and array.ndim == 3:
+        array = array[..., :channels]
+    if out is None:
+        return array
+    np.copyto(out, array)
+    return out
+
+
+def array_to_image(array):
+    """
+    Wrap a NumPy array as a Pillow image, sharing memory when possible.
+
+    Contiguous single-channel and RGBA uint8 arrays are wrapped without a
+    copy; the image is then read-only and must be used as a source (paste,
+    crop, resize), never drawn on. Other arrays are copied.
+
+    Args:
+        array (numpy.ndarray): uint8 array of shape (h, w), (h, w, 3) or (h, w, 4)
+
+    Returns:
+        PIL.Image.Image: Image over the array's pixels
+    """
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    mode = _SHARED_MODES.get(channels)
+    if mode is not None and array.dtype == np.uint8 and array.flags.c_contiguous:
+        height, width = array.shape[:2]
+        return PILImage.frombuffer(mode, (width, height), array, "raw", mode, 0, 1)
+    return PILImage.fromarray(np.ascontiguousarray(array))
+
+
+def union_box(box, other):
+    """Return the smallest box (x0, y0, x1, y1) covering two boxes; either may be None."""
+    if box is None:
+        return other
+    if other is None:
+        return box
+    return (min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3]))
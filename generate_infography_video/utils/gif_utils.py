@@ -5,56 +5,248 @@ This module contains functionality for processing GIF files and text wrapping
 for video generation.
 """
 
-from moviepy.editor import ImageSequenceClip
+import os
+import json
+import hashlib
+import threading
+from moviepy.editor import VideoClip
 from PIL import Image as PILImage, ImageSequence
 import numpy as np
+from .compositor import Layer
 
 
-def gif_to_transparent_clip(gif_path, duration, resize_height=None, position=("left", "center")):
+# Decoded sprites keyed by (path, mtime, trim, crop margins, height, premultiply)
+_SPRITE_CACHE = {}
+
+
+class GifSprite:
     """
-    Convert a GIF file to a transparent MoviePy clip.
+    Decoded GIF frames stored as one contiguous RGBA array.
     
-    This function processes a GIF file, converts frames to RGBA format,
-    crops the frames, and creates a looped video clip with specified duration.
+    Only the union bounding box of the visible pixels across all frames is
+    stored, so transparent margins are neither kept in memory nor blended.
+    A sprite is decoded, trimmed and resized once and then shared by every
+    clip and layer that plays it. Frames are handed out as views into the
+    shared array, and the same view object is returned for the same frame so
+    compositors can detect unchanged frames by identity.
+    """
+
+    def __init__(self, frames, fps, premultiplied=False, offset=(0, 0)):
+        """
+        Initialize the GifSprite.
+        
+        Args:
+            frames (numpy.ndarray): uint8 array of shape (n, h, w, 4)
+            fps (float): Playback rate derived from the GIF frame durations
+            premultiplied (bool): Whether RGB values are premultiplied by alpha
+            offset (tuple): Position of the trimmed frames inside the scaled,
+                            untrimmed GIF frame as (x, y)
+        """
+        self.frames = frames
+        self.fps = fps
+        self.premultiplied = premultiplied
+        self.offset = tuple(offset)
+        self.size = (frames.shape[2], frames.shape[1])
+        self.duration = len(frames) / fps
+        self._views = list(frames)
+
+    @property
+    def w(self):
+        """int: Width of the sprite in pixels."""
+        return self.size[0]
+
+    @property
+    def h(self):
+        """int: Height of the sprite in pixels."""
+        return self.size[1]
+
+    def frame_index(self, t):
+        """Return the index of the frame shown at time t when looping."""
+        index = int((t % self.duration) * self.fps + 1e-6)
+        return min(index, len(self._views) - 1)
+
+    def frame(self, t):
+        """
+        Return the RGBA frame shown at time t when looping.
+        
+        Args:
+            t (float): Time in seconds
+            
+        Returns:
+            numpy.ndarray: Read-only view into the shared frame array
+        """
+        return self._views[self.frame_index(t)]
+
+    def clip(self, duration):
+        """
+        Return a lightweight looped MoviePy clip sharing the decoded frames.
+        
+        Args:
+            duration (float): Duration of the clip in seconds
+            
+        Returns:
+            VideoClip: Looped clip with an alpha mask
+        """
+        premultiplied = self.premultiplied
+
+        def make_frame(t):
+            rgba = self.frame(t)
+            if premultiplied:
+                alpha = rgba[..., 3:4].astype(np.uint16)
+                return np.where(alpha > 0, (rgba[..., :3] * 255 + alpha // 2) // np.maximum(alpha, 1), 0).astype(np.uint8)
+            return rgba[..., :3]
+
+        def make_mask(t):
+            return self.frame(t)[..., 3] / 255.0
+
+        mask = VideoClip(make_mask, ismask=True, duration=duration)
+        return VideoClip(make_frame, duration=duration).set_mask(mask)
+
+    def layer(self, position=(0, 0), start=0, duration=None, opacity=1.0):
+        """
+        Return the sprite as a looping compositor layer.
+        
+        Args:
+            position (tuple or callable): Top-left corner as (x, y), or a function of t
+            start (float): Time in seconds at which the sprite appears
+            duration (float, optional): How long the sprite stays visible
+            opacity (float or callable): Layer opacity in [0, 1], or a function of t
+            
+        Returns:
+            Layer: Layer serving RGBA views of the shared frames
+        """
+        return Layer(self.frame, position=position, start=start, duration=duration,
+                     opacity=opacity, premultiplied=self.premultiplied)
+
+
+def load_gif_sprite(gif_path, resize_height=None, trim=True, crop_margins=(0, 0, 0, 0), premultiply=False,
+                    cache_dir=None):
+    """
+    Return the decoded sprite for a GIF, decoding it at most once.
+    
+    Sprites are cached in memory for the lifetime of the process and, when
+    cache_dir is given, persisted as .npy files so later runs can memory-map
+    them instead of decoding the GIF again.
     
     Args:
         gif_path (str): Path to the GIF file
-        duration (float): Duration of the output clip in seconds
-        resize_height (int, optional): Height to resize the clip to
-        position (tuple): Position of the clip in the final video
+        resize_height (int, optional): Height the full GIF frame is scaled to.
+                          Trimming keeps this scale, so the character size does
+                          not depend on the asset's transparent margins.
+        trim (bool): Keep only the union bounding box of all non-transparent pixels
+        crop_margins (tuple): Extra pixels cut from the (left, top, right, bottom) edges
+        premultiply (bool): Store RGB premultiplied by alpha
+        cache_dir (str, optional): Folder for the persistent .npy cache
         
     Returns:
-        ImageSequenceClip: Processed MoviePy clip
+        GifSprite: Shared sprite; its frames must not be modified
     """
-    # Open GIF file
+    stat = os.stat(gif_path)
+    key = (os.path.abspath(gif_path), stat.st_mtime_ns, trim, tuple(crop_margins), resize_height, premultiply)
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is not None:
+        return sprite
+
+    npy_path = meta_path = None
+    if cache_dir:
+        digest = hashlib.sha1(repr((key[0], stat.st_size) + key[1:]).encode("utf-8")).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(gif_path))[0]
+        npy_path = os.path.join(cache_dir, f"{stem}-{digest}.npy")
+        meta_path = os.path.join(cache_dir, f"{stem}-{digest}.json")
+
+    if npy_path and os.path.exists(npy_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        frames = np.load(npy_path, mmap_mode="r")
+        sprite = GifSprite(frames, meta["fps"], premultiplied=meta["premultiplied"], offset=tuple(meta["offset"]))
+    else:
+        frames, fps, offset = _decode_gif(gif_path, resize_height, trim, crop_margins, premultiply)
+        if npy_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write both files under temporary names and move them into place,
+            # metadata last: a reader that sees the .json finds a complete .npy
+            suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(npy_path + suffix, "wb") as f:
+                np.save(f, frames)
+            os.replace(npy_path + suffix, npy_path)
+            with open(meta_path + suffix, "w", encoding="utf-8") as f:
+                json.dump({"fps": fps, "premultiplied": premultiply, "offset": offset}, f)
+            os.replace(meta_path + suffix, meta_path)
+        frames.flags.writeable = False
+        sprite = GifSprite(frames, fps, premultiplied=premultiply, offset=offset)
+
+    _SPRITE_CACHE[key] = sprite
+    return sprite
+
+
+def _decode_gif(gif_path, resize_height, trim, crop_margins, premultiply):
+    """Decode, trim and resize all GIF frames into one (n, h, w, 4) array."""
     gif = PILImage.open(gif_path)
-    frames = []
+    images = []
     durations = []
-    
-    # Process each frame
+    occupied = None
+
+    # Convert each frame once and accumulate where any frame is visible
     for frame in ImageSequence.Iterator(gif):
         rgba = frame.convert("RGBA")
-        w, h = rgba.size
-        cropped = rgba.crop((50, 0, w - 20, h))  # Manual crop
-
-        np_frame = np.array(cropped)
-
-        frames.append(np_frame)
+        if trim:
+            visible = np.asarray(rgba)[..., 3] > 0
+            occupied = visible if occupied is None else occupied | visible
+        images.append(rgba)
         durations.append(frame.info.get("duration", 100))
-        
+
     # Calculate FPS from frame durations
     fps = 1000 / (sum(durations) / len(durations))
+
+    w, h = images[0].size
+    left, top, right, bottom = crop_margins
+    box = [left, top, w - right, h - bottom]
+    if trim and occupied is not None and occupied.any():
+        rows = np.flatnonzero(occupied.any(axis=1))
+        cols = np.flatnonzero(occupied.any(axis=0))
+        box = [max(box[0], cols[0]), max(box[1], rows[0]),
+               min(box[2], cols[-1] + 1), min(box[3], rows[-1] + 1)]
+
+    # Scale relative to the full frame so trimming does not change the size
+    scale = resize_height / h if resize_height else 1.0
+    size = (max(1, int(round((box[2] - box[0]) * scale))), max(1, int(round((box[3] - box[1]) * scale))))
+    offset = [int(round(box[0] * scale)), int(round(box[1] * scale))]
+
+    frames = np.empty((len(images), size[1], size[0], 4), dtype=np.uint8)
+    for index, image in enumerate(images):
+        cropped = image.crop(tuple(int(v) for v in box))
+        if cropped.size != size:
+            cropped = cropped.resize(size, PILImage.LANCZOS)
+        frames[index] = np.asarray(cropped)
+
+    if premultiply:
+        alpha = frames[..., 3:4].astype(np.uint16)
+        frames[..., :3] = (frames[..., :3] * alpha + 127) // 255
+    return frames, fps, offset
+
+
+def gif_to_transparent_clip(gif_path, duration, resize_height=None, position=("left", "center"), cache_dir=None):
+    """
+    Convert a GIF file to a transparent MoviePy clip.
     
-    # Create clip
-    clip = ImageSequenceClip(frames, fps=fps)
+    This function processes a GIF file, converts frames to RGBA format,
+    trims the transparent margins, and creates a looped video clip with
+    specified duration.
+    Decoded frames come from the shared sprite cache, so the GIF is decoded
+    and resized once per (gif, size) no matter how many blocks use it.
     
-    # Resize if needed
-    if resize_height:
-        clip = clip.resize(height=resize_height)
+    Args:
+        gif_path (str): Path to the GIF file
+        duration (float): Duration of the output clip in seconds
+        resize_height (int, optional): Height to resize the clip to
+        position (tuple): Position of the clip in the final video
+        cache_dir (str, optional): Folder for the persistent sprite cache
         
-    # Loop for specified duration
-    looped = clip.loop(duration=duration)
-    return looped.set_position(position)
+    Returns:
+        VideoClip: Looped MoviePy clip with an alpha mask
+    """
+    sprite = load_gif_sprite(gif_path, resize_height=resize_height, cache_dir=cache_dir)
+    return sprite.clip(duration).set_position(position)
 
 
 def pixel_wrap(text, font, max_width):
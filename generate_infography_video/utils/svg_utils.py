@@ -5,6 +5,7 @@ This module contains functionality for processing SVG templates and injecting
 content from JSON data files.
 """
 
+import re
 import xml.etree.ElementTree as ET
 import json
 
@@ -22,6 +23,9 @@ json_path = svg_config['json_path']
 SVG_NS = '{http://www.w3.org/2000/svg}'
 INKSCAPE_NS = '{http://www.inkscape.org/namespaces/inkscape}'
 
+# Inkscape labels of the content slots: header1, header2, ...
+SLOT_LABEL = re.compile(r'^header(\d+)$')
+
 
 def strip_ns(tag):
     """
@@ -144,34 +148,99 @@ def add_wrapped_text(parent, x, y, text, font_size, box_width, line_height=None,
     parent.append(text_elem)
 
 
-def process_svg(svg_file, headers_file, output_file):
+def find_slot_labels(root):
     """
-    Process SVG template and inject content from JSON data.
+    Return the content slot labels of a template in slot order.
     
-    This function reads an SVG template, replaces labeled rectangles with
-    wrapped text content from JSON data, and updates the JSON with position
-    information for video generation.
+    Slots are rectangles labelled header1, header2, ... in Inkscape; any
+    number of them is supported.
     
     Args:
-        svg_file (str): Path to input SVG template
-        headers_file (str): Path to JSON file with content data
-        output_file (str): Path to output processed SVG file
+        root (Element): Root element of the SVG template
+        
+    Returns:
+        list: Slot labels sorted by their number
     """
-    # Register namespaces
-    ET.register_namespace('', "http://www.w3.org/2000/svg")
-    ET.register_namespace('inkscape', "http://www.inkscape.org/namespaces/inkscape")
+    numbers = set()
+    for elem in root.iter():
+        if strip_ns(elem.tag) == 'rect':
+            match = SLOT_LABEL.match(elem.attrib.get(f'{INKSCAPE_NS}label', ''))
+            if match:
+                numbers.add(int(match.group(1)))
+    return [f'header{number}' for number in sorted(numbers)]
+
+
+def canvas_width(root):
+    """
+    Return the width of a template in user units.
     
-    # Parse SVG
+    Args:
+        root (Element): Root element of the SVG template
+        
+    Returns:
+        float: Width from the viewBox, else from the width attribute; None if neither is set
+    """
+    view_box = root.attrib.get('viewBox', '').replace(',', ' ').split()
+    if len(view_box) == 4:
+        return float(view_box[2])
+    match = re.match(r'\s*([\d.]+)', root.attrib.get('width', ''))
+    return float(match.group(1)) if match else None
+
+
+def paginate(blocks, slots):
+    """
+    Split content blocks into pages of one template instance each.
+    
+    Args:
+        blocks (list): Content blocks in reading order
+        slots (int): Number of content slots in the template
+        
+    Returns:
+        list: One list of blocks per page; a single empty page if there are no blocks
+    """
+    if slots <= 0 or not blocks:
+        return [list(blocks)]
+    return [blocks[i:i + slots] for i in range(0, len(blocks), slots)]
+
+
+def page_file(path, page):
+    """
+    Return the path of a per-page output file.
+    
+    The first page keeps the configured path, so single-page templates
+    write exactly the files they always did.
+    
+    Args:
+        path (str): Configured output path, e.g. output/final.png
+        page (int): Zero-based page index
+        
+    Returns:
+        str: output/final.png for page 0, output/final_p2.png for page 1, ...
+    """
+    if page == 0:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_p{page + 1}{ext}"
+
+
+def fill_template(svg_file, blocks, output_file):
+    """
+    Write one template instance with the titles of a page of blocks.
+    
+    Args:
+        svg_file (str): Path to input SVG template
+        blocks (list): Content blocks of the page, one per slot
+        output_file (str): Path to the processed SVG file
+        
+    Returns:
+        dict: Slot label to its rectangle as {'x', 'y', 'width', 'height'}
+    """
     tree = ET.parse(svg_file)
     root = tree.getroot()
     
-    # Load content data
-    with open(headers_file, 'r', encoding='utf-8') as hf:
-        data = json.load(hf)
-
-    # Map headers to labels
-    headers = [obj.get('title', '') for obj in data]
-    label_names = ['header1', 'header2', 'header3', 'header4']
+    label_names = find_slot_labels(root)
+    width_of_canvas = canvas_width(root)
+    headers = [obj.get('title', '') for obj in blocks]
     header_map = {label: headers[i] if i < len(headers) else "" for i, label in enumerate(label_names)}
     
     # Find rectangles to replace
@@ -209,14 +278,58 @@ def process_svg(svg_file, headers_file, output_file):
         parent = next((p for p in root.iter() if rect in list(p)), root)
         parent.remove(rect)
         
-        right_align = label in ['header2', 'header4']
+        # Titles of slots left of the canvas centre are right-aligned, so
+        # both columns of titles end up facing the centre
+        right_align = width_of_canvas is not None and x + width / 2 < width_of_canvas / 2
         
         add_wrapped_text(parent, x, y, header_text, FONT_SIZE, width, LINE_HEIGHT, right_align=right_align)
 
-    # 🔁 Inject position info into content.json data
-    for i, label in enumerate(label_names):
-        if i < len(data) and label in label_positions:
-            data[i]['position'] = label_positions[label]
+    tree.write(output_file, encoding='utf-8', xml_declaration=True)
+    return {label: label_positions[label] for label in label_names if label in label_positions}
+
+
+def process_svg(svg_file, headers_file, output_file):
+    """
+    Process SVG template and inject content from JSON data.
+    
+    This function reads an SVG template, replaces labeled rectangles with
+    wrapped text content from JSON data, and updates the JSON with position
+    information for video generation.
+    
+    Content with more blocks than the template has slots is paged: each
+    page is a separate instance of the template, written next to
+    output_file (see page_file), and every block records its 'page' index
+    along with its 'position'.
+    
+    Args:
+        svg_file (str): Path to input SVG template
+        headers_file (str): Path to JSON file with content data
+        output_file (str): Path to output processed SVG file
+        
+    Returns:
+        list: Paths of the processed SVG files, one per page
+    """
+    # Register namespaces
+    ET.register_namespace('', "http://www.w3.org/2000/svg")
+    ET.register_namespace('inkscape', "http://www.inkscape.org/namespaces/inkscape")
+    
+    # Load content data
+    with open(headers_file, 'r', encoding='utf-8') as hf:
+        data = json.load(hf)
+
+    slots = len(find_slot_labels(ET.parse(svg_file).getroot()))
+    pages = paginate(data, slots)
+    
+    page_files = []
+    for page, blocks in enumerate(pages):
+        page_svg = page_file(output_file, page)
+        label_positions = fill_template(svg_file, blocks, page_svg)
+        page_files.append(page_svg)
+        
+        # 🔁 Inject position info into content.json data
+        for block, position in zip(blocks, label_positions.values()):
+            block['position'] = position
+            block['page'] = page
 
     # 💾 Save updated JSON
     with open(headers_file, 'w', encoding='utf-8') as hf:
@@ -224,6 +337,8 @@ def process_svg(svg_file, headers_file, output_file):
         print(f"Updated JSON saved to {headers_file}")
 
     # 💾 Save processed SVG
-    tree.write(output_file, encoding='utf-8', xml_declaration=True)
-    print(f"Processed SVG saved to {output_file}")
-
+    if len(page_files) == 1:
+        print(f"Processed SVG saved to {output_file}")
+    else:
+        print(f"Processed SVG saved to {len(page_files)} pages of {slots} slots: {', '.join(page_files)}")
+    return page_files
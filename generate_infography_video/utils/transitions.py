@@ -0,0 +1,172 @@
+"""
+Transitions Module
+
+This module contains scene transitions (crossfade, slide, wipe and zoom)
+between two still endpoint frames. Both endpoints are prepared once; inside
+the transition window frames are blended with integer NumPy math into
+reused buffers, and outside it the endpoint arrays are passed through
+untouched so a DamageCompositor can recognise them as unchanged.
+"""
+
+import numpy as np
+
+from .frame_buffers import frame_pool
+
+
+def _linear(p):
+    return p
+
+
+def _ease_in_out(p):
+    return p * p * (3 - 2 * p)
+
+
+EASINGS = {
+    "linear": _linear,
+    "ease_in_out": _ease_in_out,
+}
+
+DIRECTIONS = ("left", "right", "up", "down")
+
+
+class Transition:
+    """
+    A transition from one still frame to another.
+
+    The transition is a function of time: before `start` it returns the
+    first frame, after `start + duration` the second one, and in between a
+    blend drawn into one of two alternating buffers, so consecutive frames
+    inside the window are never the same array object.
+    """
+
+    KINDS = ("cut", "crossfade", "slide", "wipe", "zoom")
+
+    def __init__(self, kind, frame_a, frame_b, duration=0.6, start=0, easing="linear",
+                 direction="left", center=None):
+        """
+        Initialize the Transition.
+
+        Args:
+            kind (str): One of "cut", "crossfade", "slide", "wipe" or "zoom"
+            frame_a (numpy.ndarray): RGB uint8 frame shown before the transition
+            frame_b (numpy.ndarray): RGB uint8 frame shown after the transition
+            duration (float): Length of the transition window in seconds
+            start (float): Time in seconds at which the transition begins
+            easing (str): Name of the easing curve in EASINGS
+            direction (str): Direction the incoming frame moves in, for slide and wipe
+            center (tuple, optional): Point (x, y) the zoom grows from; the canvas
+                centre if None
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown transition '{kind}', expected one of {self.KINDS}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction '{direction}', expected one of {DIRECTIONS}")
+        if frame_a.shape != frame_b.shape:
+            raise ValueError(f"Transition frames differ in shape: {frame_a.shape} vs {frame_b.shape}")
+
+        self.kind = kind
+        self.frame_a = np.ascontiguousarray(frame_a, dtype=np.uint8)
+        self.frame_b = np.ascontiguousarray(frame_b, dtype=np.uint8)
+        self.duration = duration if kind != "cut" else 0
+        self.start = start
+        self.easing = EASINGS[easing]
+        self.direction = direction
+        h, w = self.frame_a.shape[:2]
+        self.center = center if center is not None else (w / 2, h / 2)
+
+        self._buffers = [frame_pool.acquire(self.frame_a.shape, owner=self) for _ in range(2)]
+        self._flip = 0
+        self._acc = None
+        self._tmp = None
+        if kind == "crossfade":
+            self._acc = frame_pool.acquire(self.frame_a.shape, np.uint16, owner=self)
+            self._tmp = frame_pool.acquire(self.frame_a.shape, np.uint16, owner=self)
+        elif kind == "zoom":
+            self._zoom_cols = np.arange(w)
+            self._zoom_rows = np.arange(h)
+
+    def progress(self, t):
+        """Return the eased progress of the transition at time t, from 0 to 1."""
+        if self.duration <= 0:
+            return 0.0 if t < self.start else 1.0
+        p = min(1.0, max(0.0, (t - self.start) / self.duration))
+        return self.easing(p)
+
+    def frame(self, t):
+        """
+        Return the frame at time t.
+
+        Args:
+            t (float): Time in seconds
+
+        Returns:
+            numpy.ndarray: One of the endpoint frames outside the transition
+            window, otherwise a buffer that is reused two frames later
+        """
+        p = self.progress(t)
+        if p <= 0:
+            return self.frame_a
+        if p >= 1:
+            return self.frame_b
+
+        out = self._buffers[self._flip]
+        self._flip ^= 1
+        getattr(self, "_" + self.kind)(out, p)
+        return out
+
+    def _crossfade(self, out, p):
+        """out = (a * (256 - w) + b * w) >> 8 with an 8-bit weight."""
+        weight = int(round(p * 256))
+        np.multiply(self.frame_a, 256 - weight, out=self._acc, dtype=np.uint16)
+        np.multiply(self.frame_b, weight, out=self._tmp, dtype=np.uint16)
+        self._acc += self._tmp
+        self._acc >>= 8
+        np.copyto(out, self._acc, casting="unsafe")
+
+    def _axis_offset(self, p):
+        """Return the axis and pixel offset the edge has travelled for progress p."""
+        h, w = self.frame_a.shape[:2]
+        axis = 1 if self.direction in ("left", "right") else 0
+        size = w if axis == 1 else h
+        return axis, size, int(round(p * size))
+
+    def _slide(self, out, p):
+        """The incoming frame pushes the outgoing one off the canvas."""
+        axis, size, offset = self._axis_offset(p)
+        a = np.moveaxis(self.frame_a, axis, 0)
+        b = np.moveaxis(self.frame_b, axis, 0)
+        o = np.moveaxis(out, axis, 0)
+        if self.direction in ("left", "up"):
+            o[:size - offset] = a[offset:]
+            o[size - offset:] = b[:offset]
+        else:
+            o[offset:] = a[:size - offset]
+            o[:offset] = b[size - offset:]
+
+    def _wipe(self, out, p):
+        """A hard edge sweeps across the canvas, revealing the incoming frame."""
+        axis, size, offset = self._axis_offset(p)
+        a = np.moveaxis(self.frame_a, axis, 0)
+        b = np.moveaxis(self.frame_b, axis, 0)
+        o = np.moveaxis(out, axis, 0)
+        if self.direction in ("left", "up"):
+            o[:size - offset] = a[:size - offset]
+            o[size - offset:] = b[size - offset:]
+        else:
+            o[:offset] = b[:offset]
+            o[offset:] = a[offset:]
+
+    def _zoom(self, out, p):
+        """The incoming frame grows from the centre point over the outgoing one."""
+        h, w = self.frame_a.shape[:2]
+        bw, bh = max(1, int(round(w * p))), max(1, int(round(h * p)))
+        cx, cy = self.center
+        x0 = min(w - bw, max(0, int(round(cx * (1 - p)))))
+        y0 = min(h - bh, max(0, int(round(cy * (1 - p)))))
+
+        # Nearest-neighbour downscale of the incoming frame with integer index maps
+        cols = self._zoom_cols[:bw] * w // bw
+        rows = self._zoom_rows[:bh] * h // bh
+        np.copyto(out, self.frame_a)
+        out[y0:y0 + bh, x0:x0 + bw] = self.frame_b[rows][:, cols]
+
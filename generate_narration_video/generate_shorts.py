@@ -16,6 +16,14 @@ from moviepy.editor import (
     VideoFileClip,
 )
 
+# Ensure project root is on sys.path for sibling package imports
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from generate_infography_video.handler.ffmpeg_writer import write_clip
+from generate_infography_video.handler.cpu_budget import CpuBudget, job_slot
+
 # -------------------------------
 # YouTube Shorts Generator (1080x1920)
 # Text content is embedded below in TEXT_BLOCKS
@@ -58,6 +66,18 @@ FONT_SIZE = 78                       # larger for vertical layout
 TEXT_WIDTH = int(VIDEO_SIZE[0] * 0.85)  # wrap width ~85% of screen width
 FPS = 30
 
+# Encoder settings passed straight to ffmpeg
+ENCODER_SETTINGS = {
+    "codec": "libx264",
+    "preset": "medium",
+    "crf": 23,
+    "pix_fmt": "yuv420p",
+    "gop": FPS * 2,
+    "threads": "auto",  # cores left over by rendering, within the container's CPU quota
+    "vfr": False,  # True drops repeated frames and writes variable frame rate
+}
+MAX_JOBS = 1  # render jobs allowed to run at once on this host
+
 # Styling for reels
 TEXT_COLOR = "#FFEE58"      # bright lemon
 STROKE_COLOR = "#0A0A0A"    # near-black outline
@@ -601,14 +621,13 @@ def main():
     # Otherwise, render the full video as before
     final = CompositeVideoClip([bg_clip] + overlay_clips + clips, size=VIDEO_SIZE)
 
-    final.write_videofile(
-        OUTPUT_VIDEO,
-        fps=FPS,
-        codec="libx264",
-        audio=False,  # silent shorts by default; swap to audio clip if desired
-        threads=1,
-        logger=None,
-    )
+    # silent shorts by default; set audio=True after attaching an audio clip
+    settings = dict(ENCODER_SETTINGS)
+    if settings["threads"] == "auto":
+        # Frames are composed on this thread; the encoder gets the other cores
+        settings["threads"] = CpuBudget(max_jobs=MAX_JOBS).split(max_workers=1)[1]
+    with job_slot(MAX_JOBS):
+        write_clip(final, OUTPUT_VIDEO, fps=FPS, audio=False, **settings)
 
     # cleanup
     final.close()
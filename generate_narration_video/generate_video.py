@@ -14,6 +14,8 @@ from moviepy.editor import (
 # Add project root to sys.path for config import (two levels up)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import MODULE_CONFIG
+from generate_infography_video.handler.ffmpeg_writer import write_clip
+from generate_infography_video.handler.cpu_budget import CpuBudget, job_slot
 
 
 def typing_clip_by_chars(text, duration, fontsize, font, video_size, text_width):
@@ -126,14 +128,10 @@ def main():
     final = CompositeVideoClip([bg_clip] + clips, size=VIDEO_SIZE).set_audio(audio)
     final = final.set_duration(audio_duration)
 
-    final.write_videofile(
-        OUTPUT_VIDEO,
-        fps=24,
-        codec="libx264",
-        audio_codec="aac",
-        threads=1,
-        logger=None,
-    )
+    # Frames are composed on this thread; the encoder gets the other cores
+    threads = CpuBudget().split(max_workers=1)[1]
+    with job_slot():
+        write_clip(final, OUTPUT_VIDEO, fps=24, audio_codec="aac", codec="libx264", threads=threads)
 
     final.close()
     audio.close()
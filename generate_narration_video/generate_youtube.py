@@ -15,10 +15,7 @@ from moviepy.editor import (
     CompositeVideoClip,
     ImageClip,
     VideoFileClip,
-    AudioFileClip,
-    CompositeAudioClip,
 )
-from moviepy.audio.fx.volumex import volumex as audio_volumex
 from PIL import Image, ImageDraw, ImageFont
 import textwrap
 
@@ -27,6 +24,10 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
+from generate_infography_video.handler.ffmpeg_writer import write_clip
+from generate_infography_video.handler.cpu_budget import CpuBudget, job_slot
+from generate_infography_video.handler.audio_pcm import prepare_audio, TimelineMixer
+
 
 # -------------------------------
 # YouTube Video Generator (1920x1080)
@@ -107,6 +108,10 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 OUTPUT_VIDEO = os.path.join(OUTPUT_DIR, "video.mp4")
 OUTPUT_AUDIO_DIR = os.path.join(OUTPUT_DIR, "audio")
 os.makedirs(OUTPUT_AUDIO_DIR, exist_ok=True)
+# Block audio with volume and speed applied, keyed by input and settings
+PROCESSED_AUDIO_DIR = os.path.join(OUTPUT_AUDIO_DIR, "processed")
+# Whole soundtrack, mixed in one pass and muxed with the video
+OUTPUT_SOUNDTRACK = os.path.join(OUTPUT_AUDIO_DIR, "soundtrack.wav")
 
 # Video/Text config for standard YouTube
 VIDEO_SIZE = (1920, 1080)  # 16:9 landscape
@@ -115,6 +120,18 @@ FONT_SIZE = 64
 TEXT_WIDTH = int(VIDEO_SIZE[0] * 0.70)  # ~70% of width for readability
 FPS = 30
 
+# Encoder settings passed straight to ffmpeg
+ENCODER_SETTINGS = {
+    "codec": "libx264",
+    "preset": "medium",
+    "crf": 23,
+    "pix_fmt": "yuv420p",
+    "gop": FPS * 2,
+    "threads": "auto",  # cores left over by rendering, within the container's CPU quota
+    "vfr": False,  # True drops repeated frames and writes variable frame rate
+}
+MAX_JOBS = 1  # render jobs allowed to run at once on this host
+
 # Styling
 TEXT_COLOR = "#FFEE58"
 STROKE_COLOR = "#0A0A0A"
@@ -136,23 +153,9 @@ YOUTUBER_SPEED = 1.06   # slight speed-up
 YOUTUBER_VOLUME = 1.08  # slight volume boost
 TTS_LANG = "en"
 TTS_TLD = "co.in"        # adjust if you want a different accent (e.g., "co.in")
-
-def speed_audio(aclip, factor: float):
-    """Return a clip played at a different speed without using audio_speedx.
-    For factor > 1.0, audio plays faster (shorter duration). For factor < 1.0, slower.
-    """
-    try:
-        if factor is None or abs(factor - 1.0) < 1e-3:
-            return aclip
-        sped = aclip.fl_time(lambda t: t * factor)
-        # Adjust duration explicitly
-        try:
-            sped.duration = float(aclip.duration) / float(factor)
-        except Exception:
-            pass
-        return sped
-    except Exception:
-        return aclip
+TTS_ENGINE = "gtts"      # or "espeak-ng" / "phrases" to narrate offline
+AUDIO_FPS = 44100        # sample rate of the processed block audio and the soundtrack
+AUDIO_FADE = 0.01        # fade at each block's audio edges, avoids clicks
 
 # ---------------------------------
 # Google Fonts download integration
@@ -501,7 +504,8 @@ def _pil_text_clip(text: str, duration: float, fontsize: int, font_path_or_name:
         y_cursor += line_height
 
     # Convert to MoviePy ImageClip
-    np_img = np.array(img)
+    # np.asarray wraps the exported bytes instead of copying them a second time
+    np_img = np.asarray(img)
     clip = ImageClip(np_img).set_duration(max(0.01, duration))
     # Position vertically similar to TextClip logic
     h = np_img.shape[0]
@@ -523,41 +527,37 @@ def main():
         # In image mode, we don't need TTS. Compute duration from provided durations.
         total_duration = sum(max(0.2, float(b.get("duration", 1.0))) for b in TEXT_BLOCKS) + len(TEXT_BLOCKS) * PAUSE_AFTER
     else:
-        # First pass: generate/load audio per block and measure processed durations
-        blocks_audio = []  # list of dicts: {"path", "duration"}
-        for idx, block in enumerate(TEXT_BLOCKS, start=1):
-            seg_text = block["text"].strip()
-            audio_path = os.path.join(OUTPUT_AUDIO_DIR, f"block_{idx:02}.mp3")
-            # Prefer audio_text if provided for narration
-            speak_text = str(block.get("audio_text", seg_text)).strip() or seg_text
-
-            try:
-                t_tts0 = time.perf_counter()
-                from generate_infography_video.handler.audio_handler import generate_tts
-                if not os.path.exists(audio_path):
-                    generate_tts(speak_text, audio_path)
-                    if VERBOSE:
-                        print(f"[perf][block {idx}] TTS generated in {time.perf_counter()-t_tts0:.2f}s")
-                else:
-                    if VERBOSE:
-                        print(f"[perf][block {idx}] TTS cached: {audio_path}")
-            except Exception as e:
-                if VERBOSE:
-                    print(f"[audio] TTS generation failed for block {idx}: {e}")
+        # Audio preparation: decode each block once, apply volume and speed, and keep
+        # the processed samples for the timeline
+        blocks_audio = []  # list of dicts: {"path", "duration", "samples"}
+        speak_texts = [
+            str(block.get("audio_text", block["text"].strip())).strip() or block["text"].strip()
+            for block in TEXT_BLOCKS
+        ]
+        audio_paths = [os.path.join(OUTPUT_AUDIO_DIR, f"block_{idx:02}.wav") for idx in range(1, len(TEXT_BLOCKS) + 1)]
+
+        # Synthesize every block concurrently; audio is cached sentence by sentence
+        # per voice, so only new or edited sentences reach the TTS service
+        t_tts0 = time.perf_counter()
+        from generate_infography_video.handler.audio_handler import generate_tts_batch
+        # Blocks whose synthesis failed get None and fall back to their fixed duration
+        audio_paths = generate_tts_batch(list(zip(speak_texts, audio_paths)), lang=TTS_LANG, tld=TTS_TLD, engine=TTS_ENGINE)
+        if VERBOSE:
+            print(f"[perf] TTS for {len(TEXT_BLOCKS)} blocks ready in {time.perf_counter()-t_tts0:.2f}s")
 
+        for idx, (block, audio_path) in enumerate(zip(TEXT_BLOCKS, audio_paths), start=1):
             processed_duration = None
-            if os.path.exists(audio_path):
+            samples = None
+            if audio_path and os.path.exists(audio_path):
                 try:
                     t_ap0 = time.perf_counter()
-                    aclip = AudioFileClip(audio_path)
-                    if YOUTUBER_VOLUME and abs(YOUTUBER_VOLUME - 1.0) > 1e-3:
-                        aclip = aclip.fx(audio_volumex, YOUTUBER_VOLUME)
-                    if YOUTUBER_SPEED and abs(YOUTUBER_SPEED - 1.0) > 1e-3:
-                        aclip = speed_audio(aclip, YOUTUBER_SPEED)
-                    processed_duration = float(aclip.duration)
-                    aclip.close()
+                    prepared = prepare_audio(audio_path, PROCESSED_AUDIO_DIR, rate=AUDIO_FPS,
+                                             volume=YOUTUBER_VOLUME or 1.0, speed=YOUTUBER_SPEED or 1.0)
+                    audio_path = prepared["path"]
+                    samples = prepared["samples"]
+                    processed_duration = prepared["duration"]
                     if VERBOSE:
-                        print(f"[perf][block {idx}] audio load+fx {time.perf_counter()-t_ap0:.2f}s | dur={processed_duration:.2f}s")
+                        print(f"[perf][block {idx}] audio prep {time.perf_counter()-t_ap0:.2f}s | dur={processed_duration:.2f}s")
                 except Exception as e:
                     if VERBOSE:
                         print(f"[audio] Failed to load/process audio for block {idx}: {e}")
@@ -566,7 +566,7 @@ def main():
                 processed_duration = max(0.2, float(block.get("duration", 3.0)))
                 audio_path = None
 
-            blocks_audio.append({"path": audio_path, "duration": processed_duration})
+            blocks_audio.append({"path": audio_path, "duration": processed_duration, "samples": samples})
 
         total_duration = sum(b["duration"] for b in blocks_audio) + len(blocks_audio) * PAUSE_AFTER
 
@@ -628,7 +628,7 @@ def main():
 
     # Build text layers and audio timeline
     clips = []
-    audio_timeline = []
+    mixer = TimelineMixer(AUDIO_FPS, channels=2)
     cursor = 0.0
     for idx, (block, ba) in enumerate(zip(TEXT_BLOCKS, blocks_audio), start=1):
         seg_text = block["text"].strip()
@@ -658,15 +658,10 @@ def main():
             clips.append(pause_clip)
 
         # Attach audio (if exists) aligned with the block start
-        if ba["path"] and os.path.exists(ba["path"]):
+        if ba["samples"] is not None:
             try:
-                aclip = AudioFileClip(ba["path"]) 
-                if YOUTUBER_VOLUME and abs(YOUTUBER_VOLUME - 1.0) > 1e-3:
-                    aclip = aclip.fx(audio_volumex, YOUTUBER_VOLUME)
-                if YOUTUBER_SPEED and abs(YOUTUBER_SPEED - 1.0) > 1e-3:
-                    aclip = speed_audio(aclip, YOUTUBER_SPEED)
-                aclip = aclip.set_start(cursor)
-                audio_timeline.append(aclip)
+                # Already processed in the preparation stage
+                mixer.add(ba["samples"], cursor, fade_in=AUDIO_FADE, fade_out=AUDIO_FADE)
             except Exception as e:
                 if VERBOSE:
                     print(f"[audio] Could not add audio for block {idx}: {e}")
@@ -680,31 +675,29 @@ def main():
     if VERBOSE:
         print(f"[perf] composite build {time.perf_counter()-t_comp0:.2f}s")
 
-    # Build and attach audio track if any
-    if audio_timeline:
+    # Mix the whole soundtrack once into a WAV muxed by the encoder
+    soundtrack = None
+    if mixer.entries:
         try:
             t_aud0 = time.perf_counter()
-            composite_audio = CompositeAudioClip(audio_timeline)
-            final = final.set_audio(composite_audio)
+            soundtrack = mixer.write_wav(OUTPUT_SOUNDTRACK, length=int(round(total_duration * AUDIO_FPS)))
             if VERBOSE:
-                print(f"[perf] composite audio {time.perf_counter()-t_aud0:.2f}s")
+                print(f"[perf] soundtrack mix {time.perf_counter()-t_aud0:.2f}s")
         except Exception as e:
             if VERBOSE:
-                print(f"[audio] Failed to set composite audio: {e}")
+                print(f"[audio] Failed to mix soundtrack: {e}")
 
     if VERBOSE:
-        print("[perf] write_videofile start")
+        print("[perf] write_clip start")
     t_write0 = time.perf_counter()
-    final.write_videofile(
-        OUTPUT_VIDEO,
-        fps=FPS,
-        codec="libx264",
-        audio=bool(audio_timeline),
-        threads=1,
-        logger=None,
-    )
+    settings = dict(ENCODER_SETTINGS)
+    if settings["threads"] == "auto":
+        # Frames are composed on this thread; the encoder gets the other cores
+        settings["threads"] = CpuBudget(max_jobs=MAX_JOBS).split(max_workers=1)[1]
+    with job_slot(MAX_JOBS):
+        write_clip(final, OUTPUT_VIDEO, fps=FPS, audio=soundtrack is not None, audio_file=soundtrack, **settings)
     if VERBOSE:
-        print(f"[perf] write_videofile finished in {time.perf_counter()-t_write0:.2f}s")
+        print(f"[perf] write_clip finished in {time.perf_counter()-t_write0:.2f}s")
 
     final.close()
     for c in clips:
@@ -713,11 +706,7 @@ def main():
         except Exception:
             pass
     bg_clip.close()
-    for a in audio_timeline:
-        try:
-            a.close()
-        except Exception:
-            pass
+    del mixer
     gc.collect()
 
     print(f"✅ YouTube video saved to {OUTPUT_VIDEO}")